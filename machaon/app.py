@@ -6,6 +6,7 @@ import sys
 import shutil
 from typing import TYPE_CHECKING
 from collections import namedtuple
+from contextlib import nullcontext
 
 from machaon.core.object import Object, ObjectCollection
 from machaon.core.type.typemodule import TypeModule
@@ -50,23 +51,30 @@ class AppRoot:
         self._startupvars = []
         self._startupignores = {}
         self._startuperrors = ErrorSet("アプリケーション初期化")
+        self._startupprofiler = None
 
-    def initialize(self, *, ui, basic_dir=None, ignore_args=False, ignore_packages=None, ignore_hotkeys=None, **uiargs):
+    def initialize(self, *, ui, basic_dir=None, ignore_args=False, ignore_packages=None, ignore_hotkeys=None, profile_startup=False, **uiargs):
         """ 初期化前に初期設定を指定する """
         if not ignore_args:
             # コマンドライン引数を読み込む
             from machaon.ui.main import initialize_app_args
-            initargs = initialize_app_args(self, ui=ui, basic_dir=basic_dir, **uiargs)
+            initargs = initialize_app_args(self, ui=ui, basic_dir=basic_dir, profile_startup=profile_startup, **uiargs)
             ui = initargs.pop("ui")
             basic_dir = initargs.pop("basic_dir")
+            profile_startup = initargs.pop("profile_startup")
         else:
             initargs = uiargs
+
+        # 起動時間の計測を開始する
+        if profile_startup:
+            self.start_startup_profile()
         
         # UIを設定する
         if ui is None:
             ui = "shell"
-        from machaon.ui import new_launcher
-        self.ui = new_launcher(ui, **initargs)
+        with self.profile_phase("new_launcher"):
+            from machaon.ui import new_launcher
+            self.ui = new_launcher(ui, **initargs)
 
         # パス
         if basic_dir is None:
@@ -154,22 +162,68 @@ class AppRoot:
         """ 起動を無視するフラグを調べる """
         return self._startupignores.get(name)
     
+    #
+    # 起動時間の計測
+    #
+    def start_startup_profile(self):
+        """ 起動処理の計測を開始する """
+        if self._startupprofiler is None:
+            from machaon.core.profiler import StartupProfiler
+            self._startupprofiler = StartupProfiler().start()
+            self.typemodule.set_profiler(self._startupprofiler)
+        return self._startupprofiler
+
+    def finish_startup_profile(self):
+        """ 起動処理の計測を終了し、結果を返す 
+        Returns:
+            Optional[StartupProfiler]:
+        """
+        profiler = self._startupprofiler
+        if profiler is None:
+            return None
+        # 予約された型の読み込みまでを計測に含める
+        with self.profile_phase("first type load"):
+            try:
+                self.typemodule.load_reserved_types()
+            except Exception as e:
+                self._startuperrors.add(e, message="標準モジュールの型のロード")
+        profiler.stop()
+        self.typemodule.set_profiler(None)
+        self._startupprofiler = None
+        return profiler
+
+    def get_startup_profiler(self):
+        return self._startupprofiler
+
+    def profile_phase(self, name):
+        """ 起動処理の段階を計測する。計測中でなければ何もしない """
+        if self._startupprofiler is None:
+            return nullcontext()
+        return self._startupprofiler.phase(name)
+    
     def boot_ui(self):
         """ UIを立ち上げる """
         if self.ui is None:
             raise ValueError("App UI must be initialized")
-        if hasattr(self.ui, "init_with_app"):
-            self.ui.init_with_app(self)
-        self.ui.activate_new_chamber() # 空のチャンバーを追加する
+        with self.profile_phase("boot_ui"):
+            if hasattr(self.ui, "init_with_app"):
+                self.ui.init_with_app(self)
+            self.ui.activate_new_chamber() # 空のチャンバーを追加する
     
     def boot_core(self, spirit=None, *, fundamentals=False):
         """ コア機能を立ち上げる """
+        with self.profile_phase("boot_core"):
+            self._boot_core(spirit, fundamentals)
+        self._startuperrors.throw_if_failed()
+
+    def _boot_core(self, spirit, fundamentals):
         if fundamentals: # 既に初期化済みでない場合はここで
             # 基本型をロードする
-            try:
-                self.typemodule.add_fundamentals() 
-            except Exception as e:
-                self._startuperrors.add(e, message="基本型のロード")
+            with self.profile_phase("fundamentals"):
+                try:
+                    self.typemodule.add_fundamentals() 
+                except Exception as e:
+                    self._startuperrors.add(e, message="基本型のロード")
 
         # パッケージマネージャの初期化
         self.pkgmanager = PackageManager(
@@ -180,8 +234,10 @@ class AppRoot:
         if not self.is_ignored_at_startup("packages"):
             try:
                 package_list_dir = self.get_basic_dir()
-                self.pkgmanager.load_packages(package_list_dir)
-                self.pkgmanager.load_database(package_list_dir / "packages.ini")
+                with self.profile_phase("packages"):
+                    self.pkgmanager.load_packages(package_list_dir)
+                with self.profile_phase("package database"):
+                    self.pkgmanager.load_database(package_list_dir / "packages.ini")
                 self.pkgmanager.add_to_import_path()
                 self.pkgmanager.check_after_loading()
             except Exception as e:
@@ -197,25 +253,25 @@ class AppRoot:
         
         # ホットキーの監視を有効化する
         if KeyController.available and not self.is_ignored_at_startup("hotkey"):
-            try:
-                self.keycontrol.start(self)
-                if spirit: 
-                    spirit.post("message", "入力リスナーを立ち上げました")
-            except Exception as e:
-                self._startuperrors.add(e, message="ホットキーの監視")
-
-        self._startuperrors.throw_if_failed()
+            with self.profile_phase("hotkey"):
+                try:
+                    self.keycontrol.start(self)
+                    if spirit: 
+                        spirit.post("message", "入力リスナーを立ち上げました")
+                except Exception as e:
+                    self._startuperrors.add(e, message="ホットキーの監視")
 
     def boot_startup_variables(self, context):
         """ スタートアップ変数をロードする """
         if self.is_ignored_at_startup("variables"):
             return
-        count = 0
-        for v in self._startupvars:
-            o = context.new_object(v.value, conversion=v.typename)
-            self.objcol.push(v.name, o)
-            count += 1
-        self._startupvars.clear()
+        with self.profile_phase("startup variables"):
+            count = 0
+            for v in self._startupvars:
+                o = context.new_object(v.value, conversion=v.typename)
+                self.objcol.push(v.name, o)
+                count += 1
+            self._startupvars.clear()
         return count
     
     #
@@ -324,7 +380,8 @@ class AppRoot:
         self._startupmsgs.clear()
 
         # 基本型を先に登録：初期化処理メッセージを解読するために必要
-        self.typemodule.add_fundamentals() 
+        with self.profile_phase("fundamentals"):
+            self.typemodule.add_fundamentals() 
 
         # メインループ
         self.ui.run_mainloop()
@@ -342,6 +399,12 @@ class AppRoot:
             # 確認のダイアログをいれたい
             # return
 
+        # 書き出した返り値を削除する
+        self.objcol.discard_all_spilled()
+        retention = self.processhive.get_retention()
+        if retention is not None:
+            retention.remove_spilled_files()
+
         self.ui.on_exit()
 
     def interrupt(self):
@@ -409,6 +472,53 @@ class AppRoot:
     def chambers(self):
         return self.processhive
 
+    def set_process_retention(self, *, max_processes=None, max_bytes=None, max_age=None, spill=False):
+        """ 
+        プロセスの返り値を保持する上限を設定する。
+        Params:
+            max_processes(int): 返り値を保持するプロセスの数
+            max_bytes(int): 返り値の推定バイト数の合計
+            max_age(float): 終了してからの秒数
+            spill(bool): 上限を超えた返り値をファイルに書き出し、参照時に読み込む
+        """
+        from machaon.process import ProcessRetention
+        if max_processes is None and max_bytes is None and max_age is None:
+            self.processhive.set_retention(None)
+            return
+        spilldir = self.get_local_dir("results") if spill else None
+        retention = ProcessRetention(
+            max_processes=max_processes, max_bytes=max_bytes, max_age=max_age, spill_dir=spilldir
+        )
+        retention.remove_spilled_files() # 前回の終了時に残ったファイルを削除する
+        self.processhive.set_retention(retention)
+    
+    def set_display_cache(self, maxsize=None):
+        """
+        ビューの表示用文字列のキャッシュを設定する。
+        Params:
+            maxsize(int): 保持する値の数。Noneか0で無効にする
+        """
+        from machaon.core.displaycache import enable_display_cache, disable_display_cache
+        if maxsize:
+            enable_display_cache(maxsize)
+        else:
+            disable_display_cache()
+    
+    def set_error_capture(self, *, repr_limit=None, max_frames=None, grace_period=False):
+        """
+        エラーのトレースバックを要約する方法を設定する。
+        Params:
+            repr_limit(int): 変数の表示文字列の最大長
+            max_frames(int): 残すフレームの最大数
+            grace_period(Optional[float]): 最初に表示してからフレームへの参照を保持する秒数。Noneなら手放さない
+        """
+        from machaon.types.stacktrace import set_error_capture
+        set_error_capture(repr_limit=repr_limit, max_frames=max_frames, grace_period=grace_period)
+    
+    def retain_process_result(self, process):
+        """ 終了したプロセスの返り値を記録し、上限を超えた古いものを手放す """
+        return self.processhive.retain_process_result(process, self.objcol, self.typemodule)
+
     def find_process(self, index):
         # アクティブなチャンバーから検索する
         actchm = self.chambers().get_active()
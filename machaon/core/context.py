@@ -1,3 +1,4 @@
+import threading
 from typing import DefaultDict, Any, List, Sequence, Dict, Tuple, Optional, Union, Generator, TYPE_CHECKING
 
 from machaon.core.object import Object, ObjectCollection
@@ -199,6 +200,13 @@ class NullContextLog:
     def nop(self, *_args):
         pass
 
+    # 頻繁に呼ばれるメソッドは__getattr__を経由させない
+    message_start = message_end = message_code = message_ast = message_rsv = nop
+    message_evaluating = message_eval_start = message_eval_end = message_start_sub = nop
+
+# ログを蓄積しないコンテキストで共有する
+_null_context_log = NullContextLog()
+
 
 
 #
@@ -213,12 +221,13 @@ class InvocationContext:
         self.input_objects: ObjectCollection = input_objects  # 外部のオブジェクト参照
         self.subject_object: Union[None, Object, Dict[str, Object]] = subject       # 無名関数の引数とするオブジェクト
         self.spirit: 'Spirit' = spirit
-        self.invocations: List[InvocationEntry] = []
+        self._invocations: Optional[List[InvocationEntry]] = None # 最初の呼び出しで作成する
         self.invocation_flags = flags
         self._extra_exception = None
-        self._log = ContextLog()
+        self._log = None # 最初の記録で作成する
         self.herepath = herepath
         self.parent = parent # 継承元のコンテキスト
+        self._inherit_flags = None # (元のフラグ, 継承されるフラグ)
 
     def get_spirit(self):
         return self.spirit
@@ -229,23 +238,38 @@ class InvocationContext:
     
     #
     def inherit(self, subject=None, herepath=None):
+        """ 
+        入れ子のコンテキストを作成する。
+        親の要素を共有し、ログと呼び出しのリストは記録されるまで作成しない。
+        """
+        cxt = InvocationContext.__new__(InvocationContext)
+        # 他の要素は全て引き継がれる
+        cxt.type_module = self.type_module
+        cxt.input_objects = self.input_objects
+        cxt.subject_object = subject
+        cxt.spirit = self.spirit
+        cxt._invocations = None
+        cxt.invocation_flags = self._get_inherit_flags()
+        cxt._extra_exception = None
+        # ログを蓄積しない設定も引き継ぐ
+        cxt._log = _null_context_log if self._log is _null_context_log else None
+        cxt.herepath = herepath or self.herepath
+        cxt.parent = self
+        cxt._inherit_flags = None
+        return cxt
+
+    def _get_inherit_flags(self):
+        """ 継承コンテキストのフラグを計算する。フラグが変わらない限り再計算しない """
+        cache = self._inherit_flags
+        if cache is not None and cache[0] == self.invocation_flags:
+            return cache[1]
         # 予約されたフラグを取り出して結合する
         preserved_flags = 0xFFFF & (self.invocation_flags >> INVOCATION_FLAG_INHERIT_BIT_SHIFT)
         flags = (0xFFFF & self.invocation_flags) | preserved_flags
         remove_flags = 0xFFFF & (self.invocation_flags >> INVOCATION_FLAG_INHERIT_REMBIT_SHIFT)
         flags = flags & ~remove_flags
-        # パス
-        herepath = herepath or self.herepath
-        # 他の要素は全て引き継がれる
-        return InvocationContext(
-            input_objects=self.input_objects, 
-            type_module=self.type_module, 
-            spirit=self.spirit,
-            subject=subject,
-            flags=flags,
-            herepath=herepath,
-            parent=self,
-        )
+        self._inherit_flags = (self.invocation_flags, flags)
+        return flags
 
     def inherit_sequential(self):
         """ 連続実行を行う呼び出しのコンテクストを生成する """
@@ -359,6 +383,13 @@ class InvocationContext:
             raise BadTypename(typecode)
         return t
     
+    def get_fundamental_type(self, typename: str) -> TypeProxy:
+        """ 修飾されていない型名で型を取得する。結果はモジュールにキャッシュされる """
+        t = self.type_module.get_fundamental(typename)
+        if t is None:
+            raise BadTypename(typename)
+        return t
+    
     def get_py_type(self, type) -> PythonType:
         """ Pythonの型 """
         return PythonType(type)
@@ -438,6 +469,9 @@ class InvocationContext:
         else:
             if isinstance(value, Object):
                 return value
+            pooled = self.type_module.get_pooled_object(value)
+            if pooled is not None:
+                return pooled
             if value is None:
                 return self.get_type("None").new_object(value)
             valtype = self.deduce_type(value)
@@ -454,19 +488,27 @@ class InvocationContext:
             exception = ErrorObject(exception, context=self)
         elif not isinstance(exception, ErrorObject):
             raise TypeError('exception')
-        return objectType(self.get_type("Error"), exception)
+        return objectType(self.get_fundamental_type("Error"), exception)
     
+    @property
+    def invocations(self) -> Sequence[InvocationEntry]:
+        if self._invocations is None:
+            return ()
+        return self._invocations
+
     def begin_invocation(self, entry: InvocationEntry):
         """ 呼び出しの直前に """
-        if self.is_sequential_invocation():
+        if self._invocations is None:
+            self._invocations = [entry]
+        elif self.is_sequential_invocation():
             # 上書きする
-            if not self.invocations:
-                self.invocations.append(entry)
+            if not self._invocations:
+                self._invocations.append(entry)
             else:
-                self.invocations[-1] = entry 
+                self._invocations[-1] = entry 
         else:
-            self.invocations.append(entry)
-        index = len(self.invocations)-1
+            self._invocations.append(entry)
+        index = len(self._invocations)-1
         self.log.message_eval_start(index)
         return index
 
@@ -477,8 +519,8 @@ class InvocationContext:
         return index
     
     def get_last_invocation(self) -> Optional[InvocationEntry]:
-        if self.invocations:
-            return self.invocations[-1]
+        if self._invocations:
+            return self._invocations[-1]
         return None
 
     def get_last_exception(self) -> Optional[Exception]:
@@ -530,16 +572,20 @@ class InvocationContext:
         return self.spirit.process
     
     def enable_log(self):
-        if self._log.isnull:
+        if self._log is None or self._log.isnull:
             self._log = ContextLog()
 
     def disable_log(self):
         """ ログを蓄積しない """
-        if not self._log.isnull:
-            self._log = NullContextLog()
+        self._log = _null_context_log
+    
+    def is_log_enabled(self):
+        return self._log is None or not self._log.isnull
 
     @property
     def log(self):
+        if self._log is None:
+            self._log = ContextLog()
         return self._log
 
     def pprint_log(self, printer=None):
@@ -634,7 +680,7 @@ class InvocationContext:
         Decorates:
             @ view: display-instructions
         """
-        if self._log.isnull:
+        if self._log is None or self._log.isnull:
             return
         yield from self._log.get_instructions()
 
@@ -756,25 +802,33 @@ def _context_no_log(*a, **kw):
     pass
 
 _instant_context_types = None
+_instant_context_lock = threading.Lock()
 
-def instant_context(subject=None, root=None):
-    """ 即席実行用のコンテキスト """
+def instant_type_module() -> TypeModule:
+    """ 即席実行用の、標準の型をすべて読み込んで凍結したモジュール """
     global _instant_context_types
     if _instant_context_types is None:
-        t = TypeModule()
-        t.add_fundamentals()
-        errs = t.add_default_module_types()
-        if errs:
-            raise errs[0]
-        t.check_loading()
-        _instant_context_types = t
+        with _instant_context_lock:
+            if _instant_context_types is None:
+                t = TypeModule()
+                t.add_fundamentals()
+                errs = t.add_default_module_types()
+                if errs:
+                    raise errs[0]
+                t.check_loading()
+                _instant_context_types = t.freeze()
+    return _instant_context_types
+
+def instant_context(subject=None, root=None):
+    """ 即席実行用のコンテキスト。型の追加は、このコンテキストの型モジュールにのみ記録される """
+    types = instant_type_module().overlay()
 
     from machaon.process import TempSpirit
     spi = TempSpirit(root)
     
     return InvocationContext(
         input_objects=ObjectCollection(),
-        type_module=_instant_context_types,
+        type_module=types,
         subject=subject,
         spirit=spi
     )
@@ -0,0 +1,219 @@
+"""
+二項演算子の実装の振り分け表。
+
+ソートキーやフィルタの中で共通型の演算子を呼ぶたびに、メソッドの引数の準備を経ずに済むよう、
+左辺と右辺の値の型ごとに、特化した実装を一度だけ選んでおく。
+型のデスクライバは、register_binary_operatorで自分の値の型に対する実装を追加できる。
+"""
+import operator
+import datetime
+import threading
+from typing import Dict, Callable, Optional
+
+#
+# 振り分けの対象となる演算子：GenericMethodsの関数名 -> 既定の実装
+#
+def _compare(left, right):
+    if left == right:
+        return 0
+    elif left < right:
+        return 1
+    else:
+        return -1
+
+def _compare_ordered(left, right):
+    """ 全順序のある型の比較：等値の判定を省略する """
+    return (left < right) - (right < left)
+
+def _is_in(left, right):
+    return left in right
+
+BINARY_OPERATORS: Dict[str, Callable] = {
+    "equal" : operator.eq,
+    "not_equal" : operator.ne,
+    "less_equal" : operator.le,
+    "less" : operator.lt,
+    "greater_equal" : operator.ge,
+    "greater" : operator.gt,
+    "compare" : _compare,
+    "add" : operator.add,
+    "sub" : operator.sub,
+    "mul" : operator.mul,
+    "matmul" : operator.matmul,
+    "div" : operator.truediv,
+    "floordiv" : operator.floordiv,
+    "mod" : operator.mod,
+    "pow" : operator.pow,
+    "bitand" : operator.and_,
+    "bitor" : operator.or_,
+    "bitxor" : operator.xor,
+    "lshift" : operator.lshift,
+    "rshift" : operator.rshift,
+    "is_in" : _is_in,
+    "contains" : operator.contains,
+}
+
+# 全順序のある組み込み型（NaNのあるfloatは除く）
+ORDERED_VALUE_TYPES = (
+    (int, int),
+    (str, str),
+    (bytes, bytes),
+    (datetime.datetime, datetime.datetime),
+    (datetime.date, datetime.date),
+    (datetime.time, datetime.time),
+    (datetime.timedelta, datetime.timedelta),
+)
+
+#
+#
+#
+class BinaryOperatorTable:
+    """
+    (演算子, 左辺の値の型, 右辺の値の型) をキーとした実装の表。
+    登録された型はMROを遡って照合し、見つからなければ既定の実装を使う。
+    """
+    def __init__(self):
+        self._entries: Dict[tuple, Callable] = {} # (opname, ltype, rtype) -> fn : 登録された実装
+        self._resolved: Dict[tuple, Callable] = {} # (opname, ltype, rtype) -> fn : 照合結果
+        self._lock = threading.Lock()
+        self.version = 0 # 登録のたびに増え、呼び出し箇所のキャッシュを無効にする
+
+    def is_dispatchable(self, opname) -> bool:
+        """ 振り分けの対象となる演算子か """
+        return opname in BINARY_OPERATORS
+
+    def register(self, opname, ltype, rtype, fn):
+        """
+        実装を登録する。
+        Params:
+            opname(str): GenericMethodsの関数名
+            ltype(type): 左辺の値の型
+            rtype(type): 右辺の値の型
+            fn(Callable[[Any, Any], Any]): 実装
+        """
+        if opname not in BINARY_OPERATORS:
+            raise ValueError("'{}'は振り分けの対象となる二項演算子ではありません".format(opname))
+        with self._lock:
+            self._entries[(opname, ltype, rtype)] = fn
+            self._resolved.clear()
+            self.version += 1
+
+    def unregister(self, opname, ltype, rtype) -> bool:
+        """
+        登録された実装を削除する。
+        Params:
+            opname(str): GenericMethodsの関数名
+            ltype(type): 左辺の値の型
+            rtype(type): 右辺の値の型
+        Returns:
+            bool: 削除したか
+        """
+        with self._lock:
+            if self._entries.pop((opname, ltype, rtype), None) is None:
+                return False
+            self._resolved.clear()
+            self.version += 1
+        return True
+
+    def reset(self, entries: Dict[tuple, Callable] = None):
+        """
+        登録された実装を全て削除し、指定の実装で置き換える。
+        Params:
+            entries(Dict[tuple, Callable]): (opname, ltype, rtype) -> fn
+        """
+        with self._lock:
+            self._entries = dict(entries or {})
+            self._resolved.clear()
+            self.version += 1
+
+    def resolve(self, opname, ltype, rtype) -> Optional[Callable]:
+        """
+        値の型に対する実装を選ぶ。
+        Params:
+            opname(str): GenericMethodsの関数名
+            ltype(type): 左辺の値の型
+            rtype(type): 右辺の値の型
+        Returns:
+            Optional[Callable]: 振り分けの対象でなければNone
+        """
+        key = (opname, ltype, rtype)
+        fn = self._resolved.get(key)
+        if fn is not None:
+            return fn
+
+        fn = self._entries.get(key)
+        if fn is None:
+            for lt in ltype.__mro__:
+                for rt in rtype.__mro__:
+                    fn = self._entries.get((opname, lt, rt))
+                    if fn is not None:
+                        break
+                if fn is not None:
+                    break
+            else:
+                fn = BINARY_OPERATORS.get(opname)
+                if fn is None:
+                    return None
+
+        with self._lock:
+            self._resolved[key] = fn
+        return fn
+
+
+def _default_entries():
+    return {("compare", ltype, rtype) : _compare_ordered for ltype, rtype in ORDERED_VALUE_TYPES}
+
+def _make_default_table():
+    table = BinaryOperatorTable()
+    table.reset(_default_entries())
+    return table
+
+#
+# アプリケーション全体で共有する表
+#
+_binary_operator_table = _make_default_table()
+
+def get_binary_operator_table() -> BinaryOperatorTable:
+    return _binary_operator_table
+
+def register_binary_operator(opname, ltype, rtype, fn):
+    """
+    型のデスクライバから実装を追加する。
+    Params:
+        opname(str): 演算子（"<"など）またはGenericMethodsの関数名
+        ltype(type): 左辺の値の型
+        rtype(type): 右辺の値の型
+        fn(Callable[[Any, Any], Any]): 実装
+    """
+    _binary_operator_table.register(_normalize_operator_name(opname), ltype, rtype, fn)
+
+def unregister_binary_operator(opname, ltype, rtype) -> bool:
+    """
+    register_binary_operatorで追加した実装を削除する。
+    Params:
+        opname(str): 演算子（"<"など）またはGenericMethodsの関数名
+        ltype(type): 左辺の値の型
+        rtype(type): 右辺の値の型
+    Returns:
+        bool: 削除したか
+    """
+    return _binary_operator_table.unregister(_normalize_operator_name(opname), ltype, rtype)
+
+def reset_binary_operator_table():
+    """ 追加された実装を全て削除し、既定の状態に戻す """
+    _binary_operator_table.reset(_default_entries())
+
+def _normalize_operator_name(opname):
+    """ 演算子をGenericMethodsの関数名にする """
+    if opname not in BINARY_OPERATORS:
+        from machaon.core.symbol import normalize_method_name
+        from machaon.types.generic import get_resolver
+        opname = get_resolver().resolve(normalize_method_name(opname)) or opname
+    return opname
+
+def binary_operator(opname, ltype, rtype=None):
+    """ register_binary_operatorのデコレータ版。rtypeを省略するとltypeと同じになる """
+    def _deco(fn):
+        register_binary_operator(opname, ltype, ltype if rtype is None else rtype, fn)
+        return fn
+    return _deco
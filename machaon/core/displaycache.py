@@ -0,0 +1,160 @@
+"""
+表示用文字列のキャッシュ。
+
+シートなどのビューを描画するたびに、セルごとにsummarize/stringifyを呼ばずに済むよう、
+値と型の同一性をキーとして表示用の文字列を保持する。
+変更されうる値は、変更後にtouchを呼んでキャッシュを無効化する必要がある。
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+#
+# 表示の種類
+#
+DISPLAY_STRINGIFY = 0
+DISPLAY_SUMMARIZE = 1
+
+DISPLAY_CACHE_MAXSIZE = 50000
+
+#
+#
+#
+class _DisplayEntry:
+    """ 1つの値と型に対する表示用文字列 """
+    __slots__ = ("value", "type", "version", "strings")
+
+    def __init__(self, value, type, version):
+        self.value = value # 同一性を保つため、値を参照しておく
+        self.type = type
+        self.version = version
+        self.strings = [None, None] # DISPLAY_XXX -> str
+
+
+class DisplayStringCache:
+    """
+    値の同一性と版数をキーとした、上限つきの表示用文字列のキャッシュ。
+    summarizeとstringifyの結果を同じ項目に保持する。
+    """
+    def __init__(self, maxsize=DISPLAY_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict() # (id(value), id(type)) -> _DisplayEntry
+        self._counts = {} # id(value) -> int : 値ごとの項目数
+        self._versions = {} # id(value) -> int : touchされた値の版数
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, obj, mode=DISPLAY_SUMMARIZE) -> str:
+        """
+        オブジェクトの表示用文字列を取得する。
+        Params:
+            obj(Object):
+            mode(int): DISPLAY_XXX
+        Returns:
+            str:
+        """
+        value = obj.value
+        key = (id(value), id(obj.type))
+        version = self._versions.get(key[0], 0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.value is value and entry.type is obj.type and entry.version == version:
+                    s = entry.strings[mode]
+                    if s is not None:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return s
+                else:
+                    entry = None # 古い項目
+
+        # ロックの外で計算する
+        if mode == DISPLAY_SUMMARIZE:
+            s = obj.summarize()
+        else:
+            s = obj.stringify()
+
+        with self._lock:
+            self.misses += 1
+            if entry is None:
+                entry = _DisplayEntry(value, obj.type, version)
+                old = self._entries.get(key)
+                if old is None:
+                    self._counts[key[0]] = self._counts.get(key[0], 0) + 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    oldkey, _ = self._entries.popitem(last=False)
+                    self._release(oldkey[0])
+            else:
+                self._entries.move_to_end(key)
+            entry.strings[mode] = s
+        return s
+    
+    def _release(self, valueid):
+        n = self._counts[valueid] - 1
+        if n > 0:
+            self._counts[valueid] = n
+        else:
+            del self._counts[valueid]
+            self._versions.pop(valueid, None)
+
+    def summarize(self, obj) -> str:
+        return self.get(obj, DISPLAY_SUMMARIZE)
+
+    def stringify(self, obj) -> str:
+        return self.get(obj, DISPLAY_STRINGIFY)
+
+    def touch(self, value):
+        """ 値が変更されたので、以前の文字列を使わないようにする """
+        i = id(value)
+        with self._lock:
+            if i in self._counts: # キャッシュされていない値の版数は記録しない
+                self._versions[i] = self._versions.get(i, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+            self._versions.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+#
+# アプリケーション全体で共有するキャッシュ
+#
+_display_cache: Optional[DisplayStringCache] = None
+
+def enable_display_cache(maxsize=DISPLAY_CACHE_MAXSIZE) -> DisplayStringCache:
+    """ キャッシュを有効にする """
+    global _display_cache
+    if _display_cache is None or _display_cache.maxsize != maxsize:
+        _display_cache = DisplayStringCache(maxsize)
+    return _display_cache
+
+def disable_display_cache():
+    """ キャッシュを無効にし、破棄する """
+    global _display_cache
+    _display_cache = None
+
+def get_display_cache() -> Optional[DisplayStringCache]:
+    return _display_cache
+
+def touch_display(value):
+    """ 値の変更を通知する。キャッシュが無効なら何もしない """
+    if _display_cache is not None:
+        _display_cache.touch(value)
+
+def display_string(obj, mode=DISPLAY_SUMMARIZE) -> str:
+    """ キャッシュが有効ならそれを使って、表示用文字列を得る """
+    if _display_cache is not None:
+        return _display_cache.get(obj, mode)
+    if mode == DISPLAY_SUMMARIZE:
+        return obj.summarize()
+    else:
+        return obj.stringify()
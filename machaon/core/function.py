@@ -116,7 +116,8 @@ class SelectorExpression(FunctionExpression):
         subcontext = context.inherit(subject)        
         try:
             entry = self._make_invocation(context, subject)
-            subcontext.log.message_start(MessageEngine(self.get_expression()))
+            if subcontext.is_log_enabled():
+                subcontext.log.message_start(MessageEngine(self.get_expression()))
 
             result = entry.invoke(subcontext)
             
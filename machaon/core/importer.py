@@ -324,25 +324,33 @@ class ModuleDocDefinition:
     """
     def __init__(self, module: PyBasicModuleLoader):
         self._module = module
-        self._ast = None
+        self._doc = None # モジュールのドキュメント文字列
+        self._classes = [] # (クラス名, ドキュメント文字列)[]
         self.defined_modules = []
         self.using_types: list[str] = []
         self.using_packages: list[UsingPackageEntry] = []
         self._load_ast()
 
     def _load_ast(self):
-        """ ソースコードの構文木を読み込む """
+        """ ソースコードの構文木を読み込み、ドキュメント文字列を取り出す """
+        from machaon.core.prebuilt import get_prebuilt_module_docs, read_module_docs
+        p = self._module.load_filepath()
+        if p is not None:
+            # ビルド時に書き出されたものがあれば、構文解析を省略する
+            prebuilt = get_prebuilt_module_docs(p)
+            if prebuilt is not None:
+                self._doc, self._classes = prebuilt
+                return
         source = self._module.load_source()
         if source is None:
             return
         disp = str(self)
-        self._ast = compile(source, disp, 'exec', ast.PyCF_ONLY_AST)
+        tree = compile(source, disp, 'exec', ast.PyCF_ONLY_AST)
+        self._doc, self._classes = read_module_docs(tree)
     
     def load_declaration(self):
         """ 宣言部を解析する """
-        if self._ast is None:
-            return
-        doc = ast.get_docstring(self._ast)
+        doc = self._doc
         if not doc:
             return
 
@@ -382,23 +390,7 @@ class ModuleDocDefinition:
         モジュールに定義されたクラスのドキュメント文字列を全て読み、machaon型のデスクライバを抽出する
         """
         from machaon.core.type.describer import TypeDescriberClass, create_type_describer
-        for node in ast.iter_child_nodes(self._ast):
-            if not isinstance(node, ast.ClassDef):
-                continue
-
-            doc = ast.get_docstring(node)
-            if not doc:
-                continue
-            doc = doc.lstrip()
-            
-            classname = None
-            for name, field in ast.iter_fields(node):
-                if name == "name":
-                    classname = field
-                    break
-            if classname is None:
-                raise ValueError("no classname")
-
+        for classname, doc in self._classes:
             atloader = AttributeLoader(self._module, classname)
             desc = create_type_describer(TypeDescriberClass(atloader, doc))
             if not desc.is_valid():
@@ -600,7 +592,19 @@ def enum_attributes(value_type, value=None):
     if value is None:
         value = value_type
         value_type = type(value)
-
+    
+    if isinstance(value, type):
+        # クラスの属性の列挙はクラスごとにキャッシュする
+        from machaon.core.reflection import get_class_reflection
+        cache = get_class_reflection(value).members
+        members = cache.get(value_type)
+        if members is None:
+            members = cache.setdefault(value_type, list(_enum_attributes(value_type, value)))
+        yield from members
+        return
+    yield from _enum_attributes(value_type, value)
+
+def _enum_attributes(value_type, value):
     ranks = {}
     top = 1
     bases = [value_type]
@@ -5,6 +5,7 @@ from machaon.core.type.decl import (
 )
 from machaon.core.object import EMPTY_OBJECT, Object, ObjectCollection
 from machaon.core.method import MethodParameter, MethodResult, Method, ImmediateValue
+from machaon.core.dispatch import get_binary_operator_table
 from machaon.core.symbol import (
     normalize_method_target, normalize_method_name, full_qualified_name
 )
@@ -40,6 +41,8 @@ class InvocationEntry():
     """
     関数の呼び出し引数と返り値。
     """
+    __slots__ = ("invocation", "action", "args", "kwargs", "result", "result_spec", "exception", "_message")
+
     def __init__(self, invocation, action, args, kwargs, result_spec=None, *, exception=None):
         self.invocation = invocation
         self.action = action
@@ -121,9 +124,14 @@ class InvocationEntry():
     
         # 型を決めて値を返す
         try:
+            message = self.message if self.result_spec.is_return_self() else None
             rettype, retval = self.result_spec.make_result_value(
-                context, value, message=self.message
+                context, value, message=message
             )
+            if objectType is Object:
+                pooled = context.type_module.get_pooled_object(retval)
+                if pooled is not None and pooled.type is rettype:
+                    return pooled
             return objectType(rettype, retval)
         except Exception as e:
             self.exception = e
@@ -283,6 +291,45 @@ class TypeMethodInvocation(BasicInvocation):
             return self.method.get_param(index)
 
 
+class BinaryOperatorInvocation(TypeMethodInvocation):
+    """
+    共通型の二項演算子を呼び出す。
+    値の型に特化した実装を振り分け表から選び、直前の型の組とともに保持しておく。
+    """
+    def __init__(self, type, method, modifier=None):
+        super().__init__(type, method, modifier)
+        self._result_spec = None
+        self._ltype = None
+        self._rtype = None
+        self._fn = None
+        self._version = -1
+
+    def prepare_invoke(self, context, *argobjects):
+        if len(argobjects) != 2:
+            return super().prepare_invoke(context, *argobjects)
+
+        if self._result_spec is None:
+            self.method.load_from_type(self.type)
+            self.method.resolve_type(context)
+            self._result_spec = self.method.get_result()
+
+        left, right = argobjects
+        lvalue = left.value
+        rvalue = right.value
+        ltype = lvalue.__class__
+        rtype = rvalue.__class__
+        table = get_binary_operator_table()
+        if self._ltype is not ltype or self._rtype is not rtype or self._version != table.version:
+            self._fn = table.resolve(self.method.get_name(), ltype, rtype)
+            self._ltype = ltype
+            self._rtype = rtype
+            self._version = table.version
+
+        if self._fn is None:
+            return super().prepare_invoke(context, *argobjects)
+        return InvocationEntry(self, self._fn, [lvalue, rvalue], {}, self._result_spec)
+
+
 class RedirectorInvocation(BasicInvocation):
     def __init__(self, modifier):
         super().__init__(modifier)
@@ -354,9 +401,10 @@ class InstanceMethodInvocation(BasicInvocation):
         return ("InstanceMethod", self.attrname, self.modifier_name())
     
     def resolve_bound_method(self, instance):
-        if not hasattr(instance, self.attrname):
+        try:
+            value = getattr(instance, self.attrname) # hasattrと合わせて2回探索しない
+        except AttributeError:
             raise BadInstanceMethodInvocation(type(instance), self.attrname)
-        value = getattr(instance, self.attrname)
         if callable(value):
             return value
         else:
@@ -32,11 +32,13 @@ from machaon.core.invocation import (
     BasicInvocation,
     FunctionInvocation,
     TypeMethodInvocation,
+    BinaryOperatorInvocation,
     InstanceMethodInvocation,
     MessageInvocation,
     TypeConstructorInvocation,
     Bind1stInvocation,
 )
+from machaon.core.dispatch import get_binary_operator_table
 from machaon.core.type.declparser import TypeDeclError
 from machaon.core.type.typemodule import TypeModuleError
 from machaon.core.type.instance import ObjectType
@@ -92,6 +94,8 @@ def _log_rsv(context: 'InvocationContext', subcode: str, hint: str = None):
 #
 #
 class Message:
+    __slots__ = ("reciever", "selector", "args", "selector_mods", "_conclude")
+
     def __init__(self, 
         reciever = None, 
         selector = None, 
@@ -424,6 +428,8 @@ class LocalStack:
 # オブジェクトへの参照
 #
 class BasicRef:
+    __slots__ = ("_lastvalue",)
+
     def __init__(self, lastvalue=None):
         self._lastvalue = lastvalue
 
@@ -446,6 +452,8 @@ class BasicRef:
 
 class ResultStackRef(BasicRef):
     """ スタックにおかれた計算結果への参照 """
+    __slots__ = ()
+
     def do_pick(self, evalcontext):
         value = evalcontext.locals.top_local_object()
         if value is None:
@@ -458,6 +466,8 @@ class ResultStackRef(BasicRef):
     
 class SubjectRef(BasicRef):
     """ 引数オブジェクトへの参照 """
+    __slots__ = ()
+
     def do_pick(self, evalcontext):
         subject = evalcontext.context.subject_object
         if subject is None:
@@ -466,6 +476,8 @@ class SubjectRef(BasicRef):
 
 class ObjectRef(BasicRef):
     """ 任意のオブジェクトへの参照 """
+    __slots__ = ("_ident",)
+
     def __init__(self, ident, lastvalue=None):
         super().__init__(lastvalue)
         self._ident = ident
@@ -478,6 +490,8 @@ class ObjectRef(BasicRef):
 
 class PreviousObjectRef(BasicRef):
     """ 任意のオブジェクトへの参照 """
+    __slots__ = ("_ident",)
+
     def __init__(self, ident, lastvalue=None):
         super().__init__(lastvalue)
         self._ident = ident
@@ -541,9 +555,12 @@ def select_literal(context, literal):
     # 値をオブジェクトに変換する
     typename = type(value).__name__
     if typename in PythonBuiltinTypenames.literals:
-        return Object(context.get_type(typename), value)
+        pooled = context.type_module.get_pooled_object(value)
+        if pooled is not None:
+            return pooled
+        return Object(context.get_fundamental_type(typename.capitalize()), value)
     else:
-        return Object(context.get_type("Str"), literal) # エラーにしないで、元の文字列のままスルーする
+        return Object(context.get_fundamental_type("Str"), literal) # エラーにしないで、元の文字列のままスルーする
 
 
 # メソッド
@@ -592,6 +609,8 @@ def select_method(name, typetraits=None, *, reciever=None, modbits=None, context
     gmeth = ObjectType.select_method(name)
     if gmeth is not None:
         context and _log_rsv(context, 'common-method', name)
+        if get_binary_operator_table().is_dispatchable(gmeth.get_name()):
+            return BinaryOperatorInvocation(ObjectType, gmeth, modbits)
         return gmeth.make_invocation(modbits, ObjectType)
 
     if using_type_method:
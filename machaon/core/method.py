@@ -8,8 +8,10 @@ from machaon.core.type.decl import TypeInstanceDecl
 
 import types
 import inspect
+import threading
 
 from machaon.core.object import Object
+from machaon.core.reflection import get_class_reflection
 from machaon.core.symbol import normalize_method_target, normalize_method_name, SIGIL_OPERATOR_MEMBER_AT, normalize_typename
 from machaon.core.docstring import parse_doc_declaration, DocStringDefinition, DocStringDeclaration
 from machaon.core.type.decl import (
@@ -101,6 +103,15 @@ class MethodParameterNoDefault:
 class MethodParameterDefault:
     pass
 
+#
+# メソッドのロードを直列化するロック
+# メソッドごとにロックを持たせず、アドレスで振り分けたロックを共有する
+#
+_METHOD_LOAD_LOCKS = tuple(threading.RLock() for _ in range(64))
+
+def _method_load_lock(method):
+    return _METHOD_LOAD_LOCKS[(id(method) >> 4) % len(_METHOD_LOAD_LOCKS)]
+
 
 #
 #
@@ -483,7 +494,12 @@ class Method:
         """
         if self.flags & METHOD_LOADED:
             return
+        with _method_load_lock(self):
+            if self.flags & METHOD_LOADED:
+                return
+            self._load_from_type(this_type, meta, callobj)
 
+    def _load_from_type(self, this_type, meta, callobj):
         if self.target is None:
             self.target = normalize_method_target(self.name)
 
@@ -1182,7 +1198,7 @@ class MethodResult:
         
         # Noneはそのまま返す
         if value is None:
-            return (context.type_module.get("None"), None)
+            return (context.type_module.get_fundamental("None"), None)
 
         # 型拡張の定義かどうか
         extension = get_type_extension_loader(value)
@@ -1200,27 +1216,47 @@ class MethodResult:
         if extension is not None:
             rettype = extension.load(rettype)
 
+        # ジェネレータから読み込みながら表示する型は、空の値にデコレータを適用してから読み込む
+        if self.decorator is not None and inspect.isgenerator(value) and _is_stream_container(rettype):
+            container = self.decorate(context, rettype, rettype.construct(context, ()))
+            container.extend_from_stream(context, value, spirit=context.spirit, display=True)
+            return (rettype, container)
+
         # 返り値型に値が適合しない場合は、型変換を行う
         if not rettype.check_value_type(type(value)):
             value = rettype.construct(context, value)
 
         # デコレータを適用する
         if self.decorator is not None:
-            if isinstance(self.decorator, str): # コンパイルする
-                from machaon.core.function import parse_sequential_function
-                self.decorator = parse_sequential_function(self.decorator, context, argspec=rettype)
-            
-            value = self.decorator(value)
-            if not rettype.check_value_type(type(value)): # 必要なら、さらに型変換を行う
-                value = rettype.construct(context, value)
+            value = self.decorate(context, rettype, value)
 
         return (rettype, value)
+    
+    def decorate(self, context, rettype, value):
+        """ デコレータを適用する """
+        if isinstance(self.decorator, str): # コンパイルする
+            from machaon.core.function import parse_sequential_function
+            self.decorator = parse_sequential_function(self.decorator, context, argspec=rettype)
+        
+        value = self.decorator(value)
+        if not rettype.check_value_type(type(value)): # 必要なら、さらに型変換を行う
+            value = rettype.construct(context, value)
+        return value
 
     def resolve_type(self, context):
         """ 型を解決する """
         self.typedecl = self.typedecl.resolve(context)
 
 
+def _is_stream_container(rettype):
+    """ イテラブルから少しずつ読み込める値の型か """
+    try:
+        valuetype = rettype.get_value_type()
+    except NotImplementedError:
+        return False
+    return hasattr(valuetype, "extend_from_stream")
+
+
 def parse_parameter_line(line, index=None):
     """
     Params:
@@ -1500,6 +1536,15 @@ def select_method_from_type_and_instance(value_type, value, name):
     Returns:
         Optional[Method]:
     """   
+    if value_type is value:
+        # クラスのメンバから作ったメソッドはクラスごとにキャッシュする
+        methods = get_class_reflection(value_type).methods
+        if name in methods:
+            return methods[name]
+        return methods.setdefault(name, _select_method_from_type_and_instance(value_type, value, name))
+    return _select_method_from_type_and_instance(value_type, value, name)
+
+def _select_method_from_type_and_instance(value_type, value, name):
     invasdict = _InvokeasTypeDict(value_type)
     invtype = invasdict.get(name)
     if invtype is None:
@@ -1518,6 +1563,10 @@ def select_method_from_type_and_instance(value_type, value, name):
 
 def is_method_selectable_from_type_and_instance(value_type, value, name):
     """ 呼び出せるかどうかだけチェックする """
+    if value_type is value:
+        methods = get_class_reflection(value_type).methods
+        if name in methods:
+            return methods[name] is not None
     invasdict = _InvokeasTypeDict(value_type)
     invtype = invasdict.get(name)
     if invtype is None:
@@ -1533,6 +1582,16 @@ def enum_methods_from_type_and_instance(value_type, value):
     Yields:
         Tuple[str, Method | Exception]:
     """
+    if value_type is value:
+        # クラスのメンバの列挙はクラスごとにキャッシュする
+        r = get_class_reflection(value_type)
+        if r.enumerated is None:
+            r.enumerated = list(_enum_methods_from_type_and_instance(value_type, value))
+        yield from r.enumerated
+        return
+    yield from _enum_methods_from_type_and_instance(value_type, value)
+
+def _enum_methods_from_type_and_instance(value_type, value):
     invasdict = _InvokeasTypeDict(value_type)
 
     from machaon.core.importer import enum_attributes
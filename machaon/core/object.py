@@ -1,9 +1,11 @@
-from typing import Any, Optional, List, Sequence, Dict, DefaultDict, Generator, TypeVar, Generic
+from typing import Any, Optional, List, Sequence, Dict, DefaultDict, Generator, TypeVar, Generic, Callable
 from collections import OrderedDict, defaultdict
 from copy import copy
+import threading
 
 from machaon.core.symbol import disp_qualified_name
 from machaon.core.type.basic import TypeProxy
+from machaon.core.displaycache import display_string, touch_display
 
 # imported from...
 # desktop
@@ -19,6 +21,8 @@ ObjectT = TypeVar('ObjectT')
 #
 #
 class Object(Generic[ObjectT]):
+    __slots__ = ("value", "type")
+
     def __init__(self, type, value=EMPTY_OBJECT):
         self.value: ObjectT = value
         self.type: TypeProxy = type
@@ -29,6 +33,9 @@ class Object(Generic[ObjectT]):
 
     def __repr__(self):
         return "<Object {1} [{0}]>".format(self.type.get_typename(), repr(self.value))
+
+    def __reduce__(self):
+        return (type(self), (self.type, self.value))
     
     def __str__(self):
         return "{1} [{0}]".format(self.type.get_typename(), self.summarize())
@@ -119,6 +126,8 @@ def _error_string(e, method):
 
 #
 class PrettyObject(Object):
+    __slots__ = ()
+
     def is_pretty(self):
         return True
 
@@ -129,6 +138,8 @@ class PrettyObject(Object):
 #
 #
 class ObjectCollectionItem:
+    __slots__ = ("ident", "name", "selected", "object")
+
     def __init__(self, ident, name, obj):
         self.ident: int = ident
         self.name: Optional[str] = name
@@ -160,11 +171,15 @@ class ObjectCollection():
     メソッド名がそのままメンバ参照になる。
     """
     def __init__(self):
-        self._items: Dict[int, ObjectCollectionItem] = {}
+        self._items: Dict[int, ObjectCollectionItem] = {} # 全ての履歴
         self._namemap: DefaultDict[str, List[int]] = defaultdict(list)
+        self._latest: Dict[str, ObjectCollectionItem] = {} # 名前 -> 最後に追加された値
+        self._nextident = 0 # 削除後も再利用しない
+        self._spilled: Dict[str, Callable[[], Object]] = {} # 名前 -> 退避された値を読み込む関数
+        self._spill_lock = threading.RLock() # 退避と読み込みは別のスレッドから行われうる
     
     def __contains__(self, key):
-        return key in self._namemap
+        return key in self._latest
     
     def __len__(self):
         return len(self._items)
@@ -180,10 +195,15 @@ class ObjectCollection():
         # オブジェクトを追加
         if not isinstance(obj, Object):
             raise TypeError("obj")
-        newident = len(self._items)
+        newident = self._nextident
+        self._nextident += 1
         item = ObjectCollectionItem(newident, name, obj)
         self._items[newident] = item
         self._namemap[name].append(newident)
+        self._latest[name] = item
+        if self._spilled:
+            self._discard_spilled(name)
+        touch_display(self)
         return item
 
     def new(self, name:str, value: Any, type: Any) -> ObjectCollectionItem:
@@ -195,27 +215,36 @@ class ObjectCollection():
         # オブジェクトを代入
         if not isinstance(value, Object):
             raise TypeError()
-        if name in self._namemap:
+        if name in self._latest:
             idents = self._namemap[name]
             ident = idents[0]
             item = ObjectCollectionItem(ident, name, value)
             self._items[ident] = item
-            for delident in idents[1:]:
-                del self._items[delident]
+            if len(idents) > 1:
+                # 同名の値を1つにまとめる
+                for delident in idents[1:]:
+                    del self._items[delident]
+                del idents[1:]
+            self._latest[name] = item
+            if self._spilled:
+                self._discard_spilled(name)
+            touch_display(self)
             return item
         else:
             return self.push(name, value)
 
     def pick(self, name) -> Generator[ObjectCollectionItem, None, None]:
         # 名前で検索する
-        if name not in self._namemap:
+        if name not in self._latest:
             return
         for ident in self._namemap[name]:
             yield self._items[ident]
     
     def get(self, name) -> Optional[ObjectCollectionItem]:
-        li = list(self.pick(name))
-        return li[-1] if li else None
+        item = self._latest.get(name)
+        if self._spilled and item is not None and name in self._spilled:
+            self._reload(name, item) # ロックをとるのは退避された名前のみ
+        return item
 
     def pick_all(self) -> Generator[ObjectCollectionItem, None, None]:
         # 全てのオブジェクトを取得
@@ -223,11 +252,61 @@ class ObjectCollection():
             yield item
     
     def delete(self, name):
-        if name not in self._namemap:
+        if name not in self._latest:
             return
         for ident in self._namemap[name]:
             del self._items[ident]
         del self._namemap[name]
+        del self._latest[name]
+        self._discard_spilled(name)
+        touch_display(self)
+    
+    #
+    # 値の退避
+    #
+    def evict(self, name, placeholder: Object, loader: Callable[[], Object] = None) -> Optional[ObjectCollectionItem]:
+        """
+        最後の値を代わりのオブジェクトに置き換え、保持していた値を手放す。
+        Params:
+            name(str): 名前
+            placeholder(Object): 代わりに置くオブジェクト
+            loader(Callable[[], Object]): 参照された時に元の値を読み込む関数
+        """
+        with self._spill_lock:
+            item = self._latest.get(name)
+            if item is None:
+                return None
+            item.object = placeholder
+            self._discard_spilled(name)
+            if loader is not None:
+                self._spilled[name] = loader
+            return item
+    
+    def is_spilled(self, name):
+        """ 値が退避されていて、未だ読み込まれていないか """
+        return name in self._spilled
+    
+    def _reload(self, name, item):
+        with self._spill_lock:
+            loader = self._spilled.get(name)
+            if loader is None:
+                return # 他のスレッドが読み込んだ
+            item.object = loader()
+            del self._spilled[name] # 値を置き換えてから、退避の記録を消す
+    
+    def _discard_spilled(self, name):
+        """ 読み込まれないまま不要になった退避先を片付ける """
+        with self._spill_lock:
+            loader = self._spilled.pop(name, None)
+        if loader is not None:
+            discard = getattr(loader, "discard", None)
+            if discard is not None:
+                discard()
+    
+    def discard_all_spilled(self):
+        """ 全ての退避先を片付ける。値は要約に置き換えられたまま残る """
+        for name in list(self._spilled.keys()):
+            self._discard_spilled(name)
     
     def get_extend_base(self):        
         # 移譲先のオブジェクトを返す
@@ -252,8 +331,7 @@ class ObjectCollection():
             Any:
         """
         d = {}
-        for _name, ids in self._namemap.items():
-            item = self._items[ids[-1]]
+        for item in self._latest.values():
             d[item.name] = item.value 
         return context.get_py_type(dict).new_object(d)
     
@@ -263,7 +341,7 @@ class ObjectCollection():
         Returns:
             Tuple[str]:
         """
-        for name, ids in self._namemap.items():
+        for name in self._latest.keys():
             yield name
             
     def values(self):
@@ -272,8 +350,8 @@ class ObjectCollection():
         Returns:
             Tuple[Any]:
         """
-        for name, ids in self._namemap.items():
-            yield self._items[ids[-1]].value
+        for item in self._latest.values():
+            yield item.value
 
     def method_push(self, key, value):
         """ @method alias-name [push]
@@ -300,9 +378,7 @@ class ObjectCollection():
         """ @meta """
         heads = []
         trail = ""
-        for name, ids in self._namemap.items():
-            if not ids:
-                continue
+        for name in self._latest.keys():
             heads.append(str(name))
             if len(heads) > 4:
                 trail = "..."
@@ -322,7 +398,7 @@ class ObjectCollection():
                 for i in ids:
                     n = str(name)
                     o = self._items[i].object
-                    sm = o.summarize()
+                    sm = display_string(o)
                     tn = o.get_typename()
                     rows_.append([n, sm, tn])
             rows = [(i,x) for i,x in enumerate(rows_)]
@@ -0,0 +1,317 @@
+"""
+オブジェクトのバイナリ形式での保存と読み込み。
+
+シートやタプルなどの大きな値を再計算せずに復元できるよう、型の変換名とともに値をファイルに書き出す。
+値はpickleのプロトコル5で直列化し、PickleBufferを提供する値（numpyの配列など）のバッファはpickleの外に並べて書き出す。
+読み込み時はファイルをメモリマップし、バッファの中身は実際に触れられた時点でページが読み込まれる。
+値の中にある型オブジェクトとコンテキストは、変換名に置き換えて保存し、読み込み時に解決しなおす。
+
+ファイルの構造：
+    MAGIC | ヘッダ長(4バイト) | ヘッダ(JSON) | pickle本体 | バッファ...
+"""
+import os
+import io
+import gc
+import json
+import mmap
+import pickle
+import struct
+import copyreg
+from contextlib import contextmanager
+from typing import Optional
+
+from machaon.core.object import Object
+from machaon.core.type.basic import TypeProxy
+from machaon.core.type.pytype import PythonType
+from machaon.core.context import InvocationContext
+
+OBJECT_STORE_MAGIC = b"MCNOBJ\x00\x01"
+OBJECT_STORE_VERSION = 1
+OBJECT_STORE_PROTOCOL = 5 # バッファをpickleの外に書き出せるプロトコル
+OBJECT_STORE_EXTENSION = ".mobj"
+OBJECT_STORE_ALIGN = 64 # バッファの開始位置の境界
+OBJECT_STORE_DIRNAME = "objects" # 保存ディレクトリの中で、メッセージのファイルと分けて置く
+
+#
+#
+#
+class ObjectStoreError(Exception):
+    pass
+
+
+def _resolve_stored_type(index):
+    """ 読み込み時にUnpicklerのメソッドに差し替えられる """
+    raise ObjectStoreError("型の参照は_ObjectUnpicklerでのみ解決できます")
+
+def _resolve_stored_context():
+    """ 読み込み時にUnpicklerのメソッドに差し替えられる """
+    raise ObjectStoreError("コンテキストの参照は_ObjectUnpicklerでのみ解決できます")
+
+def _reduce_context(_context):
+    return (_resolve_stored_context, ())
+
+
+class _ReducerTable(dict):
+    """
+    クラスごとの直列化の方法。クラスを初めて見た時に決める。
+    型とコンテキストは、全体を書き出さずに参照に置き換える。
+    """
+    def __init__(self, pickler):
+        super().__init__()
+        self._pickler = pickler
+
+    def __missing__(self, cls):
+        if issubclass(cls, TypeProxy) and not issubclass(cls, PythonType): # Pythonの型はクラスの参照として書き出す
+            fn = self._pickler.reduce_type
+        elif issubclass(cls, InvocationContext):
+            fn = _reduce_context
+        else:
+            fn = copyreg.dispatch_table.get(cls)
+            if fn is None:
+                fn = self._pickler.reduce_default
+        self[cls] = fn
+        return fn
+
+
+class _ObjectPickler(pickle.Pickler):
+    """ 型とコンテキストを参照として書き出す """
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        self.types = [] # 変換名
+        self._typeindex = {} # id(TypeProxy) -> (index, TypeProxy)
+        self.dispatch_table = _ReducerTable(self)
+
+    def reduce_type(self, t):
+        entry = self._typeindex.get(id(t))
+        if entry is None:
+            entry = (len(self.types), t)
+            self._typeindex[id(t)] = entry
+            self.types.append(t.get_conversion())
+        return (_resolve_stored_type, (entry[0],))
+
+    def reduce_default(self, obj):
+        return obj.__reduce_ex__(OBJECT_STORE_PROTOCOL)
+
+
+class _ObjectUnpickler(pickle.Unpickler):
+    """ 参照された型とコンテキストを解決する """
+    def __init__(self, file, *, types, resolver, context, **kwargs):
+        super().__init__(file, **kwargs)
+        self._types = types
+        self._resolved = {}
+        self._resolver = resolver
+        self._context = context
+
+    def find_class(self, module, name):
+        if module == __name__:
+            if name == "_resolve_stored_type":
+                return self.resolve_type
+            elif name == "_resolve_stored_context":
+                return self.resolve_context
+        return super().find_class(module, name)
+
+    def resolve_type(self, index):
+        t = self._resolved.get(index)
+        if t is None:
+            t = self._resolver(self._types[index])
+            self._resolved[index] = t
+        return t
+
+    def resolve_context(self):
+        return self._context
+
+
+@contextmanager
+def _gc_paused():
+    """ 大量のオブジェクトを作る間、循環参照の回収を止める """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _aligned(n):
+    return (n + OBJECT_STORE_ALIGN - 1) // OBJECT_STORE_ALIGN * OBJECT_STORE_ALIGN
+
+#
+# 書き出し
+#
+def dump_object(path, obj: Object) -> int:
+    """
+    オブジェクトをファイルに書き出す。
+    Params:
+        path(str): ファイルパス
+        obj(Object):
+    Returns:
+        int: 書き出したバイト数
+    """
+    buffers = []
+    body = io.BytesIO()
+    pickler = _ObjectPickler(body, protocol=OBJECT_STORE_PROTOCOL, buffer_callback=buffers.append)
+    try:
+        with _gc_paused():
+            pickler.dump((obj.type, obj.value))
+    except Exception as e:
+        raise ObjectStoreError("'{}'の値は保存できません: {}".format(obj.get_typename(), e)) from e
+    body = body.getbuffer()
+    raws = [b.raw() for b in buffers]
+
+    # 配置を決める
+    header = {
+        "version" : OBJECT_STORE_VERSION,
+        "conversion" : obj.type.get_conversion(),
+        "types" : pickler.types,
+        "pickle" : None,
+        "buffers" : [],
+    }
+    def layout(headersize):
+        offset = _aligned(len(OBJECT_STORE_MAGIC) + 4 + headersize)
+        header["pickle"] = [offset, body.nbytes]
+        offset = _aligned(offset + body.nbytes)
+        header["buffers"] = []
+        for raw in raws:
+            header["buffers"].append([offset, raw.nbytes])
+            offset = _aligned(offset + raw.nbytes)
+        return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    headerbytes = layout(0)
+    while True: # オフセットの桁が増えてヘッダが伸びたらやり直す
+        newheader = layout(len(headerbytes))
+        if len(newheader) == len(headerbytes):
+            break
+        headerbytes = newheader
+
+    dirpath = os.path.dirname(path)
+    if dirpath:
+        os.makedirs(dirpath, exist_ok=True)
+    temppath = path + ".tmp"
+    with open(temppath, "wb") as fo:
+        fo.write(OBJECT_STORE_MAGIC)
+        fo.write(struct.pack("<I", len(headerbytes)))
+        fo.write(headerbytes)
+        for (offset, _size), data in zip([header["pickle"], *header["buffers"]], [body, *raws]):
+            fo.write(b"\0" * (offset - fo.tell()))
+            fo.write(data)
+        size = fo.tell()
+    os.replace(temppath, path) # 書き出しが完了してから置き換える
+    return size
+
+#
+# 読み込み
+#
+def read_object_header(path) -> dict:
+    """
+    ファイルのヘッダを読む。
+    Params:
+        path(str): ファイルパス
+    Returns:
+        dict: version, conversion, types, pickle, buffers
+    """
+    with open(path, "rb") as fi:
+        magic = fi.read(len(OBJECT_STORE_MAGIC))
+        if magic != OBJECT_STORE_MAGIC:
+            raise ObjectStoreError("'{}'は保存されたオブジェクトのファイルではありません".format(path))
+        headersize, = struct.unpack("<I", fi.read(4))
+        header = json.loads(fi.read(headersize).decode("utf-8"))
+    if header.get("version") != OBJECT_STORE_VERSION:
+        raise ObjectStoreError("'{}'は未対応の形式です: version={}".format(path, header.get("version")))
+    return header
+
+
+def load_object(path, context=None, *, typemodule=None) -> Object:
+    """
+    ファイルからオブジェクトを復元する。
+    Params:
+        path(str): ファイルパス
+        context(InvocationContext): 型を解決するコンテキスト
+        typemodule(TypeModule): コンテキストが無い場合に型を解決する
+    Returns:
+        Object:
+    """
+    if context is not None:
+        resolver = context.instantiate_type
+    elif typemodule is not None:
+        def resolver(conversion):
+            t = typemodule.get(conversion)
+            if t is None:
+                raise ObjectStoreError("型'{}'が見つかりません".format(conversion))
+            return t
+    else:
+        raise ValueError("contextかtypemoduleが必要です")
+
+    header = read_object_header(path)
+    with open(path, "rb") as fi:
+        # 書き込み可能なバッファを要求する値のために、コピーオンライトでマップする
+        mm = mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = None
+    buffers = []
+    try:
+        view = memoryview(mm)
+        offset, size = header["pickle"]
+        buffers = [view[o:o+n] for o, n in header["buffers"]]
+        unpickler = _ObjectUnpickler(
+            io.BytesIO(view[offset:offset+size]), 
+            types=header["types"], resolver=resolver, context=context, buffers=buffers
+        )
+        with _gc_paused():
+            t, value = unpickler.load()
+    except ObjectStoreError:
+        raise
+    except Exception as e:
+        raise ObjectStoreError("'{}'からオブジェクトを復元できません: {}".format(path, e)) from e
+    finally:
+        buffers.clear()
+        view = None
+        try:
+            mm.close()
+        except BufferError:
+            pass # 値がバッファを参照している間はマップを残す
+    return Object(t, value)
+
+#
+# 保存先
+#
+def get_object_store_path(root, name) -> str:
+    """ オブジェクト名からファイルパスを得る
+    Params:
+        root(AppRoot):
+        name(str): /区切りの相対パス
+    """
+    d = os.path.join(root.get_store_dir(), OBJECT_STORE_DIRNAME)
+    return os.path.join(d, *name.split("/")) + OBJECT_STORE_EXTENSION
+
+
+class StoredObject:
+    """
+    ファイルに保存されたオブジェクト。呼び出すと読み込む。
+    ObjectCollection.evictのローダーとして渡すことができる。
+    """
+    def __init__(self, path, *, context=None, typemodule=None, remove=False):
+        self.path = path
+        self.context = context
+        self.typemodule = typemodule
+        self.remove = remove # 読み込んだ後にファイルを削除する
+
+    @classmethod
+    def store(cls, path, obj: Object, **kwargs) -> Optional['StoredObject']:
+        """ 書き出す。書き出せない値であればNoneを返す """
+        try:
+            dump_object(path, obj)
+        except ObjectStoreError:
+            return None
+        return cls(path, **kwargs)
+
+    def __call__(self) -> Object:
+        obj = load_object(self.path, self.context, typemodule=self.typemodule)
+        self.discard()
+        return obj
+
+    def discard(self):
+        """ 読み込んだ後に削除する設定であれば、ファイルを削除する """
+        if self.remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass # マップが残っているとWindowsでは削除できない
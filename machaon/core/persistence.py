@@ -17,6 +17,7 @@ def get_persistent_path(root, name):
 
 def enum_persistent_names(root):
     """ machaon標準ディレクトリからファイルを読み込む """
+    from machaon.core.objectstore import OBJECT_STORE_EXTENSION
     n = []
     d = root.get_store_dir()
     for dirpath, _dirnames, filenames in os.walk(d):
@@ -29,7 +30,9 @@ def enum_persistent_names(root):
             parts.reverse()
 
         for filename in filenames:
-            name, _ = os.path.splitext(filename)
+            name, ext = os.path.splitext(filename)
+            if ext == OBJECT_STORE_EXTENSION:
+                continue # 保存されたオブジェクトはメッセージではない
             fullname = "/".join(parts + [name])
             n.append(fullname)
     return n
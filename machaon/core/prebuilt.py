@@ -0,0 +1,152 @@
+"""
+ビルド時に抽出したモジュールのドキュメント文字列。
+
+型の定義を読み込むたびにソースコード全体の構文木を作らなくて済むよう、
+モジュールとクラスのドキュメント文字列をあらかじめファイルに書き出しておく。
+ソースコードが書き出し後に変更されていた場合は使用しない。
+
+このモジュールはsetup.pyからも読み込まれるため、machaonの他のモジュールに依存しない。
+"""
+import os
+import ast
+import json
+import zlib
+
+PREBUILT_VERSION = 1
+PREBUILT_FILENAME = os.path.join("configs", "prebuilt", "moduledocs.json")
+SIGIL_DEFINITION_DOC = "@"
+
+_package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # machaon/
+_prebuilt = None
+
+#
+# 抽出
+#
+def read_module_docs(tree):
+    """
+    構文木からモジュールと、定義の印のあるクラスのドキュメント文字列を取り出す
+    Params:
+        tree(ast.Module):
+    Returns:
+        Tuple[Optional[str], List[Tuple[str, str]]]: モジュールのドキュメント, (クラス名, ドキュメント)[]
+    """
+    moduledoc = ast.get_docstring(tree)
+    classes = []
+    for node in ast.iter_child_nodes(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        doc = ast.get_docstring(node)
+        if not doc:
+            continue
+        doc = doc.lstrip()
+        if not doc.startswith(SIGIL_DEFINITION_DOC):
+            continue
+        classes.append((node.name, doc))
+    return moduledoc, classes
+
+def _source_checksum(source: bytes):
+    return zlib.crc32(source)
+
+def build_module_docs(package_dir=None, outpath=None):
+    """
+    パッケージ内の全てのモジュールからドキュメント文字列を抽出し、書き出す
+    Params:
+        package_dir(str): machaonパッケージのディレクトリ
+        outpath(str): 出力先のファイルパス
+    Returns:
+        str: 出力先のファイルパス
+    """
+    package_dir = package_dir or _package_dir
+    outpath = outpath or os.path.join(package_dir, PREBUILT_FILENAME)
+
+    modules = {}
+    for dirpath, dirnames, filenames in os.walk(package_dir, topdown=True):
+        dirnames[:] = [x for x in dirnames if not x.startswith((".", "__"))]
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as fi:
+                source = fi.read()
+            try:
+                tree = compile(source, path, 'exec', ast.PyCF_ONLY_AST)
+            except SyntaxError:
+                continue
+            moduledoc, classes = read_module_docs(tree)
+            if moduledoc and not moduledoc.lstrip().startswith(SIGIL_DEFINITION_DOC):
+                moduledoc = None # 宣言でないドキュメントは記録しない
+            st = os.stat(path)
+            relpath = os.path.relpath(path, package_dir).replace(os.sep, "/")
+            modules[relpath] = {
+                "mtime" : st.st_mtime_ns,
+                "size" : len(source),
+                "checksum" : _source_checksum(source),
+                "doc" : moduledoc,
+                "classes" : classes,
+            }
+
+    os.makedirs(os.path.dirname(outpath), exist_ok=True)
+    with open(outpath, "w", encoding="utf-8") as fo:
+        json.dump({"version": PREBUILT_VERSION, "modules": modules}, fo, ensure_ascii=False, separators=(",", ":"))
+    return outpath
+
+#
+# 読み込み
+#
+def _load_prebuilt():
+    global _prebuilt
+    if _prebuilt is None:
+        modules = {}
+        path = os.path.join(_package_dir, PREBUILT_FILENAME)
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as fi:
+                    data = json.load(fi)
+                if data.get("version") == PREBUILT_VERSION:
+                    modules = data["modules"]
+            except (OSError, ValueError, KeyError):
+                modules = {} # 壊れたファイルは無視する
+        _prebuilt = modules
+    return _prebuilt
+
+def get_prebuilt_module_docs(filepath):
+    """
+    書き出し済みのドキュメント文字列を取得する。
+    ソースが書き出し後に変更されていれば、Noneを返す
+    Params:
+        filepath(str): モジュールのソースファイルパス
+    Returns:
+        Optional[Tuple[Optional[str], List[Tuple[str, str]]]]:
+    """
+    filepath = os.path.abspath(filepath)
+    if not filepath.startswith(_package_dir + os.sep):
+        return None
+    modules = _load_prebuilt()
+    if not modules:
+        return None
+    relpath = os.path.relpath(filepath, _package_dir).replace(os.sep, "/")
+    entry = modules.get(relpath)
+    if entry is None:
+        return None
+
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    if st.st_size != entry["size"]:
+        return None
+    if st.st_mtime_ns > entry["mtime"]:
+        # ソースの方が新しい：インストール時に時刻だけ変わった場合に備え、内容を比べる
+        with open(filepath, "rb") as fi:
+            if _source_checksum(fi.read()) != entry["checksum"]:
+                return None
+    return entry["doc"], [tuple(x) for x in entry["classes"]]
+
+def clear_prebuilt_cache():
+    """ 読み込んだ内容を破棄する """
+    global _prebuilt
+    _prebuilt = None
+
+
+if __name__ == "__main__":
+    print(build_module_docs())
@@ -0,0 +1,207 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+#
+# 計測の種類
+#
+PROFILE_PHASE = "phase"
+PROFILE_IMPORT = "import"
+PROFILE_TYPE = "type"
+
+#
+#
+#
+class StartupProfileRecord:
+    """ @type
+    起動処理の計測結果の1項目。
+    """
+    __slots__ = ("kind", "name", "start", "elapsed", "depth")
+
+    def __init__(self, kind, name, start, elapsed=0.0, depth=0):
+        self.kind: str = kind
+        self.name: str = name
+        self.start: float = start # 計測開始からの秒数
+        self.elapsed: float = elapsed # 秒数
+        self.depth: int = depth # 入れ子の深さ
+
+    def __repr__(self):
+        return "<StartupProfileRecord {} {} {:.3f}ms>".format(self.kind, self.name, self.elapsed * 1000)
+
+    def get_kind(self):
+        """ @method alias-name [kind]
+        計測の種類。(phase|import|type)
+        Returns:
+            Str:
+        """
+        return self.kind
+
+    def get_name(self):
+        """ @method alias-name [name]
+        段階名・モジュール名・デスクライバ名。
+        Returns:
+            Str:
+        """
+        return "  " * self.depth + self.name
+
+    def get_elapsed(self):
+        """ @method alias-name [elapsed]
+        経過時間（ミリ秒）。
+        Returns:
+            Float:
+        """
+        return round(self.elapsed * 1000, 3)
+
+    def get_start(self):
+        """ @method alias-name [start]
+        計測開始からの時刻（ミリ秒）。
+        Returns:
+            Float:
+        """
+        return round(self.start * 1000, 3)
+
+    def get_depth(self):
+        """ @method alias-name [depth]
+        入れ子の深さ。
+        Returns:
+            Int:
+        """
+        return self.depth
+
+
+class StartupProfiler:
+    """
+    起動処理の各段階・モジュールのインポート・型のロードにかかった時間を記録する。
+    """
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._records: List[StartupProfileRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._importhook: Optional[_ImportTimer] = None
+
+    def start(self):
+        """ インポートの計測を開始する """
+        if self._importhook is None:
+            self._importhook = _ImportTimer(self)
+            sys.meta_path.insert(0, self._importhook)
+        return self
+
+    def stop(self):
+        """ インポートの計測を終了する """
+        if self._importhook is not None:
+            if self._importhook in sys.meta_path:
+                sys.meta_path.remove(self._importhook)
+            self._importhook = None
+        return self
+
+    def is_running(self):
+        return self._importhook is not None
+
+    #
+    # 記録
+    #
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def measure(self, kind, name):
+        """ ブロックの経過時間を記録する """
+        stack = self._stack()
+        begin = time.perf_counter()
+        rec = StartupProfileRecord(kind, name, begin - self._origin, depth=len(stack))
+        stack.append(rec)
+        try:
+            yield rec
+        finally:
+            rec.elapsed = time.perf_counter() - begin
+            stack.pop()
+            with self._lock:
+                self._records.append(rec)
+
+    def phase(self, name):
+        """ 起動処理の段階を計測する """
+        return self.measure(PROFILE_PHASE, name)
+
+    def records(self, kind=None) -> List[StartupProfileRecord]:
+        """ 記録を開始時刻順に返す """
+        with self._lock:
+            recs = [x for x in self._records if kind is None or x.kind == kind]
+        recs.sort(key=lambda x: (x.start, x.depth))
+        return recs
+
+    def total(self, kind=PROFILE_PHASE):
+        """ 入れ子になっていない記録の経過時間の合計 """
+        return sum(x.elapsed for x in self.records(kind) if x.depth == 0)
+
+    #
+    # 表示
+    #
+    def to_sheet(self, context, kind=None):
+        """ 記録をSheetオブジェクトにする """
+        from machaon.types.sheet import Sheet
+        t = context.type_module.select(StartupProfileRecord)
+        objs = [context.new_object(x, type=t) for x in self.records(kind)]
+        sheet = Sheet(objs, context=context, columns=["kind", "name", "elapsed", "start"])
+        return context.new_object(sheet, type="Sheet")
+
+    def pprint(self, context, spirit, kind=None):
+        """ 記録をSheetとして表示する """
+        sheet = self.to_sheet(context, kind).value
+        spirit.post("message", "起動処理の計測結果：{:.1f}ms".format(self.total() * 1000))
+        rows = sheet.rows_to_string_table(context, "summarize")
+        columns = [x.get_name() for x in sheet.get_current_columns()]
+        spirit.post("object-sheetview", rows=rows, columns=columns, context=context, tabletype="sheet")
+
+
+#
+# インポートにかかった時間を計測する
+#
+class _ImportTimer:
+    """ 他のファインダーが返すローダーを計測用のものに差し替える """
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        spec = None
+        for finder in sys.meta_path:
+            if finder is self or isinstance(finder, _ImportTimer):
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+    def invalidate_caches(self):
+        pass
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 実行前に本来のローダーに戻しておく
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.measure(PROFILE_IMPORT, module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
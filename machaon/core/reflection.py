@@ -0,0 +1,63 @@
+"""
+クラスの属性の調査結果のキャッシュ。
+
+型として登録されていないPythonオブジェクトのメソッドを呼び出すたびに、
+クラスの属性の列挙やinspectによる調査をやり直さずに済むよう、クラスごとに結果を保持する。
+クラスが実行時に書き換えられた場合は、clear_reflection_cacheを呼ぶ必要がある。
+"""
+import threading
+import weakref
+from typing import Dict, Optional, Any
+
+#
+#
+#
+class ClassReflection:
+    """
+    クラスごとの属性の調査結果。
+    """
+    __slots__ = ("methods", "members", "enumerated", "__weakref__")
+
+    def __init__(self):
+        self.methods: Dict[str, Any] = {} # name -> Optional[Method] : 呼び出し方と引数の数を含む
+        self.members: Dict[type, list] = {} # 順位付けの基準になった型 -> 定義順の属性のリスト
+        self.enumerated: Optional[list] = None # 列挙されたメソッドのリスト
+
+
+#
+# クラスごとのキャッシュ：クラスが破棄されたら項目も削除する
+#
+_reflections: Dict[int, tuple] = {} # id(class) -> (weakref(class), ClassReflection)
+_reflections_lock = threading.Lock()
+
+def get_class_reflection(klass) -> ClassReflection:
+    """ クラスの調査結果を取得する """
+    entry = _reflections.get(id(klass))
+    if entry is not None and entry[0]() is klass:
+        return entry[1]
+
+    with _reflections_lock:
+        entry = _reflections.get(id(klass))
+        if entry is not None and entry[0]() is klass:
+            return entry[1]
+        r = ClassReflection()
+        key = id(klass)
+        def _discard(_ref, key=key):
+            with _reflections_lock:
+                e = _reflections.get(key)
+                if e is not None and e[0] is _ref:
+                    del _reflections[key]
+        try:
+            ref = weakref.ref(klass, _discard)
+        except TypeError:
+            return r # 弱参照を作れないクラスはキャッシュしない
+        _reflections[key] = (ref, r)
+        return r
+
+def clear_reflection_cache(klass=None):
+    """ クラスが書き換えられた時に、調査結果を破棄する """
+    with _reflections_lock:
+        if klass is None:
+            _reflections.clear()
+        else:
+            _reflections.pop(id(klass), None)
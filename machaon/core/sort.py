@@ -1,4 +1,5 @@
-from typing import Sequence, List, Any, Tuple
+import heapq
+from typing import Sequence, List, Any, Tuple, Optional
 
 #
 class BadPredicateError(Exception):
@@ -61,6 +62,10 @@ class Sortkey():
     def get_related_members(self) -> List[str]:
         return [x for (x,_) in self._predicates]
 
+    def get_predicates(self) -> List[Tuple[str, bool]]:
+        """ メンバ名と昇順かどうかの組 """
+        return self._predicates
+
 #
 #
 #
@@ -78,3 +83,88 @@ def parse_sortkey(expression: str):
         key.add(predicate, ascend)
     
     return key
+
+#
+# キーの値による並べ替え
+#
+_NUMBER_TYPES = (bool, int, float)
+
+class _Descending():
+    """ 比較を反転する """
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+    
+    def __lt__(self, right):
+        return right.key < self.key
+    
+    def __eq__(self, right):
+        return self.key == right.key
+
+
+def make_sortkey_column(values: Sequence[Any]) -> List[Any]:
+    """
+    値の列を、互いに比較できるキーの列に変換する。
+    Noneは他のどの値よりも小さいものとする。型の混在する列は、型名で先に分ける。
+    Params:
+        values(Sequence[Any]):
+    Returns:
+        List[Any]:
+    """
+    hasnone = False
+    types = set()
+    for v in values:
+        if v is None:
+            hasnone = True
+        else:
+            types.add(_NUMBER_TYPES if isinstance(v, _NUMBER_TYPES) else type(v))
+    
+    if len(types) <= 1:
+        if not hasnone:
+            return list(values) # そのまま比較する
+        return [(False,) if v is None else (True, v) for v in values]
+    
+    def typename(v):
+        return "" if isinstance(v, _NUMBER_TYPES) else type(v).__qualname__
+    return [(False,) if v is None else (True, typename(v), v) for v in values]
+
+def sort_by_keys(indices: List[int], keycolumns: Sequence[Tuple[Sequence[Any], bool]], top: Optional[int] = None) -> List[int]:
+    """
+    キーの列で安定な並べ替えを行う。
+    Params:
+        indices(List[int]): 並べ替える要素の番号
+        keycolumns(Sequence[Tuple[Sequence[Any], bool]]): 要素の番号で引くキーの値と、昇順かどうか
+        top(Optional[int]): 先頭から指定の数だけを返す
+    Returns:
+        List[int]: 並べ替えた要素の番号
+    """
+    try:
+        return _sort_by_keys(indices, keycolumns, top)
+    except TypeError:
+        pass
+    # 比較できない値があれば、文字列にして比較する
+    return _sort_by_keys(indices, keycolumns, top, str)
+
+def _sort_by_keys(indices, keycolumns, top, convert=None):
+    columns = []
+    for values, ascend in keycolumns:
+        vals = [values[i] for i in indices]
+        if convert is not None:
+            vals = [None if v is None else convert(v) for v in vals]
+        keys = [None] * len(values)
+        for i, k in zip(indices, make_sortkey_column(vals)):
+            keys[i] = k
+        columns.append((keys, ascend))
+    
+    if top is not None and top < len(indices):
+        # 合成したキーでヒープから取り出す
+        def key(i):
+            return tuple(k[i] if asc else _Descending(k[i]) for k, asc in columns)
+        return heapq.nsmallest(top, indices, key=key)
+
+    # 下位のキーから順に安定ソートを重ねる
+    result = list(indices)
+    for keys, ascend in reversed(columns):
+        result.sort(key=keys.__getitem__, reverse=not ascend)
+    return result
@@ -4,6 +4,7 @@ from .decl import *
 from .declparser import *
 from .type import *
 from .typemodule import *
+from .completion import *
 from .instance import *
 #
 from .extend import *
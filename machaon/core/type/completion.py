@@ -0,0 +1,178 @@
+import threading
+from bisect import bisect_left
+from typing import List, Optional, Iterable
+
+#
+# 補完候補の種類
+#
+COMPLETION_TYPE = 0x1
+COMPLETION_METHOD = 0x2
+COMPLETION_ALIAS = 0x4
+COMPLETION_ALL = COMPLETION_TYPE | COMPLETION_METHOD | COMPLETION_ALIAS
+
+#
+#
+#
+class CompletionEntry:
+    """
+    補完候補の1項目
+    """
+    __slots__ = ("word", "kind", "typename", "destination")
+
+    def __init__(self, word, kind, typename, destination=None):
+        self.word: str = word
+        self.kind: int = kind
+        self.typename: str = typename
+        self.destination: Optional[str] = destination # エイリアスの指す名前
+
+    def __repr__(self):
+        return "<CompletionEntry {} ({}) of {}>".format(self.word, self.kind, self.typename)
+
+    def is_type(self):
+        return self.kind == COMPLETION_TYPE
+
+    def is_method(self):
+        return self.kind == COMPLETION_METHOD
+
+    def is_alias(self):
+        return self.kind == COMPLETION_ALIAS
+
+
+class CompletionIndex:
+    """
+    型名・メソッド名・エイリアス名の前方一致検索用の索引。
+    ソート済みの配列を二分探索する。
+    """
+    def __init__(self):
+        self._keys: List[str] = []
+        self._entries: List[CompletionEntry] = []
+        self._added: List[CompletionEntry] = [] # 未マージの項目
+        self._reserved_types = {} # typename -> Type: メソッドが未索引の型
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            self._merge()
+            return len(self._entries)
+
+    #
+    # 項目の追加
+    #
+    def add(self, word, kind, typename, destination=None):
+        """ 項目を追加する。マージは次の検索時に行う """
+        with self._lock:
+            self._added.append(CompletionEntry(word, kind, typename, destination))
+
+    def add_type(self, type):
+        """ 型名を追加し、メソッドの索引を予約する """
+        typename = type.get_typename()
+        with self._lock:
+            self._added.append(CompletionEntry(typename, COMPLETION_TYPE, typename))
+            self._reserved_types[typename] = type
+
+    def reserve_type_methods(self, type):
+        """ メソッドの索引を作り直すよう予約する（mixinの追加時など） """
+        typename = type.get_typename()
+        with self._lock:
+            self._remove_members(typename)
+            self._reserved_types[typename] = type
+
+    def add_type_methods(self, type):
+        """ ロード済みの型のメソッド名とエイリアス名を追加する """
+        typename = type.get_typename()
+        entries = []
+        for name, dest in type.enum_member_names():
+            if dest is None:
+                entries.append(CompletionEntry(name, COMPLETION_METHOD, typename))
+            else:
+                entries.append(CompletionEntry(name, COMPLETION_ALIAS, typename, dest))
+        with self._lock:
+            self._added.extend(entries)
+
+    def _remove_members(self, typename):
+        """ 型のメソッドとエイリアスを取り除く """
+        self._merge()
+        keep = [x for x in self._entries if x.kind == COMPLETION_TYPE or x.typename != typename]
+        if len(keep) != len(self._entries):
+            self._entries = keep
+            self._keys = [x.word for x in keep]
+
+    def _merge(self):
+        """ 追加された項目をソート済み配列に統合する """
+        if not self._added:
+            return
+        entries = self._entries + self._added
+        entries.sort(key=lambda x: (x.word, x.kind, x.typename))
+        self._entries = entries
+        self._keys = [x.word for x in entries]
+        self._added = []
+
+    def load_reserved_types(self):
+        """ 予約された型のメソッド定義を読み込み、索引に加える """
+        with self._lock:
+            types = list(self._reserved_types.values())
+            self._reserved_types.clear()
+        for t in types:
+            try:
+                t.load_method_prototypes()
+            except Exception:
+                continue # 読み込めない型は型名のみを候補とする
+            self.add_type_methods(t)
+
+    #
+    # 検索
+    #
+    def complete(self, prefix: str, kinds: int = COMPLETION_ALL, *, typenames: Iterable[str] = None, limit: int = None) -> List[CompletionEntry]:
+        """
+        前方一致する項目を列挙する。
+        Params:
+            prefix(str): 入力中の文字列
+            kinds(int): COMPLETION_XXXの組み合わせ
+            typenames(Iterable[str]): メソッドを検索する型名
+            limit(int): 最大の個数
+        Returns:
+            List[CompletionEntry]:
+        """
+        results = []
+        if limit is not None and limit <= 0:
+            return results
+        for e in self._search(prefix, kinds, typenames):
+            results.append(e)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def complete_words(self, prefix: str, kinds: int = COMPLETION_ALL, *, typenames: Iterable[str] = None, limit: int = None) -> List[str]:
+        """ 前方一致する語を重複なく列挙する """
+        words = []
+        if limit is not None and limit <= 0:
+            return words
+        for e in self._search(prefix, kinds, typenames):
+            if words and words[-1] == e.word:
+                continue
+            words.append(e.word)
+            if limit is not None and len(words) >= limit:
+                break
+        return words
+
+    def _search(self, prefix, kinds, typenames):
+        """ 二分探索で開始位置を求め、前方一致する間だけ走査する """
+        if kinds & (COMPLETION_METHOD|COMPLETION_ALIAS) and self._reserved_types:
+            self.load_reserved_types()
+
+        with self._lock:
+            self._merge()
+            keys = self._keys
+            entries = self._entries
+
+        i = bisect_left(keys, prefix)
+        while i < len(keys):
+            if not keys[i].startswith(prefix):
+                break
+            e = entries[i]
+            i += 1
+            if not (e.kind & kinds):
+                continue
+            if typenames is not None and e.kind != COMPLETION_TYPE and e.typename not in typenames:
+                continue
+            yield e
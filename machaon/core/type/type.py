@@ -1,3 +1,5 @@
+import copy
+import threading
 from collections import defaultdict
 
 from typing import Any, Sequence, Union, Callable, ItemsView, Optional, Generator, DefaultDict, List, Dict, Tuple
@@ -49,6 +51,7 @@ class Type(TypeProxy):
         self._metamethods: Dict[str, Method] = {}
         self._params: List[MethodParameter] = params or []
         self._describers: List[TypeDescriber] = [describer]
+        self._load_lock = threading.RLock() # 定義の読み込みを直列化する
     
     def __str__(self):
         return "<Type '{}'>".format(self.typename)
@@ -82,16 +85,14 @@ class Type(TypeProxy):
         return self.flags & TYPE_LOADED > 0
     
     def copy(self):
-        t = Type()
-        t.typename = self.typename
-        t.doc = self.doc
-        t.flags = self.flags
-        t.value_type = self.value_type
+        """ 定義表を複製した型を作る。メソッド定義そのものは共有する """
+        t = copy.copy(self)
         t._methods = self._methods.copy()
-        t._methodalias = self._methodalias.copy()
+        t._methodalias = defaultdict(list, {k:v.copy() for k,v in self._methodalias.items()})
         t._metamethods = self._metamethods.copy()
         t._params = self._params.copy()
         t._describers = self._describers.copy()
+        t._load_lock = threading.RLock()
         return t
 
     def instantiate_params(self):
@@ -225,7 +226,22 @@ class Type(TypeProxy):
                 if a.get_destination() == truename:
                     l.append(aliasname)
         return l
-    
+
+    def enum_member_names(self):
+        """ ロード済みのメソッド名とエイリアス名を列挙する
+        Yields:
+            Tuple[str, Optional[str]]: 名前, エイリアスの場合は指し示すメソッド名
+        """
+        for name in self._methods.keys():
+            yield name, None
+        for aliasname, aliases in self._methodalias.items():
+            for a in aliases:
+                if a.is_group_alias():
+                    yield aliasname, " ".join(a.get_destination())
+                else:
+                    yield aliasname, a.get_destination()
+                break
+
     #
     # 型引数
     #
@@ -377,7 +393,12 @@ class Type(TypeProxy):
         """
         if self.is_loaded():
             return
+        with self._load_lock:
+            if self.is_loaded():
+                return
+            return self._load(typename, value_type, doc, bits, nodescribe)
 
+    def _load(self, typename, value_type, doc, bits, nodescribe):
         #　型の情報を定義させる
         if not nodescribe:
             self.describer.describe_type(self)
@@ -437,18 +458,22 @@ class Type(TypeProxy):
         """ メソッド定義を読み込む """
         if self.flags & TYPE_LOADED_METHODS > 0:
             return
-        for mixinkey, describer in enumerate(self._describers):
-            describer.describe_methods(self, mixinkey)
-        self.flags |= TYPE_LOADED_METHODS
+        with self._load_lock:
+            if self.flags & TYPE_LOADED_METHODS > 0:
+                return
+            for mixinkey, describer in enumerate(self._describers):
+                describer.describe_methods(self, mixinkey)
+            self.flags |= TYPE_LOADED_METHODS
     
     def mixin_method_prototypes(self, describer):
         """ ミキシンのメソッド定義を読み込む """
-        # 定義を追加する
-        self._describers.append(describer)
-        # 既に他のメソッドがロードされているなら、ただちに読み込む
-        if self.flags & TYPE_LOADED_METHODS > 0:
-            index = len(self._describers)-1
-            describer.describe_methods(self, index)
+        with self._load_lock:
+            # 定義を追加する
+            self._describers.append(describer)
+            # 既に他のメソッドがロードされているなら、ただちに読み込む
+            if self.flags & TYPE_LOADED_METHODS > 0:
+                index = len(self._describers)-1
+                describer.describe_methods(self, index)
 
     #
     # load前に値を設定する。describe_typeから呼ばれる
@@ -1,4 +1,6 @@
-from typing import Dict, Optional, List, Union, Any, Generator
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, List, Tuple, Union, Any, Generator
 
 from machaon.core.symbol import (
     BadTypename, normalize_typename, BadMethodName, PythonBuiltinTypenames, 
@@ -8,6 +10,7 @@ from machaon.core.symbol import (
 from machaon.core.type.decl import TypeProxy, SpecialTypeDecls
 from machaon.core.type.type import Type
 from machaon.core.type.describer import TypeDescriber, create_type_describer, detect_describer_name_type
+from machaon.core.type.completion import CompletionIndex, COMPLETION_ALL, COMPLETION_TYPE, COMPLETION_METHOD
 from machaon.core.error import ErrorSet
 from machaon.core.importer import module_loader, attribute_loader
 
@@ -27,17 +30,53 @@ TYPECODE_DESCRIBERNAME = 4
 
 SUBTYPE_BASE_ANY = 1
 
+# 共有されるオブジェクトの値の範囲
+POOLED_INT_MIN = -5
+POOLED_INT_MAX = 256
+POOLED_VALUE_TYPENAMES = {
+    type(None) : "None",
+    bool : "Bool",
+    int : "Int",
+    str : "Str",
+}
+
+
+#
+# 型の検索表
+#
+class TypeTables:
+    """
+    型の検索表。
+    公開された後は変更されず、書き込みは複製に対して行われる。
+    """
+    __slots__ = ("defs", "typenames", "describers", "valuetypes", "fundamentals", "objectpool")
+
+    def __init__(self, defs=None, typenames=None, describers=None, valuetypes=None):
+        self.defs: Dict[str, Type] = defs if defs is not None else {} # fulltypename -> Type
+        self.typenames: Dict[str, Tuple[str, ...]] = typenames if typenames is not None else {} # typename -> describername[]
+        self.describers: Dict[str, str] = describers if describers is not None else {} # describer -> fulltypename
+        self.valuetypes: Dict[str, str] = valuetypes if valuetypes is not None else {} # valuetypename -> fulltypename
+        # 検索結果のキャッシュ：複製には引き継がない
+        self.fundamentals: Dict[str, TypeProxy] = {} # typename -> Type
+        self.objectpool: Dict[Tuple[type, Any], Any] = {} # (valuetype, value) -> Object
+
+    def copy(self):
+        # 値はすべて不変なので、辞書の浅いコピーで足りる
+        return TypeTables(self.defs.copy(), self.typenames.copy(), self.describers.copy(), self.valuetypes.copy())
 
 
 #
 # 型取得インターフェース
 #
 class TypeModule:
-    def __init__(self):
-        self._defs: Dict[str, Type] = {} # fulltypename -> Type
-        self._lib_typename: Dict[str, List[str]] = {} # typename -> fulltypename[]
-        self._lib_describer: Dict[str, str] = {} # describer -> fulltypename
-        self._lib_valuetype: Dict[str, str] = {} # valuetypename -> fulltypename
+    def __init__(self, parent: 'TypeModule' = None):
+        self.parent = parent # 下層のモジュール：見つからない型はここから探す
+        self._frozen = False
+        self._tables = TypeTables() # 公開済みの検索表：読み込みはロックしない
+        self._working: Optional[TypeTables] = None # 書き込み中の検索表
+        self._writer: Optional[int] = None # 書き込み中のスレッド
+        self._write_lock = threading.RLock()
+        self._initializing = False
         self._reserved_mixins: Dict[str, List[TypeDescriber]] = {}
         # 特殊型のインスタンス
         from machaon.core.type.instance import AnyType, ObjectType, UnionType
@@ -46,6 +85,10 @@ class TypeModule:
         self.UnionType = UnionType
         # 初期化コード
         self._reserved_init_codes: List[str] = [] # default | <fulldescribername>
+        # 補完用の索引
+        self._completion: Optional[CompletionIndex] = None
+        # 型のロード時間の計測
+        self._profiler = None
 
     #
     @property
@@ -55,25 +98,150 @@ class TypeModule:
         else:
             return self.parent
 
+    #
+    # 検索表の読み書き
+    #
+    def _read_tables(self) -> TypeTables:
+        """ 読み込み用の検索表を返す。書き込み中のスレッドには未公開の検索表を返す """
+        if self._writer == threading.get_ident():
+            return self._working
+        return self._tables
+
+    @contextmanager
+    def _write_tables(self):
+        """ 検索表の複製に書き込み、抜けるときに公開する。ネストした場合は最も外側で公開する """
+        if self._frozen:
+            raise TypeModuleError("凍結されたモジュールには型を追加できません。overlayで派生させてください")
+        with self._write_lock:
+            if self._working is not None:
+                yield self._working
+                return
+            self._working = self._tables.copy()
+            self._writer = threading.get_ident()
+            try:
+                yield self._working
+            finally:
+                self._tables = self._working # 公開する
+                self._working = None
+                self._writer = None
+                self._initializing = False # 初期化の結果が公開されてから、他のスレッドの待機を解く
+
+    @property
+    def _defs(self) -> Dict[str, Type]:
+        return self._read_tables().defs
+
+    @property
+    def _lib_typename(self) -> Dict[str, Tuple[str, ...]]:
+        return self._read_tables().typenames
+
+    @property
+    def _lib_describer(self) -> Dict[str, str]:
+        return self._read_tables().describers
+
+    @property
+    def _lib_valuetype(self) -> Dict[str, str]:
+        return self._read_tables().valuetypes
+
+    #
+    # 派生モジュール
+    #
+    def freeze(self, *, prewarm=True):
+        """ 
+        以降の型の追加を禁止する。派生モジュールの土台として共有できるようになる
+        Params:
+            prewarm(bool): すべての型のメソッド定義を読み込んでおく
+        """
+        self._init_at_first_select_type()
+        if prewarm:
+            for _, t in self._enum_defs():
+                if not isinstance(t, Type):
+                    continue
+                try:
+                    t.load_method_prototypes()
+                except Exception:
+                    continue # エラーは使用時に改めて報告される
+        self._frozen = True
+        return self
+    
+    def is_frozen(self):
+        return self._frozen
+
+    def overlay(self) -> 'TypeModule':
+        """ 
+        このモジュールを土台とした派生モジュールを作る。
+        型の追加は派生モジュールにのみ記録され、土台の型を変更する場合は複製される。
+        Returns:
+            TypeModule:
+        """
+        return TypeModule(self)
+
+    def _chain_get(self, field, key):
+        """ 派生元をさかのぼって検索表の値を得る """
+        m = self
+        while m is not None:
+            v = getattr(m._read_tables(), field).get(key)
+            if v is not None:
+                return v
+            m = m.parent
+        return None
+
+    def _enum_defs(self):
+        """ 派生元を含めたすべての型を列挙する。派生モジュールの定義が優先される """
+        if self.parent is None:
+            yield from self._read_tables().defs.items()
+            return
+        seen = set()
+        m = self
+        while m is not None:
+            for k, t in m._read_tables().defs.items():
+                if k not in seen:
+                    seen.add(k)
+                    yield k, t
+            m = m.parent
+
+    def _own_type(self, t: Type) -> Type:
+        """ 派生元の型を変更する前に、このモジュールに複製する """
+        if not isinstance(t, Type):
+            return t
+        if self._frozen:
+            raise TypeModuleError("凍結されたモジュールの型は変更できません。overlayで派生させてください")
+        if self.parent is None:
+            return t
+        qualname = t.get_conversion()
+        if self._read_tables().defs.get(qualname) is t:
+            return t
+        with self._write_tables() as tables:
+            mine = tables.defs.get(qualname)
+            if mine is None:
+                mine = t.copy()
+                tables.defs[qualname] = mine
+        return mine
+
     def count(self):
         """ このモジュールにある型定義の数を返す
         Returns:
             Int:
         """
-        return len(self._defs)
+        if self.parent is None:
+            return len(self._defs)
+        return sum(1 for _ in self._enum_defs())
     
     #
     def _select_type(self, value:str, code:int, module:str=None) -> Optional[Type]:
         """ このライブラリから型定義を1つ取り出す """
-        self._init_at_first_select_type()
+        m = self
+        while m is not None:
+            m._init_at_first_select_type()
+            m = m.parent
 
+        get = self._chain_get
         tdef = None
         if code == TYPECODE_FULLNAME:
-            tdef = self._defs.get(value)
+            tdef = get("defs", value)
         elif code == TYPECODE_TYPENAME:
             if value in SpecialTypeDecls:
                 raise BadTypename("'{}'は型名として使用できません".format(value))
-            tns = self._lib_typename.get(value, [])
+            tns = get("typenames", value) or ()
             if module is not None:
                 tns = [x for x in tns if x.startswith(module)]
             if tns:
@@ -81,24 +249,41 @@ class TypeModule:
                     tn = QualTypename(value, tns[0]).stringify()
                 else:
                     tn = value
-                tdef = self._defs[tn]
+                tdef = get("defs", tn)
         elif code == TYPECODE_VALUETYPE:
-            tn = self._lib_valuetype.get(value)
+            tn = get("valuetypes", value)
             if tn is not None:
-                tdef = self._defs[tn]
+                tdef = get("defs", tn)
         elif code == TYPECODE_DESCRIBERNAME:
-            tn = self._lib_describer.get(value)
+            tn = get("describers", value)
             if tn is not None:
-                tdef = self._defs[tn]
+                tdef = get("defs", tn)
         
         if tdef is not None:
             return tdef
         else:
             return None
         
+    def load_reserved_types(self):
+        """ 予約された型の読み込みを、最初の取得を待たずに行う """
+        self._init_at_first_select_type()
+
+    def set_profiler(self, profiler):
+        """ 型定義ごとにロード時間を記録させる 
+        Params:
+            profiler(Optional[StartupProfiler]):
+        """
+        self._profiler = profiler
+
     def _init_at_first_select_type(self):
         """ 最初に型にアクセスする際に実行される初期化処理 """
-        if self._reserved_init_codes:
+        if not self._reserved_init_codes and not self._initializing:
+            return
+        # 他のスレッドが初期化中であれば、完了まで待つ
+        with self._write_tables():
+            if not self._reserved_init_codes:
+                return
+            self._initializing = True # コードを空にする前に立てる。検索表を公開する時に下ろす
             codes = self._reserved_init_codes[:]
             self._reserved_init_codes.clear()
             for code in codes:
@@ -161,6 +346,62 @@ class TypeModule:
 
         return t
 
+    #
+    # 基本型のハンドルと、小さな値のオブジェクトの共有
+    #
+    def _cache_tables(self) -> Optional[TypeTables]:
+        """ キャッシュを置く検索表を返す。親モジュールが変更されうる場合はキャッシュしない """
+        if self.parent is not None and not self.parent._frozen:
+            return None
+        return self._read_tables()
+
+    def get_fundamental(self, typename: str) -> Optional[TypeProxy]:
+        """ 修飾されていない型名で型を取得し、検索表が変わるまでキャッシュする
+        Params:
+            typename(str): 型名
+        Returns:
+            Optional[TypeProxy]:
+        """
+        tables = self._cache_tables()
+        if tables is not None:
+            t = tables.fundamentals.get(typename)
+            if t is not None:
+                return t
+        t = self.get(typename)
+        if t is not None and tables is not None:
+            tables.fundamentals[typename] = t
+        return t
+
+    def get_pooled_object(self, value) -> Optional['Object']:
+        """ None、真偽値、小さな整数、空文字列について、共有されるオブジェクトを返す
+        Params:
+            value(Any): 値
+        Returns:
+            Optional[Object]: 共有の対象外であればNone
+        """
+        vt = type(value)
+        if vt is int:
+            if value < POOLED_INT_MIN or POOLED_INT_MAX < value:
+                return None
+        elif vt is str:
+            if value:
+                return None
+        elif vt is not bool and value is not None:
+            return None
+        
+        tables = self._cache_tables()
+        if tables is None:
+            return None
+        key = (vt, value) # Trueと1を区別する
+        o = tables.objectpool.get(key)
+        if o is None:
+            t = self.get_fundamental(POOLED_VALUE_TYPENAMES[vt])
+            if t is None:
+                return None
+            from machaon.core.object import Object
+            o = tables.objectpool.setdefault(key, Object(t, value))
+        return o
+
     def getall(self, *, geterror=False) -> Generator[Type, None, None]:
         """ すべての型をロードし、取得する
         Params:
@@ -175,7 +416,7 @@ class TypeModule:
         yield special_type(self.ObjectType)
 
         # モジュール型
-        for fullname, t in self._defs.items():
+        for fullname, t in self._enum_defs():
             if geterror:
                 try:
                     yield fullname, t, None
@@ -199,7 +440,7 @@ class TypeModule:
                 if typename == "Type":
                     return self.get("Type")
                 elif typename in PythonBuiltinTypenames.literals: # 基本型
-                    return self.get(typename.capitalize())
+                    return self.get_fundamental(typename.capitalize())
                 elif typename in PythonBuiltinTypenames.dictionaries: # 辞書型
                     return self.get("ObjectCollection")
                 elif typename in PythonBuiltinTypenames.iterables: # イテラブル型
@@ -286,16 +527,18 @@ class TypeModule:
             else:
                 return self.define(desc)
             
-    def mixin(self, type: TypeProxy, describername):
-        """ mixinとしてロードする """
+    def mixin(self, type: TypeProxy, describername) -> TypeProxy:
+        """ mixinとしてロードする。派生モジュールでは複製された型を返す """
         target, isklass = detect_describer_name_type(describername)
         if target is None:
             raise TypeModuleError("Mixin対象が不明です")
         if isklass:
-            self.inject_type_mixin(target, type)
+            return self.inject_type_mixin(target, type)
         else:
             # モジュールまたはパッケージの型を全てロードする（対象以外の型も変更される）
             self.use_module_or_package_types(target, fallback_overlap=True)
+            t = self.get(type.get_conversion())
+            return t if t is not None else type
 
 
     #
@@ -313,20 +556,32 @@ class TypeModule:
         """ 型定義を作成する """
         if isinstance(describer, Type):
             return self._add_type(describer, fallback=fallback)
-    
+
+        if self._profiler is not None:
+            from machaon.core.profiler import PROFILE_TYPE
+            with self._profiler.measure(PROFILE_TYPE, describer_display_name(describer, describername)):
+                return self._define(describer, typename, value_type, doc, bits, describername, typeclass, fallback)
+        return self._define(describer, typename, value_type, doc, bits, describername, typeclass, fallback)
+
+    def _define(self, describer, typename, value_type, doc, bits, describername, typeclass, fallback):
         desc = create_type_describer(describer, name=describername)
         if desc.is_typedef():
             t = (typeclass or resolve_typeclass(desc.get_value_full_qualname()))(desc)
             t.load(typename=typename, value_type=value_type, doc=doc, bits=bits)
             return self._add_type(t, fallback=fallback)
         elif desc.is_mixin():
-            return self._add_type_mixin(desc, desc.get_mixin_target()) # ミキシンが予約された場合はNoneが返る
+            with self._write_tables():
+                return self._add_type_mixin(desc, desc.get_mixin_target()) # ミキシンが予約された場合はNoneが返る
 
     def _add_type(self, type, *, fallback=False):
         """ 型をモジュールに追加する """
         if not type.is_loaded():
             raise ValueError("type must be loaded")
-        
+        with self._write_tables() as tables:
+            return self._add_type_to_tables(tables, type, fallback)
+
+    def _add_type_to_tables(self, tables: TypeTables, type, fallback):
+        """ 書き込み中の検索表に型を追加する """
         tqualname: QualTypename = type.get_qual_typename()
         if not tqualname.is_qualified():
             raise TypeModuleError("型'{}'のデスクライバクラス名が指定されていません".format(tqualname))
@@ -335,48 +590,57 @@ class TypeModule:
         describername:str = tqualname.describer
         original_describername:str = type.get_describer().get_value_full_qualname()
 
+        # 派生元の表も合わせて検索する
+        get = self._chain_get
+
         # フルスコープ型名の辞書をチェックする
-        if qualname in self._defs:
+        if get("defs", qualname) is not None:
             if fallback: return
             raise TypeModuleError("型'{}'はこのモジュールに既に存在します".format(qualname))
 
         valuetypename = type.get_value_type_qualname()
 
         # 型名の辞書をチェックする
-        if typename in self._lib_typename:
-            descs = self._lib_typename[typename]
-            if describername in descs:
-                if fallback: return
-                raise TypeModuleError("型'{}'はこのモジュールに既に存在します".format(qualname))
+        descs = get("typenames", typename) or ()
+        if describername in descs:
+            if fallback: return
+            raise TypeModuleError("型'{}'はこのモジュールに既に存在します".format(qualname))
 
         # デスクライバの辞書をチェックする
-        if original_describername in self._lib_describer:
-            tn = self._lib_describer[original_describername]
-            return self._defs[tn] # デスクライバの重複はエラーにしない
+        tn = get("describers", original_describername)
+        if tn is not None:
+            return get("defs", tn) # デスクライバの重複はエラーにしない
 
         # 型の登録を開始する
-        self._defs[qualname] = type
-        self._lib_typename.setdefault(typename, []).append(describername)
+        tables.defs[qualname] = type
+        tables.typenames[typename] = descs + (describername,)
 
         # デスクライバは本名で登録する
-        self._lib_describer[original_describername] = qualname
+        tables.describers[original_describername] = qualname
 
         # 値型は最初に登録されたものを優先する
-        if valuetypename not in self._lib_valuetype:
-            self._lib_valuetype[valuetypename] = qualname
+        if get("valuetypes", valuetypename) is None:
+            tables.valuetypes[valuetypename] = qualname
 
         # 予約済みのmixinロードを実行する
         self._inject_reserved_mixins(qualname, type)
 
+        # 補完用の索引に加える
+        if self._completion is not None:
+            self._completion.add_type(type)
+
         return type
 
     def inject_type_mixin(self, describername, target_type: Type):
-        """ Mixin実装を追加する """
+        """ Mixin実装を追加する。派生モジュールでは複製された型を返す """
         mxtd = create_type_describer(describername)
         if not mxtd.is_mixin():
             raise ValueError("mixin実装ではありません")
         if all(mxtd.get_full_qualname() != x.get_full_qualname() for x in target_type.get_all_describers()):
+            target_type = self._own_type(target_type)
             target_type.mixin_method_prototypes(mxtd)
+            self._reindex_type_methods(target_type)
+        return target_type
 
     def _add_type_mixin(self, describer: TypeDescriber, target: str):
         """ Mixin実装を追加する """
@@ -385,7 +649,9 @@ class TypeModule:
             raise ValueError("{}: mixin対象の型名'{}'はデスクライバで修飾してください".format(describer.get_full_qualname(), target))
         t = self.find(qt)
         if t is not None:
+            t = self._own_type(t)
             t.mixin_method_prototypes(describer)
+            self._reindex_type_methods(t)
             return t 
         else:
             # 予約リストに追加する
@@ -399,8 +665,52 @@ class TypeModule:
             if fulltypename.startswith(key): # 前方一致
                 for mixin in mixins:
                     target.mixin_method_prototypes(mixin)
+                if mixins:
+                    self._reindex_type_methods(target)
                 mixins.clear()
 
+    #
+    # 補完
+    #
+    def get_completion_index(self) -> CompletionIndex:
+        """ 補完用の索引を取得する。初回は登録済みの型から作成する """
+        if self._completion is None:
+            index = CompletionIndex()
+            # 共通型のメソッド
+            from machaon.types.generic import get_resolver
+            for name in get_resolver().operators.keys():
+                index.add(name, COMPLETION_METHOD, self.ObjectType.get_typename())
+            # 登録済みの型
+            for _, t in self._enum_defs():
+                if isinstance(t, Type):
+                    index.add_type(t)
+                else:
+                    index.add(t.get_typename(), COMPLETION_TYPE, t.get_typename())
+            self._completion = index
+        return self._completion
+
+    def complete(self, prefix, kinds=COMPLETION_ALL, *, typename=None, limit=None):
+        """ 型名・メソッド名・エイリアス名を前方一致で検索する
+        Params:
+            prefix(str): 入力中の文字列
+            kinds(int): COMPLETION_XXXの組み合わせ
+            typename(str): メソッドを検索する型名
+            limit(int): 最大の個数
+        Returns:
+            List[str]:
+        """
+        self._init_at_first_select_type()
+        index = self.get_completion_index()
+        typenames = None
+        if typename is not None:
+            typenames = (typename, self.ObjectType.get_typename()) # 共通型のメソッドも含める
+        return index.complete_words(prefix, kinds, typenames=typenames, limit=limit)
+
+    def _reindex_type_methods(self, type):
+        """ メソッドが追加された型の索引を作り直す """
+        if self._completion is not None:
+            self._completion.reserve_type_methods(type)
+
     #
     # モジュールを操作する
     #
@@ -413,7 +723,7 @@ class TypeModule:
         """ 標準モジュールの型を追加する """
         from machaon.core.symbol import DefaultModuleNames
         names = names or DefaultModuleNames
-        with ErrorSet("標準モジュールの型を追加") as errs:
+        with self._write_tables(), ErrorSet("標準モジュールの型を追加") as errs:
             for module in names:
                 try:
                     name = "machaon."+module
@@ -428,6 +738,12 @@ class TypeModule:
         else:
             mod = name
         results = [] # [bool, qualname, Type | Exception][]
+        with self._write_tables():
+            self._define_module_types(mod, name, results, fallback_overlap)
+        return results
+
+    def _define_module_types(self, mod, name, results, fallback_overlap):
+        """ モジュールの型をすべて定義し、結果をリストに追加する """
         try:
             for mod in mod.load_all_module_loaders():
                 try:
@@ -441,7 +757,6 @@ class TypeModule:
                     results.append((False, mod.get_name(), e))
         except Exception as e:
             results.append((False, name, e))
-        return results
 
     def use_module_or_package_types(self, name, *, fallback_overlap=False):
         """ モジュールあるいはパッケージ内の型を追加する """
@@ -453,16 +768,22 @@ class TypeModule:
     def add_special_type(self, t, describername=None):
         """ 特殊な型を追加する """
         qname = QualTypename(t.get_typename(), describername).stringify()
-        self._defs[qname] = t
-        self._lib_typename[t.get_typename()] = [describername or ""]
-        self._lib_valuetype[full_qualified_name(t.get_value_type())] = qname
+        with self._write_tables() as tables:
+            tables.defs[qname] = t
+            tables.typenames[t.get_typename()] = (describername or "",)
+            tables.valuetypes[full_qualified_name(t.get_value_type())] = qname
+        if self._completion is not None:
+            self._completion.add(t.get_typename(), COMPLETION_TYPE, t.get_typename())
 
     def reserve_adding_types(self, *codes):
         """ 型の読み込みを予約する 
         Params:
             *codes(str): 'default' = default_module_types | <full describer name>
         """
-        self._reserved_init_codes.extend(codes)
+        if self._frozen:
+            raise TypeModuleError("凍結されたモジュールには型を追加できません。overlayで派生させてください")
+        with self._write_lock:
+            self._reserved_init_codes.extend(codes)
 
     def update(self, other: 'TypeModule'):
         """ 
@@ -471,18 +792,23 @@ class TypeModule:
         Params:
             other(TypeModule):
         """
-        self._defs.update(other._defs)
-        for k, v in other._lib_typename.items():
-            li = self._lib_typename.setdefault(k, [])
-            li.extend(v)
-        self._lib_describer.update(other._lib_describer)
-        self._lib_valuetype.update(other._lib_valuetype)
-        # mixinを全ての型に試し、残りのリストを引き取る
-        for fulltypename, type in self._defs.items():
-            other._inject_reserved_mixins(fulltypename, type)
-        for k, v in other._reserved_mixins.items():
-            li = self._reserved_mixins.setdefault(k, [])
-            li.extend(v)
+        src = other._read_tables()
+        with self._write_tables() as tables:
+            tables.defs.update(src.defs)
+            for k, v in src.typenames.items():
+                tables.typenames[k] = tables.typenames.get(k, ()) + tuple(v)
+            tables.describers.update(src.describers)
+            tables.valuetypes.update(src.valuetypes)
+            if self._completion is not None:
+                for t in src.defs.values():
+                    if isinstance(t, Type):
+                        self._completion.add_type(t)
+            # mixinを全ての型に試し、残りのリストを引き取る
+            for fulltypename, type in tables.defs.items():
+                other._inject_reserved_mixins(fulltypename, type)
+            for k, v in other._reserved_mixins.items():
+                li = self._reserved_mixins.setdefault(k, [])
+                li.extend(v)
     
     def get_remained_mixin_targets(self):
         return self._reserved_mixins.items()
@@ -529,6 +855,18 @@ class TypeModule:
 #
 #
 #
+def describer_display_name(describer, describername=None):
+    """ 計測結果などに表示するデスクライバの名前 """
+    if describername:
+        return describername
+    if isinstance(describer, TypeDescriber):
+        return describer.get_full_qualname()
+    if isinstance(describer, type):
+        return full_qualified_name(describer)
+    if isinstance(describer, dict):
+        return str(describer.get("Typename", "<dict>"))
+    return str(describer)
+
 def resolve_typeclass(describername):
     from machaon.core.type.fundamental import ObjectCollectionType
     return {
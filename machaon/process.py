@@ -72,6 +72,8 @@ class Process:
         self.thread = None
         self._interrupted = False
         self.last_context = None
+        self._failed = False # コンテキストを手放した後のために保存する
+        self.finish_time = None
         # メッセージ
         self.post_msgs = queue.Queue()
         self._isconsumed_msgs = False
@@ -143,6 +145,9 @@ class Process:
 
         # プロセス終了
         self.finish()
+
+        # 保持の上限を超えた古い返り値を手放す
+        context.root.retain_process_result(self)
         return success
 
     def run_process_async(self, context: 'InvocationContext', routine):
@@ -199,6 +204,7 @@ class Process:
 
     def finish(self):
         self._finished = True
+        self.finish_time = time.monotonic()
 
     def is_failed(self):
         """ @method
@@ -208,7 +214,13 @@ class Process:
         """
         if self.last_context:
             return self.last_context.is_failed()
-        return False
+        return self._failed
+    
+    def release_context(self):
+        """ 実行済みのコンテキストと呼び出し履歴を手放す """
+        if self.last_context is not None:
+            self._failed = self.last_context.is_failed()
+            self.last_context = None
 
     def _start_infinite_thread(self, spirit):
         """ テスト用の終わらないスレッドを開始する """
@@ -678,6 +690,8 @@ class LoggingSpirit(Spirit):
 #  メッセージクラス
 #
 class ProcessMessage():
+    __slots__ = ("text", "tag", "embed_", "args")
+
     def __init__(self, text=None, tag=None, embed=None, **args):
         self.text = text
         self.tag = tag or "message"
@@ -986,6 +1000,9 @@ class ProcessHive:
         self._allhistory: List[int] = []
         self._nextindex: int = 0
         self._nextprocindex: int = 0
+        self._retention: Optional[ProcessRetention] = None
+        self._retained: Dict[int, Tuple[float, int]] = {} # プロセスID -> (終了時刻, 推定バイト数)
+        self._retainlock = threading.Lock()
     
     # 新しい開始前のプロセスを作成する
     def new_process(self, sentence: ProcessSentence = None):
@@ -1111,6 +1128,64 @@ class ProcessHive:
                 self.activate(index)
         return chm
 
+    #
+    #
+    #
+    def set_retention(self, retention: Optional['ProcessRetention']):
+        """ プロセスの返り値を保持する上限を設定する """
+        self._retention = retention
+    
+    def get_retention(self) -> Optional['ProcessRetention']:
+        return self._retention
+
+    def retain_process_result(self, process: Process, objcol: ObjectCollection, typemodule) -> List[int]:
+        """
+        終了したプロセスの返り値を記録し、上限を超えた古いものを手放す。
+        Returns:
+            List[int]: 手放したプロセスID
+        """
+        if self._retention is None:
+            return []
+        index = process.get_index()
+        item = objcol.get(str(index))
+        size = estimate_object_size(item.value) if item is not None else 0
+        finished = process.finish_time if process.finish_time is not None else time.monotonic()
+        with self._retainlock:
+            self._retained.pop(index, None)
+            self._retained[index] = (finished, size)
+        return self.enforce_retention(objcol, typemodule)
+
+    def enforce_retention(self, objcol: ObjectCollection, typemodule, *, now=None) -> List[int]:
+        """
+        古いプロセスから順に、上限に収まるまで返り値を手放す。
+        Returns:
+            List[int]: 手放したプロセスID
+        """
+        from machaon.types.stacktrace import release_expired_errors
+        if now is None:
+            now = time.monotonic()
+        release_expired_errors(now) # 猶予期間を過ぎたエラーのフレームを手放す
+
+        retention = self._retention
+        if retention is None:
+            return []
+        with self._retainlock:
+            evicts = retention.select_evictions(self._retained, now)
+            for index in evicts:
+                del self._retained[index]
+
+        for index in evicts:
+            retention.evict(index, objcol, typemodule)
+            proc = self.get_process(index)
+            if proc is not None:
+                proc.release_context()
+        return evicts
+    
+    def get_retained_bytes(self) -> int:
+        """ 保持している返り値の推定バイト数 """
+        with self._retainlock:
+            return sum(x for _, x in self._retained.values())
+
     #
     #
     #
@@ -1148,3 +1223,123 @@ class ProcessHive:
 
         return runnings, begun, ceased
 
+
+#
+# プロセスの返り値の保持
+#
+class ProcessRetention:
+    """
+    プロセスの返り値を保持する上限。
+    上限を超えた古い返り値は要約の文字列に置き換えるか、ディレクトリに書き出して参照時に読み込みなおす。
+    """
+    def __init__(self, *, max_processes: int = None, max_bytes: int = None, max_age: float = None, spill_dir = None):
+        self.max_processes = max_processes # 返り値を保持するプロセスの数
+        self.max_bytes = max_bytes # 返り値の推定バイト数の合計
+        self.max_age = max_age # 終了してからの秒数
+        self.spill_dir = spill_dir # 書き出し先のディレクトリ。Noneなら要約のみ残す
+
+    def remove_spilled_files(self):
+        """ 書き出し先のディレクトリに残ったファイルを削除する """
+        if self.spill_dir is None or not os.path.isdir(str(self.spill_dir)):
+            return
+        from machaon.core.objectstore import OBJECT_STORE_EXTENSION
+        for filename in os.listdir(str(self.spill_dir)):
+            if filename.endswith(OBJECT_STORE_EXTENSION):
+                try:
+                    os.remove(os.path.join(str(self.spill_dir), filename))
+                except OSError:
+                    pass
+
+    def select_evictions(self, retained: Dict[int, Tuple[float, int]], now: float) -> List[int]:
+        """
+        手放すプロセスを古い順に選ぶ。
+        Params:
+            retained(Dict[int, Tuple[float, int]]): プロセスID -> (終了時刻, 推定バイト数)
+            now(float): 現在時刻
+        Returns:
+            List[int]:
+        """
+        indices = sorted(retained.keys())
+        evicts = []
+        total = sum(x for _, x in retained.values())
+        for i, index in enumerate(indices):
+            finished, size = retained[index]
+            remaining = len(indices) - i
+            if self.max_processes is not None and remaining > self.max_processes:
+                pass
+            elif self.max_bytes is not None and total > self.max_bytes and remaining > 1:
+                pass # 最新の返り値は残す
+            elif self.max_age is not None and now - finished > self.max_age:
+                pass
+            else:
+                continue
+            evicts.append(index)
+            total -= size
+        return evicts
+
+    def evict(self, index: int, objcol: ObjectCollection, typemodule):
+        """ 返り値を要約に置き換え、可能であれば書き出す """
+        name = str(index)
+        item = objcol.get(name)
+        if item is None:
+            return
+        obj = item.object
+        if obj.is_error():
+            obj.value.release_frames() # プロセスが参照を残していてもフレームは手放す
+        try:
+            summary = obj.summarize()
+        except Exception as e:
+            summary = "<{}>".format(type(e).__name__)
+        text = "#{} {} [{}]（破棄済み）".format(index, summary, obj.get_typename())
+        placeholder = typemodule.get("Str").new_object(text)
+
+        loader = None
+        if self.spill_dir is not None:
+            from machaon.core.objectstore import StoredObject, OBJECT_STORE_EXTENSION
+            path = os.path.join(str(self.spill_dir), "{}{}".format(index, OBJECT_STORE_EXTENSION))
+            loader = StoredObject.store(path, obj, typemodule=typemodule, remove=True)
+        objcol.evict(name, placeholder, loader)
+
+
+def estimate_object_size(value, limit=100000) -> int:
+    """
+    値が参照するオブジェクトのおおよそのバイト数を見積もる。
+    Params:
+        value(Any):
+        limit(int): 辿るオブジェクトの最大数
+    Returns:
+        int:
+    """
+    import sys
+    import types
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack and len(seen) < limit:
+        v = stack.pop()
+        if id(v) in seen:
+            continue
+        seen.add(id(v))
+        try:
+            total += sys.getsizeof(v)
+        except TypeError:
+            continue
+        if isinstance(v, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        elif isinstance(v, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+            continue # 共有される定義は辿らない
+        elif isinstance(v, dict):
+            stack.extend(v.keys())
+            stack.extend(v.values())
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            stack.extend(v)
+        elif isinstance(v, Object):
+            stack.append(v.value)
+        else:
+            d = getattr(v, "__dict__", None)
+            if isinstance(d, dict):
+                stack.append(d)
+            for slot in getattr(type(v), "__slots__", ()):
+                if isinstance(slot, str) and hasattr(v, slot):
+                    stack.append(getattr(v, slot))
+    return total
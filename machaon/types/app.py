@@ -56,6 +56,11 @@ class RootObject:
         if count > 0:
             spirit.post("message", "{}個の変数がロード済みです".format(count))
 
+        # 起動時間の計測結果を表示する
+        profiler = self.root.finish_startup_profile()
+        if profiler is not None:
+            profiler.pprint(self.context, spirit)
+
         if isfullform:
             spirit.post("message", "")
             spirit.post("message", "文法ヘルプ -> @@syntax")
@@ -152,6 +157,17 @@ class RootObject:
         from machaon.core.persistence import enum_persistent_names
         return enum_persistent_names(self.root)
 
+    def load(self, name):
+        """ @method
+        storeで保存したオブジェクトを読み込む。
+        Params:
+            name(str): 保存名（/区切りの相対パス）
+        Returns:
+            Object: 復元されたオブジェクト
+        """
+        from machaon.core.objectstore import load_object, get_object_store_path
+        return load_object(get_object_store_path(self.root, name), self.context)
+
     def packages(self):
         """ @method
         パッケージを取得する。
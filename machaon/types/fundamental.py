@@ -222,12 +222,15 @@ class TypeType:
     
     def mixin(self, type, context, *describers):
         ''' @method context
-        スコープ名。
+        Mixin実装を追加する。派生モジュールでは複製された型を返す。
         Params:
             +describers(Str): デスクライバ名
+        Returns:
+            Type:
         '''
         for desc in describers:
-            context.type_module.mixin(type, desc)
+            type = context.type_module.mixin(type, desc)
+        return type
 
 
 class BoolType:
@@ -310,6 +313,7 @@ fundamental_typenames = [QualTypename.parse(x) for x in [
     "Function:machaon.core.function.FunctionType",   # Function
     "Tuple:machaon.types.tuple.ObjectTuple",         # Tuple
     "Sheet:machaon.types.sheet.Sheet",               # Sheet
+    "Stream:machaon.types.stream.ObjectStream",      # Stream
     # エラー型
     "Error:machaon.types.stacktrace.ErrorObject",      # Error
     "TracebackObject:machaon.types.stacktrace.TracebackObject", # TracebackObject
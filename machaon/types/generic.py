@@ -591,7 +591,24 @@ class GenericMethods:
         """
         context.bind_object(right, left)
         return left
-        
+
+    @resolver.operator("store")
+    def store(self, context, left, name):
+        """ @method external context
+        オブジェクトをmachaonフォルダにバイナリ形式で保存する。
+        @@load で再計算せずに復元できる。
+        Arguments:
+            left(Object): オブジェクト
+            name(str): 保存名（/区切りの相対パス）
+        Returns:
+            Any: 左辺オブジェクト
+        """
+        from machaon.core.objectstore import dump_object, get_object_store_path
+        path = get_object_store_path(context.root, name)
+        size = dump_object(path, left)
+        context.spirit.post("message", "'{}'に保存 ({}バイト)".format(path, size))
+        return left
+
     @resolver.operator("cast")
     def cast(self, left, right):
         """ @method external
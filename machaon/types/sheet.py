@@ -1,9 +1,19 @@
+import bisect
+import inspect
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from machaon.core.object import Object
 from typing import Sequence, List, Any, Tuple, Dict, DefaultDict, Optional, Generator, Iterable, Union
 
-from machaon.core.function import parse_function
+from machaon.core.function import parse_function, SelectorExpression, MessageExpression
+from machaon.core.symbol import SIGIL_OBJECT_ID, SIGIL_OBJECT_LAMBDA_MEMBER, SIGIL_QUOTERS
+from machaon.core.type.extend import ExtendedType
+from machaon.core.sort import parse_sortkey, sort_by_keys
+from machaon.core.displaycache import display_string, touch_display, DISPLAY_STRINGIFY, DISPLAY_SUMMARIZE
 
-from machaon.types.tuple import ElemObject
+from machaon.types.tuple import ElemObject, ObjectTuple
 from machaon.types.fundamental import NotFound
 
 #
@@ -20,12 +30,24 @@ class InvalidColumnNames(Exception):
     def __str__(self):
         return "不明なカラム名です:{}".format(", ".join(self.names))
 
+class InvalidAggregateFunction(Exception):
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return "不明な集計関数です:{}（使用できるのは {}）".format(self.name, " ".join(AGGREGATE_FUNCTIONS.keys()))
+
 #
-DATASET_STRINGIFY = 0
-DATASET_STRINGIFY_SUMMARIZE = 1
+DATASET_STRINGIFY = DISPLAY_STRINGIFY
+DATASET_STRINGIFY_SUMMARIZE = DISPLAY_SUMMARIZE
 
 SIGIL_ITEM_ITSELF = "@"
 
+PARALLEL_EVAL_CHUNK_ROWS = 32 # ひとつのスレッドにまとめて渡す行数
+PARALLEL_EVAL_BACKLOG = 2 # スレッドあたりの投入済みのチャンク数の上限
+
+STREAM_CHUNK_ROWS = 100 # ジェネレータから一度に読み込む行数
+
 #
 #
 #
@@ -48,10 +70,18 @@ class BasicDataColumn():
         if object.value is None:
             return "-"
 
-        if method == DATASET_STRINGIFY_SUMMARIZE:
-            return object.summarize()
-        else:
-            return object.stringify()
+        return display_string(object, method)
+
+    def is_nonstring_column(self):
+        """ 文字列以外の型が指定されているか """
+        conv = self.get_type_conversion()
+        if not conv:
+            return False
+        return conv.split(":")[0] not in ("Str", "str")
+
+    def clone_for_thread(self):
+        """ 別のスレッドで計算するための列を返す。状態を持たない列はそのまま共有する """
+        return self
 
 
 class FunctionColumn(BasicDataColumn):
@@ -84,6 +114,13 @@ class FunctionColumn(BasicDataColumn):
         context.set_subject(subject)
         return self._fn.run_here(context)
 
+    def clone_for_thread(self):
+        # メッセージの実行は読み込みの状態を持つため、スレッドごとに解析しなおす
+        if isinstance(self._fn, MessageExpression):
+            fn = MessageExpression(self._fn.get_expression(), self._fn.get_type_conversion())
+            return FunctionColumn(fn, name=self._name)
+        return self
+
 
 class ItemItselfColumn(BasicDataColumn):
     """
@@ -104,6 +141,26 @@ class ItemItselfColumn(BasicDataColumn):
     def eval(self, subject, _context):
         return subject
 
+
+class ComputedColumn(BasicDataColumn):
+    """
+    計算済みの値のみを持つ。集計の結果などに用いる
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def get_type_conversion(self):
+        return None
+
+    def get_name(self):
+        return self._name
+    
+    def get_doc(self):
+        return "計算済みの値"
+
+    def eval(self, subject, _context):
+        raise ValueError("カラム'{}'は計算済みの値のみを持ち、新しい行の値を計算できません".format(self._name))
+
 #
 DataColumnUnion = Union[FunctionColumn, ItemItselfColumn]
 
@@ -137,7 +194,7 @@ SEARCH_METHOD_PARTIAL_MATCH = 4
 def make_data_search_predicate(code, column, bound_context):
     if code == SEARCH_METHOD_EQUAL:
         def pred(l, r):
-            return l == r
+            return l.value == r
     elif code == SEARCH_METHOD_FORWARD_MATCH:
         def pred(l, r):
             return column.stringify(bound_context, l).startswith(r)
@@ -152,23 +209,215 @@ def make_data_search_predicate(code, column, bound_context):
     
     return pred
 
+#
+# 集計関数
+#
+AGGREGATE_OPERAND_SEPARATOR = ":"
+
+def _is_aggregatable(obj):
+    return obj is not None and not obj.is_error() and obj.value is not None
+
+class AggregateCount():
+    """ 行の数 """
+    operand = False
+    def start(self):
+        return 0
+    def step(self, state, _obj):
+        return state + 1
+    def finish(self, context, state):
+        return context.new_object(state, type="Int")
+
+class AggregateSum():
+    """ 値の合計 """
+    operand = True
+    def start(self):
+        return None
+    def step(self, state, obj):
+        if not _is_aggregatable(obj):
+            return state
+        return obj.value if state is None else state + obj.value
+    def finish(self, context, state):
+        return context.new_object(state)
+
+class AggregateMin():
+    """ 値の最小 """
+    operand = True
+    def start(self):
+        return None
+    def step(self, state, obj):
+        if not _is_aggregatable(obj):
+            return state
+        return obj if state is None or obj.value < state.value else state
+    def finish(self, context, state):
+        return state if state is not None else context.new_object(None)
+
+class AggregateMax(AggregateMin):
+    """ 値の最大 """
+    def step(self, state, obj):
+        if not _is_aggregatable(obj):
+            return state
+        return obj if state is None or obj.value > state.value else state
+
+class AggregateMean():
+    """ 値の平均 """
+    operand = True
+    def start(self):
+        return (None, 0)
+    def step(self, state, obj):
+        if not _is_aggregatable(obj):
+            return state
+        total, count = state
+        return (obj.value if total is None else total + obj.value, count + 1)
+    def finish(self, context, state):
+        total, count = state
+        if count == 0:
+            return context.new_object(None)
+        return context.new_object(total / count)
+
+class AggregateFirst():
+    """ 最初の値 """
+    operand = True
+    def start(self):
+        return None
+    def step(self, state, obj):
+        return obj if state is None else state
+    def finish(self, context, state):
+        return state if state is not None else context.new_object(None)
+
+class AggregateCollect():
+    """ 値のタプル """
+    operand = True
+    def start(self):
+        return []
+    def step(self, state, obj):
+        state.append(obj)
+        return state
+    def finish(self, context, state):
+        return context.new_object(ObjectTuple(state), type="Tuple")
+
+AGGREGATE_FUNCTIONS = {
+    "count" : AggregateCount,
+    "sum" : AggregateSum,
+    "min" : AggregateMin,
+    "max" : AggregateMax,
+    "mean" : AggregateMean,
+    "first" : AggregateFirst,
+    "collect" : AggregateCollect,
+}
+
+def parse_aggregate(expression):
+    """
+    集計の式を関数とカラム表現に分ける。
+    Params:
+        expression(str): count, sum:size のように関数名とカラム表現を:で繋げた式
+    Returns:
+        Tuple[Any, Optional[str]]: 集計関数, カラム表現
+    """
+    fname, sep, operand = expression.partition(AGGREGATE_OPERAND_SEPARATOR)
+    fname = fname.strip()
+    klass = AGGREGATE_FUNCTIONS.get(fname)
+    if klass is None:
+        raise InvalidAggregateFunction(fname)
+    fn = klass()
+    operand = operand.strip()
+    if fn.operand and not operand:
+        raise ValueError("集計関数'{}'にはカラム表現が必要です".format(fname))
+    return fn, (operand if fn.operand else None)
+
+def _hashable_group_key(value):
+    """ ハッシュできない値は、型名と文字列表現で代用する """
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value).__name__, repr(value))
+    return value
+
+#
+# 検索インデックス
+#
+class HashColumnIndex():
+    """
+    値が等しいアイテムを引く。
+    """
+    def __init__(self, entries):
+        """
+        Params:
+            entries(Iterable[Tuple[int, Object]]): アイテムIDと値
+        """
+        self._map = {}
+        self._unhashables = [] # ハッシュできない値は線形探索する
+        for itemindex, obj in entries:
+            try:
+                self._map.setdefault(obj.value, []).append(itemindex)
+            except TypeError:
+                self._unhashables.append((itemindex, obj.value))
+    
+    def lookup(self, value) -> List[int]:
+        try:
+            found = self._map.get(value, [])
+        except TypeError:
+            found = []
+        if self._unhashables:
+            found = found + [i for i, v in self._unhashables if v == value]
+        return found
+
+
+class PrefixColumnIndex():
+    """
+    値の文字列の前方一致でアイテムを引く。
+    文字列を反転して並べれば、後方一致で引くことができる。
+    """
+    def __init__(self, entries, *, reverse=False):
+        """
+        Params:
+            entries(Iterable[Tuple[int, str]]): アイテムIDと値の文字列
+            reverse(bool): 後方一致で引く
+        """
+        self._reverse = reverse
+        if reverse:
+            entries = ((i, s[::-1]) for i, s in entries)
+        keys = sorted(entries, key=lambda x: x[1])
+        self._keys = [s for _, s in keys]
+        self._items = [i for i, _ in keys]
+    
+    def lookup(self, value) -> List[int]:
+        if self._reverse:
+            value = value[::-1]
+        keys = self._keys
+        lo = bisect.bisect_left(keys, value)
+        hi = lo
+        while hi < len(keys) and keys[hi].startswith(value):
+            hi += 1
+        return self._items[lo:hi]
+
 #
 #
 #
 class Sheet():  
     """ @type
     同じ型のオブジェクトに対する式を縦列とするデータの配列。
+    値はカラムごとの配列にアイテムIDの順で保持し、行の並びはアイテムIDの配列で表す。
+    値は必要になった時点で計算し、配列に記録する。
     Params:
         itemtype(Type): 要素の型（全要素に適用する）
     """
     def __init__(self, items=None, *, typeconversion=None, context=None, columns=None, uninitialized=False):
         self.items = items or []
-        self.rows = []
         self.viewcolumns: List[DataColumnUnion] = []
+        self.columnvalues: List[List[Optional[Object]]] = [] # カラムごとの値。アイテムIDで引く。未計算の値はNone
+        self.roworder: List[int] = [] # 現在の行の並び。アイテムIDの配列
         self.typeconversion = typeconversion
+        self.evalcontext = None # 値を後から計算するためのコンテキスト
+        self.evalworkers = None # 値を並行して計算するスレッドの数。Noneなら必要になった時点で順に計算する
+
+        self._colindexes = {} # (カラム番号, 一致タイプ) -> 検索インデックス
+        self._rowmap: Optional[Dict[int, int]] = None # アイテムID -> 行番号
 
         self._selection: Optional[Tuple[int, int]] = None # itemindex, rowindex
 
+        self._truncated = False # 読み込みが中断され、一部のアイテムのみを持つ
+        self._streamview: Optional['SheetStringTable'] = None # 読み込みながら表示した表
+
         if not uninitialized:
             if self.items:
                 if not isinstance(self.items[0], Object):
@@ -185,6 +434,14 @@ class Sheet():
         """ アイテムオブジェクトを返す """
         return self.current_items()
 
+    @property
+    def rows(self):
+        """ 行の並びと値を行ごとのリストにして返す。
+        Returns:
+            List[Tuple[int, List[Object]]]: アイテムIDと値のリスト
+        """
+        return list(self.current_rows())
+
     def get_item_type_conversion(self):
         """ アイテムの型。 
         Returns:
@@ -203,9 +460,7 @@ class Sheet():
         Returns:
             Object: 値
         """
-        itemindex, _r = self.rows[row]
-        item = self.items[itemindex]
-        return item
+        return self.items[self.roworder[row]]
     
     def top(self):
         """ @method [t]
@@ -232,12 +487,12 @@ class Sheet():
         Returns:
             Object: 値
         """
-        itemindex, r = self.rows[row]
+        itemindex = self.roworder[row]
         icol, col = self.select_column(column)
         if icol == -1:
             obj = col.eval(self.items[itemindex], context)
         else:
-            obj = r[icol]
+            obj = self.get_cell(itemindex, icol, context)
         return obj
     
     def find(self, context, app, column, value):
@@ -265,17 +520,30 @@ class Sheet():
         icol, col = self.select_column(column)
         if col.is_nonstring_column():
             method = SEARCH_METHOD_EQUAL
-
-        pred = make_data_search_predicate(method, col, context)
         
-        # 順に検索
-        for ival, obj in enumerate(self.column_values(context, icol, col)):
-            if pred(obj, value):
-                item = self.items[self.get_item_from_row(ival)]
-                index = context.new_object(ival, type="Int")
-                return ElemObject(item, index, obj)
+        if icol == -1:
+            # 新しいカラムを増やす
+            icol = len(self.viewcolumns)
+            self.generate_rows_concat(context, [col])
+
+        if method == SEARCH_METHOD_PARTIAL_MATCH:
+            # 順に検索
+            pred = make_data_search_predicate(method, col, context)
+            irow = None
+            for ival, obj in enumerate(self.column_values(context, icol, col)):
+                if pred(obj, value):
+                    irow = ival
+                    break
+        else:
+            # インデックスで検索
+            irow = self.lookup_column_index(context, icol, method, value)
 
-        raise NotFound() # 見つからなかった
+        if irow is None:
+            raise NotFound() # 見つからなかった
+        
+        itemindex = self.get_item_from_row(irow)
+        index = context.new_object(irow, type="Int")
+        return ElemObject(self.items[itemindex], index, self.get_cell(itemindex, icol, context))
     
     def pick_in_first_column(self, context, _app, value):
         """ @method task context [#]
@@ -286,41 +554,102 @@ class Sheet():
         Returns:
             Object: アイテム
         """
-        fi, bi = None, None
-        col = self.get_first_column()
-        for ival, obj in enumerate(self.column_values(context, None, col)):
-            s = col.stringify(context, obj)
-            if s.startswith(value):
-                fi = ival
-                break
-            elif bi is None and s.endswith(value):
-                bi = ival
-
-        iitem = fi if fi is not None else bi
-        if iitem is None:
+        self.get_first_column()
+        irow = self.lookup_column_index(context, 0, SEARCH_METHOD_FORWARD_MATCH, value)
+        if irow is None:
+            irow = self.lookup_column_index(context, 0, SEARCH_METHOD_BACKWARD_MATCH, value)
+        if irow is None:
             raise NotFound()
-        return self.items[self.get_item_from_row(iitem)]
+        return self.items[self.get_item_from_row(irow)]
+
+    def get_column_index(self, context, icol, method):
+        """ 
+        カラムの検索インデックスを得る。無ければ作成する。
+        Params:
+            icol(int): カラム番号
+            method(int): SEARCH_METHOD_XXX
+        Returns:
+            Union[HashColumnIndex, PrefixColumnIndex]:
+        """
+        key = (icol, method)
+        index = self._colindexes.get(key)
+        if index is not None:
+            return index
+        
+        col = self.viewcolumns[icol]
+        values = self.eval_column(icol, context)
+        if method == SEARCH_METHOD_EQUAL:
+            index = HashColumnIndex((i, values[i]) for i in self.roworder)
+        elif method == SEARCH_METHOD_FORWARD_MATCH or method == SEARCH_METHOD_BACKWARD_MATCH:
+            entries = [(i, col.stringify(context, values[i])) for i in self.roworder]
+            index = PrefixColumnIndex(entries, reverse=(method == SEARCH_METHOD_BACKWARD_MATCH))
+        else:
+            raise ValueError("Unsupported search method for index")
+        self._colindexes[key] = index
+        return index
+
+    def lookup_column_index(self, context, icol, method, value) -> Optional[int]:
+        """ 
+        検索インデックスを引き、一致する最初の行番号を返す。 
+        Returns:
+            Optional[int]: 見つからなければNone
+        """
+        index = self.get_column_index(context, icol, method)
+        rowmap = self.get_row_map()
+        rows = [rowmap[i] for i in index.lookup(value) if i in rowmap]
+        if not rows:
+            return None
+        return min(rows)
+
+    def invalidate_indexes(self, *, columns=True):
+        """ 
+        検索インデックスを破棄する。
+        Params:
+            columns(bool): Falseなら行の並びの変更のみを反映する
+        """
+        self._rowmap = None
+        if columns:
+            self._colindexes = {}
+
+    def get_row_map(self) -> Dict[int, int]:
+        """ アイテムIDから行番号を引く辞書 """
+        if self._rowmap is None:
+            self._rowmap = {itemindex:irow for irow, itemindex in enumerate(self.roworder)}
+        return self._rowmap
 
     def get_row_from_item(self, itemindex) -> int:
-        """ アイテムIDから行番号を取得する。 線形探索を行う。"""
-        for irow, (iitem, _row) in enumerate(self.rows):
-            if iitem == itemindex:
-                return irow
-        raise ValueError("Invalid item index")
+        """ アイテムIDから行番号を取得する。"""
+        irow = self.get_row_map().get(itemindex)
+        if irow is None:
+            raise ValueError("Invalid item index")
+        return irow
     
     def get_item_from_row(self, rowindex) -> int:
         """ 行番号からアイテムIDを取得する。"""
-        iitem, _row = self.rows[rowindex]
-        return iitem
+        return self.roworder[rowindex]
+
+    def get_cell(self, itemindex, icol, context=None) -> Object:
+        """ アイテムIDとカラム番号で値を取得する。未計算であれば計算する。 """
+        self.fill_columns()
+        values = self.columnvalues[icol]
+        obj = values[itemindex]
+        if obj is None:
+            obj = self.viewcolumns[icol].eval(self.items[itemindex], context or self.evalcontext)
+            values[itemindex] = obj
+        return obj
+
+    def get_item_row(self, itemindex, context=None) -> List[Object]:
+        """ アイテムIDで指定した行の値を集める。 """
+        return [self.get_cell(itemindex, icol, context) for icol in range(len(self.viewcolumns))]
 
     def current_rows(self):
         """ 現在有効なすべての行を取得する。 """
-        for itemindex, rows in self.rows:
-            yield itemindex, rows
+        for itemindex in self.roworder:
+            yield itemindex, self.get_item_row(itemindex)
     
     def current_items(self):
         """ 現在有効なアイテムを取得する。 """
-        for itemindex, _ in self.rows:
+        for itemindex in self.roworder:
             yield self.items[itemindex]
 
     def columns(self):
@@ -341,19 +670,18 @@ class Sheet():
         """
         if column is None:
             icol, col = self.select_column(index)
+        elif index is None:
+            icol, col = self.viewcolumns.index(column), column
         else:
             icol, col = index, column
 
         if icol == -1:
             # 新しいカラムを増やす
-            self.generate_rows_concat(context, [col])
             icol = len(self.viewcolumns)
-            self.viewcolumns.append(col)
+            self.generate_rows_concat(context, [col])
 
-        for itemindex, _row in self.rows:
-            subject = self.items[itemindex]
-            obj = col.eval(subject, context)
-            yield obj
+        for itemindex in self.roworder:
+            yield self.get_cell(itemindex, icol, context)
     
     def row_values(self, index):
         """ @method
@@ -363,8 +691,7 @@ class Sheet():
         Returns:
             Tuple:
         """
-        _itemindex, row = self.rows[index]
-        return row
+        return self.get_item_row(self.roworder[index])
     
     #
     # シーケンス関数
@@ -394,7 +721,7 @@ class Sheet():
         Returns:
             int: 個数
         """
-        return len(self.rows)
+        return len(self.roworder)
 
     # 選択
     def select(self, rowindex):
@@ -405,8 +732,8 @@ class Sheet():
         Returns:
             bool: 選択できたか
         """
-        if 0 <= rowindex < len(self.rows):
-            itemindex = self.rows[rowindex][0]
+        if 0 <= rowindex < len(self.roworder):
+            itemindex = self.roworder[rowindex]
             self._selection = (itemindex, rowindex)
             return True
         return False
@@ -420,7 +747,7 @@ class Sheet():
             bool: 選択できたか
         """
         if 0 <= itemindex < len(self.items):
-            rowindex = self.get_row_from_item(itemindex)
+            rowindex = self.get_row_map().get(itemindex)
             if rowindex is not None:
                 self._selection = (itemindex, rowindex)
                 return True
@@ -458,14 +785,14 @@ class Sheet():
         """ 選択中の行を得る。 """
         if self._selection is None:
             raise NotSelected()
-        _index, row = self.rows[self._selection[1]]
-        return row
+        return self.get_item_row(self.roworder[self._selection[1]])
 
     def _reselect(self):
         """ データ変更後に選択を引き継ぐ """
         if self._selection is not None:
             itemindex, _rowindex = self._selection
-            self.select_by_item(itemindex)
+            if not self.select_by_item(itemindex):
+                self._selection = None # 行が取り除かれた
     
     #
     # カラムを操作する
@@ -520,102 +847,321 @@ class Sheet():
         """
         col, *_ = make_data_columns(column)
         self.viewcolumns.append(col)
+        touch_display(self)
 
     #
     # 行の生成
     #
-    def generate_rows(self, context, newcolumns):
-        """ 値を計算し、新たに設定する """
-        newrows = []
-        for itemindex, item in enumerate(self.items):
-            newrow = [col.eval(item, context) for col in newcolumns]
-            newrows.append((itemindex, newrow)) # 新しい行
+    def eval_column(self, icol, context=None):
+        """ 有効な行について、カラムの値をすべて計算する。 
+        Returns:
+            List[Object]: アイテムIDで引く値の配列
+        """
+        self.fill_columns()
+        values = self.columnvalues[icol]
+        column = self.viewcolumns[icol]
+        context = context or self.evalcontext
+        items = self.items
+        for itemindex in self.roworder:
+            if values[itemindex] is None:
+                values[itemindex] = column.eval(items[itemindex], context)
+        return values
+
+    def eval_columns(self, context=None, icols=None, *, workers=None, spirit=None, rows=None):
+        """ 有効な行について、複数のカラムの値をまとめて計算する。
+        Params:
+            context(InvocationContext): 
+            icols(Sequence[int]): カラム番号。Noneなら全てのカラム
+            workers(int): 並行して計算するスレッドの数。Noneか1なら順に計算する
+            spirit(Spirit): 進捗の表示と中断に用いる
+            rows(Sequence[int]): 計算するアイテムID。Noneなら全ての有効な行
+        Returns:
+            int: 計算した行の数
+        """
+        self.fill_columns()
+        context = context or self.evalcontext
+        if icols is None:
+            icols = list(range(len(self.viewcolumns)))
+        if rows is None:
+            rows = self.roworder
+        columnvalues = [self.columnvalues[icol] for icol in icols]
+        pending = [x for x in rows if any(values[x] is None for values in columnvalues)]
+        if not pending:
+            return 0
+        
+        chunks = [pending[i:i+PARALLEL_EVAL_CHUNK_ROWS] for i in range(0, len(pending), PARALLEL_EVAL_CHUNK_ROWS)]
+        key = None
+        if spirit is not None:
+            key = spirit.start_progress_display(total=len(pending))
+        try:
+            if workers is None or workers <= 1 or len(chunks) == 1: # ひとつのまとまりならスレッドを用意しない
+                columns = [self.viewcolumns[icol] for icol in icols]
+                for chunk in chunks:
+                    self._eval_chunk(chunk, columns, columnvalues, context)
+                    if spirit is not None:
+                        spirit.interruption_point(progress=len(chunk))
+            else:
+                self._eval_chunks_parallel(chunks, icols, columnvalues, context, workers, spirit)
+        finally:
+            if spirit is not None:
+                spirit.finish_progress_display(key=key)
+        return len(pending)
+
+    def _eval_chunk(self, itemindices, columns, columnvalues, context, stopped=None):
+        """ 行のまとまりについて値を計算し、アイテムIDの位置に書き込む """
+        items = self.items
+        for itemindex in itemindices:
+            if stopped is not None and stopped.is_set():
+                break
+            for column, values in zip(columns, columnvalues):
+                if values[itemindex] is None:
+                    values[itemindex] = column.eval(items[itemindex], context)
+        return len(itemindices)
+
+    def _eval_chunks_parallel(self, chunks, icols, columnvalues, context, workers, spirit):
+        """ スレッドプールで行のまとまりを計算する。投入するまとまりの数はスレッド数に応じて制限する """
+        local = threading.local()
+        stopped = threading.Event()
+        def work(chunk):
+            # コンテキストと列はスレッドごとに用意する
+            state = getattr(local, "state", None)
+            if state is None:
+                columns = [self.viewcolumns[icol].clone_for_thread() for icol in icols]
+                state = local.state = (context.inherit(), columns)
+            subcontext, columns = state
+            return self._eval_chunk(chunk, columns, columnvalues, subcontext, stopped)
+
+        backlog = workers * PARALLEL_EVAL_BACKLOG
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = set()
+            try:
+                nextchunk = 0
+                while nextchunk < len(chunks) or running:
+                    while nextchunk < len(chunks) and len(running) < backlog:
+                        running.add(executor.submit(work, chunks[nextchunk]))
+                        nextchunk += 1
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        count = future.result()
+                        if spirit is not None:
+                            spirit.interruption_point(progress=count)
+            except BaseException:
+                # 未着手のまとまりを取り消し、実行中のスレッドも次の行で止める
+                stopped.set()
+                for future in running:
+                    future.cancel()
+                raise
+
+    def prepare_columns(self, context, icols=None, rows=None, *, spirit=None):
+        """ 値を使う前に、カラムの値をスレッドプールでまとめて計算しておく。
+        並行計算が指定されていなければ何もせず、値は必要になった時点で計算される。
+        Params:
+            context(InvocationContext): 
+            icols(Sequence[int]): カラム番号。Noneなら全てのカラム
+            rows(Sequence[int]): アイテムID。Noneなら全ての有効な行
+            spirit(Spirit): 進捗の表示と中断に用いる
+        """
+        if not self.evalworkers or (icols is not None and not icols):
+            return
+        self.eval_columns(context, icols, workers=self.evalworkers, spirit=spirit, rows=rows)
 
-        self.rows = newrows
+    def generate_rows(self, context, newcolumns):
+        """ 列を新たに設定する。値は必要になった時点で計算する """
+        self.columnvalues = [[None] * len(self.items) for _ in newcolumns]
+        self.roworder = list(range(len(self.items)))
         self.viewcolumns = newcolumns
+        self.evalcontext = context
+        self.invalidate_indexes()
+        touch_display(self)
 
     def generate_rows_concat(self, context, newcolumns):
-        """ 値を計算し、現在の列の後ろに追加する """
-        newrows = []
-        for itemindex, currow in self.rows:
-            item = self.items[itemindex]
-            newrow = [col.eval(item, context) for col in newcolumns]
-            newrows.append((itemindex, currow+newrow)) # 既存の行の後ろに結合
-
-        self.rows = newrows
+        """ 列を現在の列の後ろに追加する。値は必要になった時点で計算する """
+        newvalues = [[None] * len(self.items) for _ in newcolumns]
+        self.columnvalues = self.columnvalues + newvalues # 既存の列はそのまま共有する
         self.viewcolumns = self.viewcolumns + newcolumns
+        self.evalcontext = context
+        touch_display(self)
+    
+    def fill_columns(self):
+        """ add_columnで追加された列の値の配列を用意する """
+        if len(self.columnvalues) < len(self.viewcolumns):
+            count = len(self.viewcolumns) - len(self.columnvalues)
+            self.columnvalues = self.columnvalues + [[None] * len(self.items) for _ in range(count)]
     
     def generate_rows_identical(self):
         """ アイテム自体を値とし、"@"演算子を列に設定する """
-        newrows = []
-        for itemindex, item in enumerate(self.items):
-            newrows.append((itemindex, [item]))
-        self.rows = newrows
+        self.columnvalues = [list(self.items)]
+        self.roworder = list(range(len(self.items)))
         self.viewcolumns = [ItemItselfColumn()] # identical
+        self.invalidate_indexes()
+        touch_display(self)
     
     def insert_items_and_generate_rows(self, context, rowindex, items):
         """ 一連のアイテムを追加し、値を計算して行も追加する """
         if not self.viewcolumns:
             raise ValueError("uninitialized")
         
-        indexstart = rowindex if rowindex != -1 else len(self.items)
-        
-        # 行の値を生成する
-        newrows = []
-        for i, item in enumerate(items, start=indexstart):
-            newrow = [col.eval(item, context) for col in self.viewcolumns]
-            newrows.append((i, newrow))
+        items = list(items)
+        count = len(items)
+        if rowindex == -1 or rowindex >= len(self.roworder):
+            rowindex = len(self.roworder)
+            pos = len(self.items) # 後ろに追加する
+        else:
+            pos = self.roworder[rowindex] # 挿入先の行のアイテムの前に追加する
+
+        # 列の値は後から計算する
+        self.fill_columns()
+        newvalues = [[None] * count for _ in self.viewcolumns]
+        if self.evalcontext is None:
+            self.evalcontext = context
         
-        if rowindex == -1:
-            # 後ろに追加する
-            self.items = self.items + list(items)
-            self.rows = self.rows + newrows
+        # 挿入する
+        self.items = self.items[:pos] + items + self.items[pos:]
+        self.columnvalues = [values[:pos] + newvals + values[pos:] for values, newvals in zip(self.columnvalues, newvalues)]
+
+        # 後ろのアイテムのIDをずらす
+        order = [x + count if x >= pos else x for x in self.roworder]
+        order[rowindex:rowindex] = range(pos, pos + count)
+        self.roworder = order
+        self.invalidate_indexes()
+        if self._selection is not None and self._selection[0] >= pos:
+            self._selection = (self._selection[0] + count, self._selection[1])
+        touch_display(self)
+        self._reselect()
+
+
+    def extend_items(self, items):
+        """ アイテムを末尾に追加する。値は必要になった時点で計算する。
+        Params:
+            items(Sequence[Object]):
+        Returns:
+            int: 追加した数
+        """
+        count = len(items)
+        if count == 0:
+            return 0
+        start = len(self.items)
+        self.items.extend(items)
+        self.fill_columns()
+        for values in self.columnvalues:
+            values.extend([None] * count)
+        self.roworder.extend(range(start, start + count))
+        self.invalidate_indexes()
+        touch_display(self)
+        return count
+
+    def extend_from_stream(self, context, iterable, itemtype=None, *, spirit=None, chunksize=STREAM_CHUNK_ROWS, display=False):
+        """ イテラブルから少しずつアイテムを読み込み、行を追加していく。
+        一度で読み終わらなければ進捗を表示し、中断されたらそれまでに読み込んだ行を残して終了する。
+        Params:
+            context(InvocationContext):
+            iterable(Iterable[Any]): 値を生成するイテラブル
+            itemtype(Type): 値の型。省略するとシートの型変換を用いる
+            spirit(Spirit): 進捗の表示と中断に用いる
+            chunksize(int): 一度に読み込む数
+            display(bool): 読み込むたびに、表を画面に表示して行を追加していく
+        Returns:
+            bool: 最後まで読み込んだか
+        """
+        iterator = iter(iterable)
+        if itemtype is None:
+            itemtype = self.typeconversion
+        if self.evalcontext is None:
+            self.evalcontext = context
+        key = None
+        view = None
+        completed = False
+        try:
+            while True:
+                chunk = [context.new_object(x, type=itemtype) for x in itertools.islice(iterator, chunksize)]
+                self.extend_items(chunk)
+                if len(chunk) < chunksize:
+                    completed = True
+                    break
+                if spirit is None:
+                    continue
+                if display:
+                    view = self._post_stream_view(context, spirit, view)
+                if key is None:
+                    key = spirit.start_progress_display(title="読み込み中")
+                if not spirit.interruption_point(progress=len(chunk), nowait=True, noexception=True):
+                    break
+        finally:
+            if key is not None:
+                spirit.finish_progress_display(key=key)
+            if view is not None:
+                self._post_stream_view(context, spirit, view, end=True) # 残りの行を追加して表示を終える
+            if not completed and inspect.isgenerator(iterator):
+                iterator.close() # 読み残したジェネレータの後始末をする
         
+        if not completed:
+            self._truncated = True
+            if spirit is not None:
+                spirit.post("warn", "読み込みを中断しました：{}件まで読み込みました".format(len(self.items)))
+        return completed
+
+    def _post_stream_view(self, context, spirit, view, *, end=False):
+        """ 読み込んだ行を表示する。最初に表を表示し、以降は追加された行を送る """
+        if view is None:
+            view = self.string_table_view(context, "summarize")
+            view.prefetch(SHEETVIEW_PREFETCH_ROWS)
+            columns = [x.get_name() for x in self.get_current_columns()]
+            spirit.post("object-sheetview", rows=view, columns=columns, context=context, tabletype='sheet', streaming=True)
+            self._streamview = view
         else:
-            # 後ろの行のインデックスをずらす
-            tailrows = []
-            offset = rowindex + len(items)
-            for row in self.rows[rowindex:]:
-                index, values = row
-                tailrows.append((index+offset, values))
-        
-            # 挿入する
-            self.items = self.items[:rowindex] + list(items) + self.items[rowindex:]
-            self.rows = self.rows[:rowindex] + newrows + tailrows
+            start = len(view)
+            view.refresh(SHEETVIEW_PREFETCH_ROWS) # 最初に表示される範囲の行は、ここで計算しておく
+            spirit.post("object-sheetview-update", rows=view, start=start, end=end, context=context)
+        return view
+
+    def is_truncated(self):
+        """ 読み込みが中断され、一部のアイテムのみを持つか """
+        return self._truncated
 
 
-    def rows_to_string_table(self, context, method=None): 
+    def rows_to_string_table(self, context, method=None, start=None, stop=None): 
         """ 
-        計算済みのメンバ値をすべて文字列へ変換する。 
+        メンバ値を文字列へ変換する。 
         Params:
             context(InvocationContext):
             method(int): DATASET_STRINGIFY_XXXフラグ
+            start(int): 変換する最初の行
+            stop(int): 変換する最後の行の次
         Returns:
             List[Tuple[int, List[str]]]: 行番号と値の文字列からなる行のリスト
         """
+        return self.stringify_rows(context, self.roworder[start:stop], method)
+
+    def stringify_rows(self, context, itemindices, method=None):
+        """ アイテムIDで指定した行を文字列へ変換する。 """
         srows = []
         if method == "summarize":
             meth = DATASET_STRINGIFY_SUMMARIZE
         else:
             meth = DATASET_STRINGIFY
-        for itemindex, row in self.rows:
-            srow = ["" for _ in self.viewcolumns]
-            for i, column in enumerate(self.viewcolumns):
-                s = column.stringify(context, row[i], meth)
-                srow[i] = s
+        self.fill_columns()
+        columns = list(enumerate(self.viewcolumns))
+        for itemindex in itemindices:
+            srow = [column.stringify(context, self.get_cell(itemindex, icol, context), meth) for icol, column in columns]
             srows.append((itemindex, srow))
         return srows
 
+    def string_table_view(self, context, method=None):
+        """ 
+        表示範囲の行だけを文字列に変換する表を作る。
+        Params:
+            context(InvocationContext):
+            method(int): DATASET_STRINGIFY_XXXフラグ
+        Returns:
+            SheetStringTable:
+        """
+        return SheetStringTable(self, context, method)
+
     # 
     # ビューの列を変更する
     #
-    def _apply_view(self, context, columns, rowcommand):
-        # 空のデータからは空のビューしか作られない
-        if not self.items:
-            self.rows = []
-            return
-
-        # 列を新規作成
+    def _apply_view(self, context, columns, rowcommand, parallel=None):
+        # 列を新規作成する。空のデータでも、後から追加されるアイテムのために列を設定しておく
         newcolumns = make_data_columns(*columns)
         
         # 行を設定する
@@ -623,14 +1169,20 @@ class Sheet():
             self.generate_rows(context, newcolumns)
         elif rowcommand == "c":
             self.generate_rows_concat(context, newcolumns)
+        
+        # 並行して計算するスレッド数を設定する。計算は値を使う操作が行われるまで遅らせる
+        if parallel:
+            self.evalworkers = parallel
+        elif rowcommand is None:
+            self.evalworkers = None
 
-    def view(self, context, *columns):
+    def view(self, context, *columns, parallel=None):
         """ @method context
         列を表示する。
         Params:
             *columns(Any): カラム表現
         """
-        self._apply_view(context, columns, None)
+        self._apply_view(context, columns, None, parallel)
     
     def view_extend(self, context, *columns):
         """ @method context alias-name [view+]
@@ -648,13 +1200,31 @@ class Sheet():
 
         self._apply_view(context, new_columns, "c")
     
-    def view_add(self, context, column, name=None):
+    def view_add(self, context, column, name=None, *, parallel=None):
         """ @method context alias-name [operate opr]
         カラムを一つ追加する。
         Params:
             column(Any): カラム表現
         """
-        self._apply_view(context, [column], "c")
+        self._apply_view(context, [column], "c", parallel)
+
+    def view_parallel(self, context, workers, *columns):
+        """ @method context alias-name [pview]
+        列を表示し、値をスレッドプールで並行して計算する。
+        ファイルやネットワークを読む、待ち時間の長い列に用いる。
+        Params:
+            workers(Int): 同時に計算するスレッドの数
+            *columns(Any): カラム表現
+        """
+        self._apply_view(context, columns, None, workers)
+    
+    def evaluate(self, context, app, workers=None):
+        """ @task context
+        表示中の列の値をすべて計算する。
+        Params:
+            workers?(Int): 同時に計算するスレッドの数。省略すると順に計算する
+        """
+        self.eval_columns(context, workers=workers or self.evalworkers, spirit=app)
 
     #
     # アイテム関数
@@ -701,15 +1271,74 @@ class Sheet():
             values[key] = row[i]
         return context.new_object(values, type=self.typeconversion)
 
+    def referenced_columns(self, view, predicate):
+        """
+        関数が参照するカラムを調べる。
+        Params:
+            view(SheetRowView): 
+            predicate(Function): 関数
+        Returns:
+            Tuple[List[int], bool]: 参照するカラム番号, カラムの値のみを参照するか
+        """
+        fn = getattr(predicate, "f", predicate)
+        if isinstance(fn, SelectorExpression):
+            if not isinstance(fn.selector, str) or fn.bindargs:
+                return [], False
+            members = [fn.selector]
+        else:
+            members = find_subject_members(predicate.get_expression())
+            if members is None:
+                return [], False
+        icols = []
+        columnonly = True
+        for member in members:
+            icol = view.get_column_index(member)
+            if icol is None:
+                columnonly = False
+            elif icol not in icols:
+                icols.append(icol)
+        return icols, columnonly
+
+    def row_function(self, context, predicate, *, spirit=None):
+        """
+        行に関数を適用する関数を作る。行のオブジェクトは作らず、SheetRowViewを使い回す。
+        Params:
+            predicate(Function): 関数
+            spirit(Spirit): カラムの値をまとめて計算する時に、進捗の表示と中断に用いる
+        Returns:
+            Callable[[int], Object]: アイテムIDを受け取る
+        """
+        view = SheetRowView(self, context)
+        icols, columnonly = self.referenced_columns(view, predicate)
+
+        # 参照されるカラムだけを先に計算しておく
+        self.prepare_columns(context, icols, spirit=spirit)
+
+        # カラムの値をそのまま返す
+        fn = getattr(predicate, "f", predicate)
+        if isinstance(fn, SelectorExpression) and columnonly and len(icols) == 1:
+            icol = icols[0]
+            def cell(itemindex):
+                return self.get_cell(itemindex, icol, context)
+            return cell
+
+        # カラムの値のみを参照するなら、アイテムの型変換を省く
+        if columnonly:
+            view.skip_conversion()
+
+        def run(itemindex):
+            return predicate.run(view.bind(itemindex), context)
+        return run
+
     def foreach(self, context, _app, predicate):
         """ @task context [%]
         行に関数を適用する。
         Params:
             predicate(Function[seq]): 関数
         """
-        for entry in self.rows:
-            subject = self.row_to_object(context, *entry)
-            predicate.run(subject, context)
+        fn = self.row_function(context, predicate, spirit=_app)
+        for itemindex in self.roworder:
+            fn(itemindex)
     
     def filter(self, context, _app, predicate):
         """ @task context [&]
@@ -717,12 +1346,11 @@ class Sheet():
         Params:
             predicate(Function[seq]): 述語関数
         """
-        # 関数を行に適用する
-        def fn(entry):
-            subject = self.row_to_object(context, *entry)
-            return predicate.run(subject, context).test_truth()
-        
-        self.rows = list(filter(fn, self.rows))
+        # 関数を行に適用する。表示するだけのカラムは、残った行についてのみ後で計算される
+        fn = self.row_function(context, predicate, spirit=_app)
+        self.roworder = [x for x in self.roworder if fn(x).test_truth()]
+        self.invalidate_indexes(columns=False) # 残った行はインデックスに含まれている
+        touch_display(self)
 
         # 選択を引き継ぐ
         self._reselect()
@@ -734,16 +1362,132 @@ class Sheet():
             sorter?(Function[seq]): 並べ替え関数
         """
         if sorter is not None:
-            def sortkey(entry):
-                subject = self.row_to_object(context, *entry)
-                return sorter.run(subject, context).test_truth()
-            self.rows.sort(key=sortkey)
+            # 関数の値を一度ずつ計算してから並べる
+            keys = [None] * len(self.items)
+            fn = self.row_function(context, sorter, spirit=_app)
+            for itemindex in self.roworder:
+                keys[itemindex] = fn(itemindex).value
+            self._set_sorted_order(sort_by_keys(self.roworder, [(keys, True)]))
+        else:
+            self._set_sorted_order(sorted(self.roworder)) # アイテムの順に戻す
+    
+    def sortby(self, context, _app, key, top=None):
+        """ @task context
+        カラムの値で行の順番を並べ替える。
+        Params:
+            key(Str): カンマで区切ったカラム名。!を前に付けると降順
+            top?(Int): 先頭から指定の数の行のみを残す
+        """
+        keycolumns = []
+        for name, ascend in parse_sortkey(key).get_predicates():
+            name = name.strip()
+            if not name:
+                name = self.get_first_column().get_name()
+            values = self.eval_column_by_name(context, name, spirit=_app)
+            keycolumns.append(([None if v is None else v.value for v in values], ascend))
+        
+        self._set_sorted_order(sort_by_keys(self.roworder, keycolumns, top))
+
+    def eval_column_by_name(self, context, name, *, spirit=None):
+        """ 
+        カラムの値を有効な行についてすべて計算する。ビューに無いカラムは追加せずに計算する。
+        Params:
+            name(Any): カラム名またはカラム表現
+            spirit(Spirit): 進捗の表示と中断に用いる
+        Returns:
+            List[Optional[Object]]: アイテムIDで引く値の配列
+        """
+        icol, col = self.select_column(name)
+        if icol == -1:
+            values = [None] * len(self.items)
+            for itemindex in self.roworder:
+                values[itemindex] = col.eval(self.items[itemindex], context)
+            return values
         else:
-            self.rows.sort()
+            self.prepare_columns(context, [icol], spirit=spirit)
+            return self.eval_column(icol, context)
+
+    def _set_sorted_order(self, order):
+        self.roworder = order
+        self.invalidate_indexes(columns=False)
+        touch_display(self)
         
         # 選択を引き継ぐ
         self._reselect()
     
+    #
+    # 集計
+    #
+    def group(self, context, app, key, *aggregates):
+        """ @task context
+        カラムの値が等しい行をまとめて集計し、新しいシートを作る。
+        Params:
+            key(Str): まとめる値のカラム表現
+            *aggregates(Str): 集計の式。count, sum:size のように関数名とカラム表現を:で繋げる。関数は count sum min max mean first collect
+        Returns:
+            Sheet: キーと集計値を列とするシート
+        """
+        keyvalues = self.eval_column_by_name(context, key, spirit=app)
+        return self._aggregate(context, app, key, keyvalues, aggregates)
+    
+    def aggregate(self, context, app, *aggregates):
+        """ @task context
+        全ての行を集計し、一行のシートを作る。
+        Params:
+            *aggregates(Str): 集計の式。count, sum:size のように関数名とカラム表現を:で繋げる。
+        Returns:
+            Sheet: 集計値を列とするシート
+        """
+        return self._aggregate(context, app, None, None, aggregates)
+
+    def _aggregate(self, context, app, key, keyvalues, aggregates):
+        """ キーの値を辞書に振り分けながら、一度の走査で集計する """
+        if not aggregates:
+            aggregates = ("count",)
+        fns = []
+        operands = []
+        for expression in aggregates:
+            fn, operand = parse_aggregate(expression)
+            fns.append(fn)
+            # 計算済みのカラムの値を使う
+            operands.append(self.eval_column_by_name(context, operand, spirit=app) if operand else None)
+        
+        groups = {} # キー -> (キーのオブジェクト, 集計の状態)
+        for itemindex in self.roworder:
+            if keyvalues is None:
+                keyobj, hkey = None, None
+            else:
+                keyobj = keyvalues[itemindex]
+                hkey = _hashable_group_key(keyobj.value)
+            entry = groups.get(hkey)
+            if entry is None:
+                entry = groups[hkey] = (keyobj, [fn.start() for fn in fns])
+            states = entry[1]
+            for i, (fn, values) in enumerate(zip(fns, operands)):
+                states[i] = fn.step(states[i], values[itemindex] if values is not None else None)
+
+        if keyvalues is None and not groups:
+            groups[None] = (None, [fn.start() for fn in fns]) # 行が無くても一行を作る
+
+        # 新しいシートを作る
+        names = [x.strip() for x in aggregates]
+        items = []
+        columnvalues = [[] for _ in fns]
+        for keyobj, states in groups.values():
+            items.append(keyobj if keyobj is not None else context.new_object(None))
+            for values, fn, state in zip(columnvalues, fns, states):
+                values.append(fn.finish(context, state))
+        if keyvalues is not None:
+            names.insert(0, key)
+            columnvalues.insert(0, list(items))
+        
+        sheet = Sheet(items, context=context, uninitialized=True)
+        sheet.viewcolumns = [ComputedColumn(name) for name in names]
+        sheet.columnvalues = columnvalues
+        sheet.roworder = list(range(len(items)))
+        sheet.evalcontext = context
+        return sheet
+    
     # any
     
     #
@@ -775,7 +1519,9 @@ class Sheet():
             Sheet: 新たなビュー
         """
         r = Sheet(self.items, typeconversion=self.typeconversion, uninitialized=True)
-        r.rows = self.rows.copy()
+        r.roworder = self.roworder.copy()
+        r.columnvalues = self.columnvalues.copy() # 同じアイテムの値を書き込むのみなので、列の配列は共有する
+        r.evalcontext = self.evalcontext
         r.viewcolumns = self.viewcolumns.copy()
         if self._selection is not None:
             r._selection = tuple(self._selection)
@@ -790,6 +1536,11 @@ class Sheet():
             Any: イテラブル型
             *columns(Str): カラム
         """
+        if inspect.isgenerator(value):
+            # 生成されるたびに行を追加し、表示する
+            sheet = Sheet([], typeconversion=itemtype, context=context, columns=columns)
+            sheet.extend_from_stream(context, value, itemtype, spirit=context.spirit, display=True)
+            return sheet
         try:
             iter(value)
         except TypeError:
@@ -802,17 +1553,253 @@ class Sheet():
         """ @meta """
         col = ", ".join([x.get_name() for x in self.get_current_columns()])
         conv = "({})".format(itemtype.get_conversion()) if itemtype else ""
-        return "[{}]{} {}件のアイテム".format(col, conv, self.count()) 
+        trunc = "（読み込みを中断）" if self._truncated else ""
+        return "[{}]{} {}件のアイテム{}".format(col, conv, self.count(), trunc) 
 
     def pprint(self, itemtype, app):
         """ @meta """
-        if len(self.rows) == 0:
+        streamview, self._streamview = self._streamview, None
+        if streamview is not None and streamview.is_showing(self):
+            # 読み込みながら表示した表をそのまま使う
+            app.post("message", self.summarize(itemtype))
+        elif len(self.roworder) == 0:
             text = "空です" + "\n"
             app.post("message", text)
         else:
             context = app.get_process().get_last_invocation_context() # 実行中のコンテキスト
-            rows = self.rows_to_string_table(context, "summarize")
+            rows = self.string_table_view(context, "summarize")
+            rows.prefetch(SHEETVIEW_PREFETCH_ROWS) # 最初に表示される範囲は、ここで計算しておく
             columns = [x.get_name() for x in self.get_current_columns()]
             app.post("object-sheetview", rows=rows, columns=columns, context=context, tabletype='sheet')
+            if self._truncated:
+                app.post("warn", "読み込みが中断されたため、一部のアイテムのみを表示しています")
+
+    
+
+#
+# 行のオブジェクト
+#
+class SheetRowView():
+    """
+    シートの行を、アイテムの型のメンバに計算済みのカラムの値を加えたオブジェクトとして見せる。
+    row_to_objectと同じくカラム名で値を参照できるが、行ごとに辞書や型を作らない。
+    行を移る間、同じインスタンスと型を使い回す。
+    """
+    def __init__(self, sheet, context):
+        self.sheet = sheet
+        self.context = context
+        self.itemindex = None
+        self._convert = sheet.typeconversion is not None
+        self._types = {} # 基底の型 -> ExtendedType
+        self._columns = {} # カラム名 -> カラム番号
+        self._methods = {}
+        from machaon.core.method import make_method_from_value, METHOD_INVOKEAS_BOUND_FUNCTION
+        for icol, col in enumerate(sheet.viewcolumns):
+            name = col.get_name()
+            if name in self._columns:
+                continue
+            self._columns[name] = icol
+            getter = SheetRowMemberGetter(self, icol, name)
+            m = make_method_from_value(getter, name, METHOD_INVOKEAS_BOUND_FUNCTION)
+            self._methods[m.get_name()] = m
+    
+    def get_column_index(self, name) -> Optional[int]:
+        """ カラム名からカラム番号を得る """
+        return self._columns.get(name)
+
+    def skip_conversion(self):
+        """ アイテムをシートの要素型に変換しない """
+        self._convert = False
+
+    def bind(self, itemindex) -> Object:
+        """ 行に移り、関数に渡すオブジェクトを返す """
+        self.itemindex = itemindex
+        item = self.sheet.items[itemindex]
+        if self._convert:
+            item = self.context.new_object(item, type=self.sheet.typeconversion)
+        t = self._types.get(item.type)
+        if t is None:
+            t = self._types[item.type] = ExtendedType(item.type, self._methods)
+        return Object(t, item.value)
+    
+    def get_cell(self, icol) -> Object:
+        return self.sheet.get_cell(self.itemindex, icol, self.context)
+
+
+class SheetRowMemberGetter:
+    def __init__(self, view, icol, name):
+        self.view = view
+        self.icol = icol
+        self.name = name
+
+    def get_action_name(self):
+        return "SheetRowMemberGetter<{}>".format(self.name)
+
+    def __call__(self, _value):
+        return self.view.get_cell(self.icol)
+
+
+def find_subject_members(expression) -> Optional[List[str]]:
+    """
+    式が主題オブジェクトから参照するメンバの名前を集める。
+    Params:
+        expression(str): 
+    Returns:
+        Optional[List[str]]: 判断できなければNone
+    """
+    if any(x in expression for x in SIGIL_QUOTERS):
+        return None # 文字列リテラルの中身は区別できない
+    tokens = expression.split()
+    if len(tokens) == 1:
+        return tokens # セレクタのみ
+    members = []
+    for i, token in enumerate(tokens):
+        if token == SIGIL_OBJECT_ID:
+            if i+1 >= len(tokens):
+                return None
+            members.append(tokens[i+1])
+        elif token.startswith(SIGIL_OBJECT_ID + SIGIL_OBJECT_LAMBDA_MEMBER):
+            members.append(token[2:])
+    return members
+
+#
+# 表示
+#
+SHEETVIEW_PREFETCH_ROWS = 500 # 表示の前に計算しておく行数
+
+_sheetview_executor = None
+
+def get_sheetview_executor():
+    """ 表示する行を変換するスレッド """
+    global _sheetview_executor
+    if _sheetview_executor is None:
+        _sheetview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheetview")
+    return _sheetview_executor
+
+class SheetStringTable():
+    """
+    シートの行を、要求された範囲だけ文字列に変換する。
+    rows_to_string_table の返すリストと同じく、添字とスライス、イテレートで行を取り出せる。
+    作成時点の並び、列、値の配列を参照するので、後からシートのビューが変わっても影響を受けない。
+    """
+    def __init__(self, sheet, context, method=None):
+        self.sheet = sheet
+        self.context = context
+        self.method = method
+        self._rows = {} # 行番号 -> 文字列の行
+        self._order = list(sheet.roworder) # 作成時点の並び
+        sheet.fill_columns()
+        self._items = sheet.items
+        self._columns = list(sheet.viewcolumns)
+        self._values = list(sheet.columnvalues)
+
+    def __len__(self):
+        return len(self._order)
+    
+    def __iter__(self):
+        # まとまった範囲ごとに変換する
+        for start in range(0, len(self._order), SHEETVIEW_PREFETCH_ROWS):
+            yield from self.window(start, start + SHEETVIEW_PREFETCH_ROWS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._order))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.window(start, stop)
+        if index < 0:
+            index += len(self._order)
+        if not 0 <= index < len(self._order):
+            raise IndexError(index)
+        return self.window(index, index+1)[0]
+
+    def _missing_range(self, start, stop):
+        missing = [i for i in range(start, stop) if i not in self._rows]
+        if not missing:
+            return None
+        return missing[0], missing[-1]+1
+
+    def _is_current(self):
+        """ シートの値の配列が作成時点のままか """
+        values = self.sheet.columnvalues
+        return len(values) >= len(self._values) and all(a is b for a, b in zip(values, self._values))
+
+    def refresh(self, prefetch=0):
+        """ シートの末尾に追加された行を加える。
+        先頭から指定の行数までは、他のスレッドから見える前に変換しておく。
+        Params:
+            prefetch(int): 変換しておく行数
+        """
+        order = list(self.sheet.roworder)
+        lo, hi = len(self._order), min(len(order), prefetch)
+        if lo < hi:
+            if self._is_current():
+                self.sheet.prepare_columns(self.context, range(len(self._columns)), order[lo:hi])
+            self._stringify(lo, hi, self.context, self._columns, order)
+        self._order = order
+
+    def is_showing(self, sheet):
+        """ シートの現在の行と列をそのまま表しているか """
+        return (self.sheet is sheet and self._order == sheet.roworder and self._is_current() 
+            and self._columns == sheet.viewcolumns)
+
+    def _stringify(self, lo, hi, context, columns, order=None):
+        """ 行の範囲を文字列に変換し、記録する """
+        if self.method == "summarize":
+            meth = DATASET_STRINGIFY_SUMMARIZE
+        else:
+            meth = DATASET_STRINGIFY
+        items = self._items
+        if order is None:
+            order = self._order
+        for i, itemindex in enumerate(order[lo:hi], start=lo):
+            srow = []
+            for column, values in zip(columns, self._values):
+                obj = values[itemindex]
+                if obj is None:
+                    obj = column.eval(items[itemindex], context)
+                    values[itemindex] = obj
+                srow.append(column.stringify(context, obj, meth))
+            self._rows[i] = (itemindex, srow)
+
+    def window(self, start, stop):
+        """ 範囲の行を変換して返す 
+        Params:
+            start(int): 
+            stop(int):
+        Returns:
+            List[Tuple[int, List[str]]]:
+        """
+        stop = min(stop, len(self._order))
+        r = self._missing_range(start, stop)
+        if r is not None:
+            lo, hi = r
+            if self._is_current():
+                icols = range(len(self._columns))
+                self.sheet.prepare_columns(self.context, icols, self._order[lo:hi]) # 表示する行の値のみを計算する
+            self._stringify(lo, hi, self.context, self._columns)
+        return [self._rows[i] for i in range(start, stop)]
+
+    def window_async(self, start, stop):
+        """ 範囲の行を別のスレッドで変換する。UIのスレッドを止めずに続きのページを得るために用いる。
+        Params:
+            start(int): 
+            stop(int):
+        Returns:
+            Future: 変換した行のリストを返す
+        """
+        return get_sheetview_executor().submit(self._window_isolated, start, stop)
+
+    def _window_isolated(self, start, stop):
+        # 実行中のプロセスとメッセージの状態を共有しないよう、コンテキストを派生させ列を複製する
+        stop = min(stop, len(self._order))
+        r = self._missing_range(start, stop)
+        if r is not None:
+            context = self.context.inherit()
+            columns = [x.clone_for_thread() for x in self._columns]
+            self._stringify(r[0], r[1], context, columns)
+        return [self._rows[i] for i in range(start, stop)]
 
-    
\ No newline at end of file
+    def prefetch(self, count):
+        """ 先頭の行を変換しておく """
+        self.window(0, count)
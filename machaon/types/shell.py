@@ -590,6 +590,26 @@ class Path:
             for dirname in dirnames:
                 yield Path(os.path.join(dirpath, dirname))
     
+    def walkfile_stream(self):
+        """ @method [walkfile-s]
+        サブディレクトリのファイルを再帰的に辿る。必要になった分だけ辿るイテレータを返す。
+        Returns:
+            Stream[Path]:
+        Decorates:
+            @ view: name extension modtime size
+        """
+        return self.walkfile()
+    
+    def walkdir_stream(self):
+        """ @method [walkdir-s]
+        サブディレクトリを再帰的に辿る。必要になった分だけ辿るイテレータを返す。
+        Returns:
+            Stream[Path]:
+        Decorates:
+            @ view: name extension modtime size
+        """
+        return self.walkdir()
+    
     def dialog(self):
         """ @method [dlg]
         ファイル・フォルダダイアログを開く。
@@ -605,7 +625,7 @@ class Path:
             predicate(Function[seq]): 述語関数
             depth?(int): 探索する階層の限界
         Returns:
-            Sheet[Path]
+            Sheet[Path]:
         Decorates:
             @ view: name extension modtime size
         """
@@ -617,6 +637,19 @@ class Path:
                 if predicate(filepath):
                     yield filepath
     
+    def search_stream(self, context, app, predicate, depth=3):
+        """ @task context [search-s]
+        ファイルを再帰的に検索する。必要になった分だけ検索するイテレータを返す。
+        Params:
+            predicate(Function[seq]): 述語関数
+            depth?(int): 探索する階層の限界
+        Returns:
+            Stream[Path]:
+        Decorates:
+            @ view: name extension modtime size
+        """
+        return self.search(context, app, predicate, depth)
+    
     def makedirs(self):
         """ @method
         パスが存在しない場合、ディレクトリとして作成する。途中のパスも作成する。
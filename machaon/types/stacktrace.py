@@ -7,6 +7,11 @@ import dis
 import traceback
 import types
 import pprint
+import reprlib
+import time
+import threading
+import weakref
+from collections import deque
 
 from machaon.core.message import InternalMessageError
 from machaon.cui import collapse_text, composit_text
@@ -19,9 +24,14 @@ class ErrorObject():
     def __init__(self, error, *, context=None):
         self.error = error
         self.context = context
+        self._release_scheduled = False # フレームを手放すのは最初に表示してから
     
     def get_error(self):
         return self.error
+
+    def release_frames(self):
+        """ トレースバックを要約に置き換え、フレームとローカル変数への参照を手放す """
+        release_error_frames(self.error)
     
     def get_error_typename(self):
         """ @method alias-name [error_typename]
@@ -70,7 +80,7 @@ class ErrorObject():
             Str:
         """
         excep = self.get_error()
-        return "".join(traceback.format_exception(type(excep), excep, excep.__traceback__))
+        return "".join(format_exception_chain(excep))
     
     def display_exception(self):
         """ @method 
@@ -95,13 +105,13 @@ class ErrorObject():
         
         excep2 = self.cause().get_error()
         if excep1 is excep2:
-            frames = traceback.extract_tb(excep1.__traceback__)
+            frames = traceback.extract_tb(traceback_of(excep1))
             first = frames[firstframedelta]
             last = frames[-1]
         else:
-            frames1 = traceback.extract_tb(excep1.__traceback__)
+            frames1 = traceback.extract_tb(traceback_of(excep1))
             first = frames1[firstframedelta]
-            frames2 = traceback.extract_tb(excep2.__traceback__)
+            frames2 = traceback.extract_tb(traceback_of(excep2))
             last = frames2[-1]
         
         lines.extend([x.rstrip() for x in traceback.format_list([last])])
@@ -193,12 +203,54 @@ class ErrorObject():
         app.post("message", "tb [level] var [varname]")
         app.post("message", "tb [level] showall")
 
+        # 表示し終えてから、猶予期間の後にフレームを手放す
+        if not self._release_scheduled:
+            self._release_scheduled = True
+            _schedule_frame_release(self)
+
 
 #
 #
 #
-def get_traceback(error, *, dive=None):
+def traceback_of(error):
+    """ 例外のトレースバック。手放されていれば要約を返す """
     tb = error.__traceback__
+    if tb is None:
+        tb = getattr(error, CAPTURED_TRACEBACK_ATTR, None)
+    return tb
+
+def format_exception_chain(error):
+    """ 
+    traceback.format_exceptionと同様に、原因となった例外を含めて表示する。
+    フレームを手放した例外は要約を用いる。
+    Returns:
+        List[str]:
+    """
+    chain = [] # (例外, 次の例外との関係)
+    seen = set()
+    e, relation = error, None
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        chain.append((e, relation))
+        if e.__cause__ is not None:
+            e, relation = e.__cause__, CHAINED_CAUSE_MESSAGE
+        elif e.__context__ is not None and not e.__suppress_context__:
+            e, relation = e.__context__, CHAINED_CONTEXT_MESSAGE
+        else:
+            e = None
+    
+    lines = []
+    for e, relation in reversed(chain): # 元の例外から表示する
+        lines.extend(traceback.format_exception(type(e), e, traceback_of(e), chain=False))
+        if relation is not None:
+            lines.append(relation)
+    return lines
+
+CHAINED_CAUSE_MESSAGE = "\nThe above exception was the direct cause of the following exception:\n\n"
+CHAINED_CONTEXT_MESSAGE = "\nDuring handling of the above exception, another exception occurred:\n\n"
+
+def get_traceback(error, *, dive=None):
+    tb = traceback_of(error)
     if tb is None:
         return None
     tbo = TracebackObject(tb, error)
@@ -263,7 +315,7 @@ class TracebackObject():
             if hasattr(exc, "child_exception"):
                 e = exc.child_exception()
                 if e:
-                    return e.__traceback__, e
+                    return traceback_of(e), e
             return None, exc
 
         tb = self._tb
@@ -440,6 +492,16 @@ class FrameObject:
             builtins=self._fr.f_builtins
         )
 
+    def is_captured(self):
+        """ フレームが要約に置き換えられているか """
+        return isinstance(self._fr, CapturedFrame)
+
+    def signature(self):
+        """ 実行中の関数のシグニチャ """
+        if self.is_captured():
+            return self._fr.f_signature
+        return display_frame_signature(self._fr.f_code, self._fr.f_locals, self._fr.f_globals)
+
     def get_variable(self, name):
         """ @task [var] 
         変数を取得する。
@@ -448,6 +510,8 @@ class FrameObject:
         Returns:
             Any:
         """
+        if self.is_captured():
+            return self._fr.get_variable(name)
         ins = None
         for attr in name.split("."):
             if ins is None:
@@ -463,6 +527,8 @@ class FrameObject:
         Returns:
             ObjectCollection:
         """
+        if self.is_captured():
+            return dict(self._fr.f_variables) # 要約した時点の命令までの変数
         dic = {}
         cxt = self._loader_context()
         for va in disasm_variable_instructions(self._fr.f_code, lastoffset):
@@ -475,6 +541,9 @@ class FrameObject:
         Returns:
             Tuple[Str]:
         """
+        if self.is_captured():
+            yield from self._fr.f_variables.keys()
+            return
         for va in disasm_variable_instructions(self._fr.f_code, lastoffset):
             yield va.name()
 
@@ -530,6 +599,215 @@ class FrameObject:
         return "<FrameObject at {}, {}>".format(self.filepath, self.lastline)
 
 
+#
+#
+# トレースバックの要約
+#
+#
+ERROR_REPR_LIMIT = 200 # 変数の表示文字列の最大長
+ERROR_MAX_FRAMES = 64 # 要約に残すフレームの最大数（先頭と末尾から半数ずつ）
+ERROR_GRACE_PERIOD = 60.0 # 最初に表示してからフレームへの参照を保持する秒数。Noneなら手放さない
+CAPTURED_TRACEBACK_ATTR = "_captured_traceback"
+
+_NO_GLOBALS = types.MappingProxyType({})
+
+class CapturedRepr(str):
+    """ 切り詰められた変数の表示文字列 """
+    def __repr__(self):
+        return str(self)
+
+
+class CapturedFrame:
+    """
+    フレームの要約。
+    tracebackモジュールやFrameObjectから扱えるよう、フレームと同じ名前の属性を持つ。
+    ローカル変数は値を参照せず、切り詰めた表示文字列として保持する。
+    """
+    __slots__ = ("f_code", "f_lineno", "f_lasti", "f_back", "f_locals", "f_variables", "f_signature")
+    f_globals = _NO_GLOBALS
+    f_builtins = _NO_GLOBALS
+
+    def __init__(self, frame, lasti, reprs):
+        self.f_code = frame.f_code
+        self.f_lineno = frame.f_lineno
+        self.f_lasti = lasti
+        self.f_back = None
+        self.f_locals = {k:reprs(v) for k, v in frame.f_locals.items()}
+        self.f_variables = {}
+        self.f_signature = display_frame_signature(frame.f_code, frame.f_locals, frame.f_globals)
+        try:
+            cxt = _InstrContext(locals=frame.f_locals, globals=frame.f_globals, builtins=frame.f_builtins)
+            for va in disasm_variable_instructions(frame.f_code, lasti):
+                value = va.load(cxt)
+                self.f_variables[va.name()] = CapturedRepr("<undefined>") if isinstance(value, UndefinedValue) else reprs(value)
+        except Exception:
+            pass # CPython以外では命令を解析できない
+
+    def get_variable(self, name):
+        if name in self.f_variables:
+            return self.f_variables[name]
+        elif name in self.f_locals:
+            return self.f_locals[name]
+        return UndefinedValue("captured", name)
+
+
+class CapturedTraceback:
+    """
+    トレースバックの要約。tracebackオブジェクトと同じ名前の属性を持つ。
+    """
+    __slots__ = ("tb_frame", "tb_lineno", "tb_lasti", "tb_next")
+
+    def __init__(self, frame, lineno, lasti):
+        self.tb_frame = frame
+        self.tb_lineno = lineno
+        self.tb_lasti = lasti
+        self.tb_next = None
+
+
+def _make_repr_function(limit):
+    r = reprlib.Repr()
+    r.maxstring = limit
+    r.maxother = limit
+    r.maxlong = limit
+    def _repr(value):
+        try:
+            s = r.repr(value)
+        except Exception as e:
+            s = "<repr error: {}>".format(type(e).__name__)
+        if len(s) > limit:
+            s = s[:limit] + "..."
+        return CapturedRepr(s)
+    return _repr
+
+
+def capture_traceback(tb, *, repr_limit=None, max_frames=None):
+    """
+    トレースバックを要約する。
+    Params:
+        tb(types.TracebackType):
+        repr_limit(int): 変数の表示文字列の最大長
+        max_frames(int): 残すフレームの最大数
+    Returns:
+        Optional[CapturedTraceback]:
+    """
+    reprs = _make_repr_function(repr_limit or ERROR_REPR_LIMIT)
+    max_frames = max_frames or ERROR_MAX_FRAMES
+
+    entries = []
+    while tb is not None:
+        entries.append(tb)
+        tb = tb.tb_next
+    if len(entries) > max_frames: # 深い再帰などでは中間を省く
+        head = max_frames // 2
+        entries = entries[:head] + entries[len(entries)-(max_frames-head):]
+
+    top = None
+    last = None
+    for tb in entries:
+        frame = CapturedFrame(tb.tb_frame, tb.tb_lasti, reprs)
+        c = CapturedTraceback(frame, tb.tb_lineno, tb.tb_lasti)
+        if last is None:
+            top = c
+        else:
+            frame.f_back = last.tb_frame
+            last.tb_next = c
+        last = c
+    return top
+
+
+def release_error_frames(error, *, repr_limit=None, max_frames=None):
+    """
+    例外とその原因となった例外のトレースバックを要約に置き換え、フレームへの参照を手放す。
+    Params:
+        error(Exception):
+    """
+    # 連鎖した例外を全て集めてから要約する
+    errors = []
+    seen = set()
+    stack = [error]
+    while stack:
+        e = stack.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        errors.append(e)
+        stack.append(e.__cause__)
+        stack.append(e.__context__)
+        if hasattr(e, "child_exception"):
+            stack.append(e.child_exception())
+
+    captured = {} # id(tb) -> CapturedTraceback : 例外の間で共有されるトレースバック
+    for e in errors:
+        tb = e.__traceback__
+        if tb is None:
+            continue
+        c = captured.get(id(tb))
+        if c is None:
+            c = captured[id(tb)] = capture_traceback(tb, repr_limit=repr_limit, max_frames=max_frames)
+        try:
+            setattr(e, CAPTURED_TRACEBACK_ATTR, c)
+        except AttributeError:
+            pass
+    
+    # 全ての要約ができてから、フレームへの参照を手放す
+    for e in errors:
+        e.__traceback__ = None
+
+
+#
+# 猶予期間を過ぎたエラーのフレームを手放す
+#
+_pending_errors = deque() # (期限, weakref(ErrorObject))
+_pending_lock = threading.Lock()
+
+def _schedule_frame_release(errorobj):
+    """ 表示を終えたエラーを登録し、猶予期間を過ぎたエラーのフレームを手放す """
+    if ERROR_GRACE_PERIOD is None or getattr(errorobj.error, "__traceback__", None) is None:
+        return
+    now = time.monotonic()
+    with _pending_lock:
+        _pending_errors.append((now + ERROR_GRACE_PERIOD, weakref.ref(errorobj)))
+        if _pending_errors[0][0] > now:
+            return
+    release_expired_errors(now)
+
+def release_expired_errors(now=None) -> int:
+    """
+    猶予期間を過ぎたエラーのフレームを手放す。
+    Returns:
+        int: 手放したエラーの数
+    """
+    if now is None:
+        now = time.monotonic()
+    expired = []
+    with _pending_lock:
+        while _pending_errors and _pending_errors[0][0] <= now:
+            expired.append(_pending_errors.popleft()[1])
+    count = 0
+    for ref in expired:
+        errorobj = ref()
+        if errorobj is not None:
+            errorobj.release_frames()
+            count += 1
+    return count
+
+def set_error_capture(*, repr_limit=None, max_frames=None, grace_period=False):
+    """
+    エラーの要約の方法を設定する。
+    Params:
+        repr_limit(int): 変数の表示文字列の最大長
+        max_frames(int): 残すフレームの最大数
+        grace_period(Optional[float]): 最初に表示してからフレームへの参照を保持する秒数。Noneなら手放さない
+    """
+    global ERROR_REPR_LIMIT, ERROR_MAX_FRAMES, ERROR_GRACE_PERIOD
+    if repr_limit is not None:
+        ERROR_REPR_LIMIT = repr_limit
+    if max_frames is not None:
+        ERROR_MAX_FRAMES = max_frames
+    if grace_period is not False:
+        ERROR_GRACE_PERIOD = grace_period
+
+
 def display_this_traceback(tb: TracebackObject, linewidth, showtype=None, level=None, printerror=False):
     """
     トレースバックオブジェクトの情報を表示する。
@@ -550,15 +828,7 @@ def display_this_traceback(tb: TracebackObject, linewidth, showtype=None, level=
     msg_line = linecache.getline(filename, lineno).strip()
 
     # selfなどから実行関数のシグニチャを得る
-    fnname = frame.funcname()
-    fn = find_code_function(frame.code(), fnname, frame.get_local_variables(), frame.get_global_variables())
-    if fn is None or fn.is_property():
-        msg_fn = "{}:".format(fnname)
-    else:
-        try:
-            msg_fn = "{}{}:".format(fn.display_funcname(), fn.display_parameters())
-        except Exception as e:
-            msg_fn = "{}(<inspect error: {}>):".format(fnname, e)
+    msg_fn = frame.signature()
 
     # 例外の発生を表示する
     msg_excep = ""
@@ -616,6 +886,18 @@ def display_this_traceback(tb: TracebackObject, linewidth, showtype=None, level=
     return lines
 
 
+def display_frame_signature(code, locals, globals):
+    """ selfなどから実行関数のシグニチャを得る """
+    fnname = code.co_name
+    fn = find_code_function(code, fnname, locals, globals)
+    if fn is None or fn.is_property():
+        return "{}:".format(fnname)
+    try:
+        return "{}{}:".format(fn.display_funcname(), fn.display_parameters())
+    except Exception as e:
+        return "{}(<inspect error: {}>):".format(fnname, e)
+
+
 def verbose_display_traceback(exception, linewidth=0xFFFFFF, showtype=None):
     """
     Params:
@@ -0,0 +1,135 @@
+import itertools
+
+from machaon.core.object import Object
+from machaon.types.fundamental import NotFound
+from machaon.types.sheet import Sheet
+
+
+#
+#
+#
+class ObjectStream():
+    """ @type [Stream]
+    値を必要になった分だけ取り出すイテレータ。
+    先頭の取り出しや読み飛ばしは、元のイテレータを最後まで読まずに行う。
+    表示するかsheetを呼ぶと、残りの値を読んでSheetに変換する。
+    変換したSheetは保持し、以降の操作はその行から読み直す。
+    Params:
+        itemtype(Type): 要素の型
+    """
+    def __init__(self, iterator, itemtype=None, columns=None):
+        self._iter = iterator # Objectを返すイテレータ
+        self.itemtype = itemtype
+        self.columns = list(columns or [])
+        self._sheet = None # 変換済みのシート
+
+    def __iter__(self):
+        """ アイテムオブジェクトを返す """
+        return self._source()
+
+    def _source(self):
+        """ 値を取り出すイテレータ。変換済みのシートがあれば、その行から読み直す """
+        if self._sheet is not None:
+            self._iter = iter(list(self._sheet.current_items()))
+            self._sheet = None
+        return self._iter
+
+    #
+    # 取り出す範囲を絞る
+    #
+    def head(self, count):
+        """ @method [limit]
+        先頭から指定の数だけ取り出す。
+        Params:
+            count(int): 個数
+        """
+        self._iter = itertools.islice(self._source(), max(0, count))
+
+    def skip(self, count):
+        """ @method
+        先頭から指定の数を読み飛ばす。
+        Params:
+            count(int): 個数
+        """
+        self._iter = itertools.islice(self._source(), max(0, count), None)
+
+    def filter(self, context, predicate):
+        """ @method context [&]
+        条件を満たす値だけを取り出す。
+        Params:
+            predicate(Function[seq]): 述語関数
+        """
+        self._iter = (x for x in self._source() if predicate.run(x, context).test_truth())
+
+    def first_where(self, context, predicate):
+        """ @method context
+        条件を満たす最初の値を取り出す。それより後は読まない。
+        Params:
+            predicate(Function[seq]): 述語関数
+        Returns:
+            Object: アイテム
+        """
+        for item in self._source():
+            if predicate.run(item, context).test_truth():
+                return item
+        raise NotFound()
+
+    def view(self, *columns):
+        """ @method
+        Sheetに変換した時に表示する列を設定する。
+        Params:
+            *columns(Any): カラム表現
+        """
+        self._source() # 次の変換で列を反映する
+        self.columns = list(columns)
+
+    #
+    # 変換する
+    #
+    def sheet(self, context, app):
+        """ @task context
+        残りの値を読み、Sheetに変換する。変換したシートは保持され、再び呼ぶと同じものを返す。
+        Returns:
+            Sheet:
+        """
+        if self._sheet is None:
+            sheet = Sheet([], typeconversion=self.itemtype, context=context, columns=self.columns)
+            sheet.extend_from_stream(context, self._iter, spirit=app)
+            self._sheet = sheet
+        return self._sheet
+
+    def count(self, context, app):
+        """ @task context [len]
+        残りの値を読んでSheetに変換し、個数を数える。
+        Returns:
+            int: 個数
+        """
+        return self.sheet(context, app).count()
+
+    #
+    # 型の振る舞い
+    #
+    def constructor(self, context, itemtype, value):
+        """ @meta context
+        Params:
+            Any: イテラブル型
+        """
+        try:
+            it = iter(value)
+        except TypeError:
+            it = iter((value,))
+        # 型変換は値を取り出す時に行う
+        objs = (context.new_object(x, type=itemtype) for x in it)
+        return ObjectStream(objs, itemtype)
+
+    def summarize(self, itemtype):
+        """ @meta """
+        conv = "({})".format(itemtype.get_conversion()) if itemtype else ""
+        return "未読のイテレータ{}".format(conv)
+
+    def pprint(self, itemtype, app):
+        """ @meta """
+        context = app.get_process().get_last_invocation_context() # 実行中のコンテキスト
+        sheet = self.sheet(context, app)
+        sheet.pprint(itemtype, app)
+
@@ -1,6 +1,7 @@
 from typing import Sequence, List, Any, Tuple, Dict, DefaultDict, Optional, Generator, Iterable, Union
 
 from machaon.core.object import Object
+from machaon.core.displaycache import display_string
 from machaon.types.fundamental import NotFound
 from machaon.core.function import  parse_sequential_function
 
@@ -12,6 +13,8 @@ class ElemObject():
     """ @type
     データ集合に含まれる値。
     """
+    __slots__ = ("object", "key", "value")
+
     def __init__(self, object, key, value=None):
         self.object = object
         self.key = key
@@ -387,7 +390,7 @@ class ObjectTuple():
             columns = ["値", "型"]
             rows = []
             for i, o in enumerate(self.objects):
-                sm = o.summarize()  
+                sm = display_string(o)  
                 tn = o.get_typename()
                 rows.append((i, [sm, tn]))
             app.post("object-sheetview", rows=rows, columns=columns, context=context, tabletype="tuple")
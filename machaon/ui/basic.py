@@ -55,6 +55,19 @@ system_message_tags = {
     #       実行コンテキスト
     #   tabletype:
     #       テーブルの種類：tuple | sheet | collection
+    #   streaming:
+    #       行が後から追加される表であれば真
+    "object-sheetview-update",       
+    # 表示中の表に、追加された行を表示する。  
+    # Params:
+    #   rows: 
+    #       object-sheetviewで渡された文字列の表
+    #   start:
+    #       追加された最初の行の番号
+    #   end:
+    #       最後の追加であれば真
+    #   context:
+    #       実行コンテキスト
     "canvas",              
     # 図形を画面に表示する。     
     # Params:
@@ -134,8 +147,15 @@ class Launcher():
             
             elif tag == "object-sheetview":
                 rows, columns, context = msg.req_arguments("rows", "columns", "context")
+                streaming = msg.argument("streaming", False)
                 dataid = context.spirit.process.get_index()
-                self.insert_screen_setview(rows, columns, dataid, context)
+                self.insert_screen_setview(rows, columns, dataid, context, streaming=streaming)
+
+            elif tag == "object-sheetview-update":
+                rows, start, context = msg.req_arguments("rows", "start", "context")
+                end = msg.argument("end", False)
+                dataid = context.spirit.process.get_index()
+                self.update_screen_setview(rows, start, end, dataid, context)
 
             elif tag == "canvas":
                 canvas = msg.text
@@ -202,7 +222,10 @@ class Launcher():
     def drop_screen_text(self, process_ids):
         raise NotImplementedError()
 
-    def insert_screen_setview(self, rows, columns, dataid, context):
+    def insert_screen_setview(self, rows, columns, dataid, context, *, streaming=False):
+        raise NotImplementedError()
+
+    def update_screen_setview(self, rows, start, end, dataid, context):
         raise NotImplementedError()
     
     def insert_screen_progress_display(self, command, view):
@@ -272,6 +295,34 @@ class Launcher():
         """ 入力プロンプト """
         return ">>> "
 
+    def complete_input_text(self):
+        """ 入力中の語を補完する。候補が複数ある場合は共通部分まで補完する """
+        text = self.get_input_text()
+        prefix, candidates = self.get_input_completions(text)
+        if not candidates:
+            return candidates
+        common = os.path.commonprefix(candidates)
+        if len(common) > len(prefix):
+            self.replace_input_text(text[:len(text)-len(prefix)] + common)
+        return candidates
+
+    def get_input_completions(self, text=None, *, limit=50):
+        """ 
+        入力中の最後の語に前方一致する型名・メソッド名を返す 
+        Params:
+            text(str): 入力文字列、省略した場合は入力欄から取得する
+            limit(int): 最大の個数
+        Returns:
+            Tuple[str, List[str]]: 補完対象の語と候補のリスト
+        """
+        if text is None:
+            text = self.get_input_text()
+        _head, _sep, prefix = text.rpartition(" ")
+        if not prefix:
+            return prefix, []
+        candidates = self.app.get_type_module().complete(prefix, limit=limit)
+        return prefix, candidates
+
     #
     # チャンバーの操作
     #
@@ -652,6 +703,7 @@ class KeybindMap():
             "InputInsertBreak",
             "InputClear",
             "InputRollback",
+            "InputComplete",
             "InputHistoryNext",
             "InputHistoryPrev",
             "InputPaneExit",
@@ -777,6 +829,10 @@ class KeybindMap():
     def InputRollback(self, ui, e):
         """ """
         pass
+
+    def InputComplete(self, ui, e):
+        """ 入力中の語を補完する """
+        pass
         
     def InputHistoryNext(self, ui, e):
         """ """
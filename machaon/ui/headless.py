@@ -24,6 +24,7 @@ class LoggingLauncher(Launcher):
         # fileperiod : str(daily|monthly)
         self._nobreakbuf = []
         self._logpath = None
+        self._streaming_columns = {} # id(rows) -> 行が追加される表のカラム名
 
     #
     # ログファイル設定
@@ -126,10 +127,12 @@ class LoggingLauncher(Launcher):
         else:
             self._logger.log(logging.INFO, text)
 
-    def writelog_setview(self, rows, columns, dataid, context):        
+    def writelog_setview(self, rows, columns, dataid, context, *, streaming=False):        
         """ 表はリスト形式でレイアウトする """
         if not columns:
             return
+        if streaming:
+            self._streaming_columns[id(rows)] = columns
         maxcolwidth = max([len(x) for x in columns])
         for index, row in rows:
             self._logger.log(logging.INFO, "[{}]".format(index))
@@ -159,6 +162,14 @@ class LoggingLauncher(Launcher):
         self.writelog_setview(*args, **kwargs)
         return self.shell.insert_screen_setview(*args, **kwargs)
 
+    def update_screen_setview(self, rows, start, end, dataid, context):
+        columns = self._streaming_columns.get(id(rows))
+        if columns is not None:
+            if end:
+                del self._streaming_columns[id(rows)]
+            self.writelog_setview(rows[start:], columns, dataid, context)
+        return self.shell.update_screen_setview(rows, start, end, dataid, context)
+
     def insert_screen_progress_display(self, command, view):
         self.shell.insert_screen_progress_display(command, view)
 
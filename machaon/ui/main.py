@@ -26,6 +26,7 @@ def initialize_app_args(root, argv=None, **defaults):
     pser.add_argument("--deploy", help="machaonディレクトリを配備する")
     pser.add_argument("--update", help="全てのパッケージとmachaon本体をアップデートして終了する", action="store_const", const=True)
     pser.add_argument("--title", help="アプリの名前")
+    pser.add_argument("--profile-startup", help="起動処理にかかった時間を計測して表示する", action="store_const", const=True)
     args = pser.parse_args(argv)
     
     autoexit = False
@@ -81,6 +82,8 @@ def initialize_app_args(root, argv=None, **defaults):
         initargs["basic_dir"] = args.dir
     if args.title:
         initargs["title"] = args.title
+    if args.profile_startup:
+        initargs["profile_startup"] = True
     initargs.update(options)
 
     return initargs
@@ -25,6 +25,8 @@ from machaon.types.stacktrace import ErrorObject
 #     全プロセスを同期する
 # - history
 #     入力履歴を取得する
+# - complete
+#     入力中の語の補完候補を取得する
 #    
 # [Response]
 #
@@ -42,6 +44,9 @@ from machaon.types.stacktrace import ErrorObject
 # - process:XXXX
 #    プロセスの実行結果
 #    [Int]: プロセスID
+# - complete
+#    補完候補
+#    { prefix: 補完対象の語, candidates: 候補の配列 }
 #
 
 def parse_int(value: str, default=None):
@@ -99,6 +104,8 @@ class MacaSocketServer(Launcher):
             self.shift_history(delta)
         elif code == "sync":
             self.sync_messages()
+        elif code == "complete":
+            self.complete_input(remained)
 
     def main(self):
         with serve(self.entrypoint, self._url, self._port) as server:
@@ -118,6 +125,10 @@ class MacaSocketServer(Launcher):
 
         process_starter()
 
+    def complete_input(self, text: str):
+        prefix, candidates = self.get_input_completions(text)
+        ws_respond(self._ws, "complete", None, {"prefix": prefix, "candidates": candidates})
+
     def sync_messages(self):
         from machaon.process import ProcessChamber
         chm: ProcessChamber = self.app.chambers().get_active()
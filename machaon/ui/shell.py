@@ -83,6 +83,7 @@ class ShellLauncher(Launcher):
         self._loop = True
         self._waiting_input_message = False
         self._useansi = useansi
+        self._streaming_columns = {} # id(rows) -> 行が追加される表のカラム名
 
     def printer(self, tag, text, end=None):
         if self._useansi:
@@ -130,11 +131,24 @@ class ShellLauncher(Launcher):
     def drop_screen_text(self, process_ids):
         pass
 
-    def insert_screen_setview(self, rows, columns, dataid, context):
+    def insert_screen_setview(self, rows, columns, dataid, context, *, streaming=False):
         """ 表はリスト形式でレイアウトする """
         if not columns:
             return
-        
+        if streaming:
+            self._streaming_columns[id(rows)] = columns
+        self._print_setview_rows(rows, columns)
+
+    def update_screen_setview(self, rows, start, end, dataid, context):
+        """ 追加された行を続けて表示する """
+        columns = self._streaming_columns.get(id(rows))
+        if columns is None:
+            return
+        if end:
+            del self._streaming_columns[id(rows)]
+        self._print_setview_rows(rows[start:], columns)
+
+    def _print_setview_rows(self, rows, columns):
         maxcolwidth = max([len(x) for x in columns])
         for index, row in rows:
             print("[{}]---------------------------".format(index))
@@ -199,6 +199,7 @@ class tkLauncher(Launcher):
         self.does_stick_bottom = tk.BooleanVar(value=True)
         self.does_overflow_wrap = tk.BooleanVar(value=False)
         self.dnd = machaon.platforms.draganddrop().tkDND()
+        self.streaming_sheetviews = {} # id(rows) -> SheetViewLayout : 行が追加される表
         #
         self._destroyed = False
 
@@ -612,11 +613,28 @@ class tkLauncher(Launcher):
     #
     #
     #
-    def insert_screen_setview(self, rows, columns, dataid, context):
+    def insert_screen_setview(self, rows, columns, dataid, context, *, streaming=False):
         """ リストを挿入する """
         self.log.configure(state='normal')
-        screen_sheetview_generate(self, self.log, rows, columns, dataid)
+        layout = screen_sheetview_generate(self, self.log, rows, columns, dataid)
         self.log.insert("end", "\n")
+        if streaming:
+            # 表の末尾に、追加される行の挿入位置を置く
+            layout.endmark = "{}-end{}".format(layout.sheettag, id(rows))
+            self.log.mark_set(layout.endmark, "end-2c")
+            self.streaming_sheetviews[id(rows)] = layout
+        self.log.configure(state='disabled')
+
+    def update_screen_setview(self, rows, start, end, dataid, context):
+        """ 表示中の表に追加された行を挿入する """
+        layout = self.streaming_sheetviews.get(id(rows))
+        if layout is None:
+            return
+        self.log.configure(state='normal')
+        screen_sheetview_append(self.log, rows, layout)
+        if end:
+            del self.streaming_sheetviews[id(rows)]
+            self.log.mark_unset(layout.endmark)
         self.log.configure(state='disabled')
 
     def insert_screen_progress_display(self, command, view):
@@ -1000,47 +1018,169 @@ class tkLauncher(Launcher):
 #
 # Sheet
 #
+SHEETVIEW_PAGE_ROWS = 500 # 一度に描画する行数
+SHEETVIEW_POLL_INTERVAL = 50 # 続きのページの計算を待つ間隔（ミリ秒）
+
+class SheetViewLayout:
+    """ 描画した行から計算する列幅 """
+    def __init__(self, wnd, sheettag, columns):
+        self.sheettag = sheettag
+        self.font = None
+        self.widths = []
+        self.shown = 0 # 描画した行数
+        self.morelink = None # 続きを表示するリンクのタグ
+        self.loading = False # 続きのページを計算中
+        self.endmark = None # 行が追加される表の末尾の位置
+        if not wnd.tag_configure(sheettag, "tabs")[-1]: # 列幅が設定済みなら計算しない
+            cfgs = wnd.configure("font")
+            import tkinter.font as tkfont
+            self.font = tkfont.Font(font=cfgs[-1]) #　デフォルトフォント 
+            self.widths = [self.font.measure(s) for s in columns]
+
+    def measure(self, row):
+        if self.font is not None:
+            self.widths = [max(w, self.font.measure(s)) for w,s in zip(self.widths,row)]
+
+    def apply(self, wnd):
+        """ 列幅をタブ位置として設定する """
+        if self.font is None:
+            return
+        one = self.font.measure("_")
+        widths = [one*2, one*3] + self.widths
+        widths[2] += one*2 # セパレータぶんの幅を先頭の値に加える
+        widths = widths[0:2] + [x + one*2 for x in widths[2:]] # アキを加える
+
+        start = 0
+        tabs = []
+        for w in widths:
+            start += w
+            tabs.append(start)
+        wnd.tag_configure(self.sheettag, tabs=tabs)
+
+
 # ui, wnd, rows, columns, colmaxwidths, dataname
 def screen_sheetview_generate(ui, wnd, rows, columns, dataname):
     sheettag = "sheet-{}".format(dataname)
-    widths = []
-
-    # 列幅計算の準備
-    if not wnd.tag_configure(sheettag, "tabs")[-1]:
-        cfgs = wnd.configure("font")
-        import tkinter.font as tkfont
-        wndfont = tkfont.Font(font=cfgs[-1]) #　デフォルトフォント 
-        widths = [0 for _ in columns]
+    layout = SheetViewLayout(wnd, sheettag, columns)
 
     # ヘッダー
     head = "\t \t| "
     wnd.insert("end", head, ("message", sheettag))
     line =  "\t".join(columns)
     wnd.insert("end", line+"\n", ("message-em", sheettag))
-    if widths:
-        widths = [max(w, wndfont.measure(s)) for w,s in zip(widths,columns)]
 
-    # 値
-    tags = ("message", sheettag)
-    for i, (_itemindex, row) in enumerate(rows):
-        line = "\t{}\t| ".format(i) + "\t".join(row)
-        wnd.insert("end", line+"\n", tags)
-        if widths:
-            widths = [max(w, wndfont.measure(s)) for w,s in zip(widths,row)]
+    # 値：最初のページのみ描画する
+    page = rows[0:SHEETVIEW_PAGE_ROWS]
+    screen_sheetview_insert_rows(wnd, "end", page, 0, layout)
+    if len(rows) > len(page):
+        screen_sheetview_insert_more(wnd, "end", rows, len(page), layout)
     
     # 列幅を計算する
-    if widths:
-        one = wndfont.measure("_")
-        widths = [one*2, one*3] + widths
-        widths[2] += one*2 # セパレータぶんの幅を先頭の値に加える
-        widths = widths[0:2] + [x + one*2 for x in widths[2:]] # アキを加える
+    layout.apply(wnd)
+    return layout
 
-        start = 0
-        tabs = []
-        for w in widths:
-            start += w
-            tabs.append(start)
-        wnd.tag_configure(sheettag, tabs=tabs)
+def screen_sheetview_insert_rows(wnd, index, page, start, layout):
+    tags = ("message", layout.sheettag)
+    for i, (_itemindex, row) in enumerate(page, start=start):
+        line = "\t{}\t| ".format(i) + "\t".join(row)
+        wnd.insert(index, line+"\n", tags)
+        layout.measure(row)
+    layout.shown = max(layout.shown, start + len(page))
+
+def screen_sheetview_append(wnd, rows, layout):
+    """ 読み込み中の表に追加された行を描画する """
+    if layout.loading:
+        return # 続きのページを描画するときに、改めてリンクを置く
+    if layout.morelink is not None:
+        screen_sheetview_update_more(wnd, rows, layout)
+        return
+    if layout.shown < SHEETVIEW_PAGE_ROWS:
+        # 最初のページに収まる行は、そのまま描画する
+        page = rows[layout.shown:SHEETVIEW_PAGE_ROWS]
+        screen_sheetview_insert_rows(wnd, layout.endmark, page, layout.shown, layout)
+    if len(rows) > layout.shown:
+        screen_sheetview_insert_more(wnd, layout.endmark, rows, layout.shown, layout)
+    layout.apply(wnd)
+
+def screen_sheetview_more_line(rows, start):
+    return "\t \t| ...続きを表示（残り{}行）".format(len(rows) - start)
+
+def screen_sheetview_update_more(wnd, rows, layout):
+    """ 続きを表示するリンクの残りの行数を更新する """
+    ranges = wnd.tag_ranges(layout.morelink)
+    if not ranges:
+        return
+    tags = ("message", layout.sheettag, "hyperlink", layout.morelink)
+    wnd.delete(ranges[0], ranges[1])
+    wnd.insert(ranges[0], screen_sheetview_more_line(rows, layout.shown)+"\n", tags)
+
+def screen_sheetview_request_page(rows, start, stop):
+    """ 続きのページを、UIのスレッドを止めずに計算する """
+    if hasattr(rows, "window_async"):
+        return rows.window_async(start, stop)
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(rows[start:stop])
+    return future
+
+def screen_sheetview_insert_more(wnd, index, rows, start, layout):
+    """ 続きのページを描画するリンクを挿入する """
+    sheettag = layout.sheettag
+    moretag = "{}-more{}".format(sheettag, start)
+    line = screen_sheetview_more_line(rows, start)
+    wnd.insert(index, line+"\n", ("message", sheettag, "hyperlink", moretag))
+    mark = moretag + "-pos"
+    layout.morelink = moretag
+
+    def replace_link(text, tags):
+        """ リンクの行を置き換え、マークを挿入位置に残す """
+        ranges = wnd.tag_ranges(moretag)
+        if not ranges:
+            return False
+        wnd.configure(state='normal')
+        wnd.mark_set(mark, ranges[0])
+        wnd.delete(ranges[0], ranges[1])
+        if text:
+            wnd.insert(mark, text, tags + (moretag,))
+        wnd.configure(state='disabled')
+        return True
+
+    def insert_page(_event):
+        wnd.tag_unbind(moretag, "<Button-1>")
+        wnd.config(cursor="")
+        if not replace_link("\t \t| ...読み込み中\n", ("message", sheettag)):
+            return "break"
+        layout.morelink = None
+        layout.loading = True
+        
+        # ページの計算は別のスレッドで行い、完了を待って描画する
+        future = screen_sheetview_request_page(rows, start, start+SHEETVIEW_PAGE_ROWS)
+        def draw():
+            if not future.done():
+                wnd.after(SHEETVIEW_POLL_INTERVAL, draw)
+                return
+            layout.loading = False
+            if not replace_link(None, ()):
+                return
+            wnd.tag_delete(moretag)
+            wnd.configure(state='normal')
+            error = future.exception()
+            if error is not None:
+                wnd.insert(mark, "\t \t| <行を表示できません: {}>\n".format(error), ("error", sheettag))
+            else:
+                page = future.result()
+                screen_sheetview_insert_rows(wnd, mark, page, start, layout)
+                if len(rows) > start + len(page):
+                    screen_sheetview_insert_more(wnd, mark, rows, start + len(page), layout)
+                layout.apply(wnd) # 新しい行に合わせて列幅を広げる
+            wnd.mark_unset(mark)
+            wnd.configure(state='disabled')
+        draw()
+        return "break"
+
+    wnd.tag_bind(moretag, "<Enter>", lambda e: wnd.config(cursor="hand2"))
+    wnd.tag_bind(moretag, "<Leave>", lambda e: wnd.config(cursor=""))
+    wnd.tag_bind(moretag, "<Button-1>", insert_page)
 
 #
 # Tuple 
@@ -1265,6 +1405,13 @@ class TkKeymap(KeybindMap):
         """ """
         ui.rollback_input_text()
         return "break"
+
+    def InputComplete(self, ui, e):
+        """ """
+        candidates = ui.complete_input_text()
+        if len(candidates) > 1:
+            ui.insert_screen_text("message", " ".join(candidates))
+        return "break"
         
     def InputHistoryNext(self, ui, e):
         """ """
@@ -3,6 +3,7 @@
 setuptools>=40.1.0
 """
 from setuptools import setup, find_packages, find_namespace_packages
+from setuptools.command.build_py import build_py
 #from codecs import open
 import os
 import re
@@ -21,6 +22,23 @@ def get_version(text):
         return m.group(1)
     raise ValueError("バージョン番号がありません")
 
+def build_prebuilt_module_docs(package_dir):
+    """ 型定義のドキュメント文字列を書き出す。パッケージの依存ライブラリを読み込まないよう、ファイルから直接ロードする """
+    import importlib.util
+    path = os.path.join(package_dir, "core", "prebuilt.py")
+    spec = importlib.util.spec_from_file_location("machaon_prebuilt", path)
+    prebuilt = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(prebuilt)
+    return prebuilt.build_module_docs(package_dir)
+
+class BuildPyCommand(build_py):
+    """ ビルドしたパッケージに、書き出したドキュメント文字列を加える """
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            outpath = build_prebuilt_module_docs(os.path.join(self.build_lib, "machaon"))
+            self.announce("writing {}".format(outpath), level=2)
+
 #
 #
 #
@@ -48,6 +66,7 @@ setup(
     install_requires=requirements,
     tests_require=test_requirements,
     test_suite="tests",
+    cmdclass={"build_py": BuildPyCommand},
     
     author='Goro Sakata',
     author_email='gorosakata@ya.ru',
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+#
+# 計測用のテストは、環境変数 MACHAON_BENCHMARK が設定された時だけ実行する。計測値は最後にまとめて表示する
+#   MACHAON_BENCHMARK=1 python -m pytest -m benchmark
+#
+BENCHMARK_ENV = "MACHAON_BENCHMARK"
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: 実行時間やメモリ使用量を計測する。{}=1で実行する".format(BENCHMARK_ENV))
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get(BENCHMARK_ENV):
+        return
+    skip = pytest.mark.skip(reason="{}=1で実行する".format(BENCHMARK_ENV))
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+def pytest_terminal_summary(terminalreporter):
+    # record_propertyで記録された計測値を表示する
+    lines = []
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) != "call" or "benchmark" not in getattr(report, "keywords", {}):
+                continue
+            for name, value in report.user_properties:
+                lines.append("{}: {} = {:.3f}".format(report.nodeid, name, value))
+    if lines:
+        terminalreporter.section("benchmark")
+        for line in lines:
+            terminalreporter.write_line(line)
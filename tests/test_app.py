@@ -27,3 +27,27 @@ def test_deploy(tmpdir):
 
     assert not deploydir.join("machaon").check()
 
+
+
+def test_startup_profile(tmpdir):
+    from machaon.core.context import instant_context
+    root = AppRoot()
+    root.initialize(ui="batch", basic_dir=Path(tmpdir), ignore_args=True, ignore_packages=True, ignore_hotkeys=True, profile_startup=True)
+    root.boot_core(fundamentals=True)
+    profiler = root.finish_startup_profile()
+    assert root.get_startup_profiler() is None
+    assert not profiler.is_running()
+
+    phases = [x.name for x in profiler.records("phase")]
+    assert "new_launcher" in phases
+    assert "boot_core" in phases
+    assert "fundamentals" in phases
+    assert "first type load" in phases
+    types = [x.name for x in profiler.records("type")]
+    assert "machaon.types.string.StrType" in types
+    assert all(x.elapsed >= 0 for x in profiler.records())
+
+    # Sheetとして表示する
+    sheet = profiler.to_sheet(instant_context())
+    assert sheet.get_typename() == "Sheet"
+    assert sheet.value.count() == len(profiler.records())
@@ -30,3 +30,25 @@ def test_walk_modules():
     assert loaded[0] is loaded[1]
 
 
+
+
+def test_prebuilt_module_docs(tmp_path, monkeypatch):
+    from machaon.core import prebuilt
+    pkgdir = tmp_path / "pkg"
+    pkgdir.mkdir()
+    src = pkgdir / "mod.py"
+    src.write_text('""" @module\nUsing:\n    Str\n"""\nclass A:\n    """ @type\n    A type\n    """\nclass B:\n    """ not a type """\n', encoding="utf-8")
+
+    prebuilt.build_module_docs(str(pkgdir))
+    monkeypatch.setattr(prebuilt, "_package_dir", str(pkgdir))
+    prebuilt.clear_prebuilt_cache()
+    try:
+        doc, classes = prebuilt.get_prebuilt_module_docs(str(src))
+        assert doc.startswith("@module")
+        assert classes == [("A", "@type\nA type")]
+
+        # ソースが変更されたら使わない
+        src.write_text(src.read_text(encoding="utf-8") + "\nclass C:\n    pass\n", encoding="utf-8")
+        assert prebuilt.get_prebuilt_module_docs(str(src)) is None
+    finally:
+        prebuilt.clear_prebuilt_cache()
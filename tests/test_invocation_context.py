@@ -1,3 +1,5 @@
+import pytest
+
 from machaon.core.context import InvocationContext, instant_context
 from machaon.macatest import run
 
@@ -39,3 +41,76 @@ def test_newobject_conversion():
     assert [x.value for x in t.value.column_values(context, "@")] == ["A","BB","CCC"]
     assert [x.value for x in t.value.column_values(context, "length")] == [1,2,3]
 
+
+
+def test_inherit_lazy():
+    context = instant_context()
+    sub = context.inherit()
+    assert sub._log is None
+    assert sub._invocations is None
+    assert sub.invocations == ()
+    assert sub.get_last_invocation() is None
+    assert sub.log is not None # 記録するときに作られる
+    assert sub.is_log_enabled()
+
+    # ログを蓄積しない設定は引き継がれる
+    context.disable_log()
+    sub = context.inherit()
+    assert not sub.is_log_enabled()
+    assert sub.inherit().log is sub.log
+
+    # フラグが変われば継承されるフラグも変わる
+    context.set_flags("PRINT_STEP", inherit_remove=True)
+    assert context.is_set_print_step() is False
+    context.set_flags("PRINT_STEP")
+    assert context.is_set_print_step()
+    assert not context.inherit().is_set_print_step()
+    context.remove_flags(0xFFFFFFFFFFFF)
+    context.set_flags("PRINT_STEP", inherit_set=True)
+    assert context.inherit().is_set_print_step()
+
+    # 実行結果は変わらない
+    from machaon.core.function import parse_function
+    f = parse_function("@ * 3 + 1")
+    assert f.run(context.new_object(2), context).value == 7
+
+
+#
+# 計測
+#
+def measure_inherit_usec(context, count=20000):
+    """ inheritの1回あたりの所要時間をマイクロ秒で返す """
+    import time
+    begin = time.perf_counter()
+    for _ in range(count):
+        context.inherit()
+    return (time.perf_counter() - begin) / count * 1e6
+
+def measure_filter_map_sec(context, itemcount=3000):
+    """ メッセージで書いたfilterとmapを続けて実行し、所要時間を秒で返す """
+    import time
+    from machaon.core.function import parse_function
+    sheet = context.new_object(list(range(itemcount)), conversion="Sheet[Int]").value
+    begin = time.perf_counter()
+    sheet.filter(context, None, parse_function("@ % 3 == 0"))
+    values = sheet.map(context, None, parse_function("@ * 2"))
+    elapsed = time.perf_counter() - begin
+    assert len(values) == itemcount // 3
+    assert values[1].value == 6
+    return elapsed
+
+@pytest.mark.benchmark
+def test_inherit_filter_map_benchmark(record_property):
+    context = instant_context()
+    usec = measure_inherit_usec(context)
+    record_property("inherit_usec", usec)
+    assert usec < 9.0, "inherit: {:.2f} us".format(usec) # 軽量化する前は約9us
+
+    context.disable_log()
+    usec = measure_inherit_usec(context)
+    record_property("inherit_nolog_usec", usec)
+    assert usec < 9.0, "inherit (ログなし): {:.2f} us".format(usec)
+    
+    sec = measure_filter_map_sec(instant_context())
+    record_property("filter_map_sec", sec)
+    assert sec < 5.0, "filter+map: {:.3f} s".format(sec)
@@ -360,7 +360,59 @@ def test_generic_methods_operators():
     ptest("1 + 2", 3)
     ptest("77 - 44", 33)
     ptest("3 * -4", -12)
-    
+
+def test_binary_operator_dispatch():
+    from machaon.core.message import select_method
+    from machaon.core.invocation import BinaryOperatorInvocation
+    from machaon.core.dispatch import (
+        get_binary_operator_table, BinaryOperatorTable, 
+        register_binary_operator, unregister_binary_operator, reset_binary_operator_table
+    )
+    cxt = test_context(silent=True)
+    inv = select_method("<=>", context=cxt)
+    assert isinstance(inv, BinaryOperatorInvocation)
+
+    def call(l, r):
+        return inv.prepare_invoke(cxt, cxt.new_object(l), cxt.new_object(r)).invoke(cxt)
+
+    assert call(1, 2).value == 1
+    assert call("b", "a").value == -1
+    assert call(1.5, 1.5).value == 0
+    assert call(1, 2).get_typename() == "Int"
+    nan = float("nan")
+    assert call(nan, nan).value == -1 # 既定の実装と同じ結果
+    assert call(1, "a").is_error() # エラーオブジェクトになる
+
+    # 呼び出し箇所で型ごとに一度だけ選ぶ
+    table = BinaryOperatorTable()
+    assert table.resolve("compare", bool, int) is table.resolve("compare", bool, int)
+    assert table.resolve("at", int, int) is None
+
+    # 型による拡張
+    class Version:
+        def __init__(self, n):
+            self.n = n
+    table = get_binary_operator_table()
+    version = table.version
+    register_binary_operator("<=>", Version, Version, lambda l, r: (l.n < r.n) - (r.n < l.n))
+    try:
+        assert call(Version(1), Version(3)).value == 1
+    finally:
+        assert unregister_binary_operator("<=>", Version, Version)
+    assert table.version > version
+    assert not unregister_binary_operator("compare", Version, Version)
+    assert call(Version(1), Version(3)).is_error() # 既定の実装に戻る
+
+    # 既定の状態に戻す
+    register_binary_operator("compare", Version, Version, lambda l, r: 0)
+    reset_binary_operator_table()
+    assert call(Version(1), Version(3)).is_error()
+    assert table.resolve("compare", int, int) is not table.resolve("compare", float, float) # 全順序の実装は残る
+
+    ptest("3 < 4", True)
+    ptest("4 <=> 4", 0)
+
+
 def test_dynamic_methods():
     # dynamic method
     ptest("ABC startswith: A", True)
@@ -135,3 +135,44 @@ def test_call_external_method_as_member():
     sub = cxt.new_object(0xABC, type="Int")
     hex = select_method("hex", sub.type, reciever=sub, context=cxt)
     assert hex._invoke(cxt, sub) # 型エラー
+
+def test_reflection_cache():
+    import gc
+    from machaon.core.method import select_method_from_type_and_instance, enum_methods_from_type_and_instance
+    from machaon.core.reflection import get_class_reflection, clear_reflection_cache, _reflections
+
+    class Dyn:
+        def __init__(self):
+            self.x = 1
+        def twice(self, a):
+            return a * 2
+        @property
+        def prop(self):
+            return 3
+    
+    m = select_method_from_type_and_instance(Dyn, Dyn, "twice")
+    assert m is not None
+    assert select_method_from_type_and_instance(Dyn, Dyn, "twice") is m
+    assert select_method_from_type_and_instance(Dyn, Dyn, "nothing") is None
+    assert "nothing" in get_class_reflection(Dyn).methods
+
+    names = [x for x, _ in enum_methods_from_type_and_instance(Dyn, Dyn)]
+    assert names == ["twice", "prop"]
+    assert get_class_reflection(Dyn).enumerated is not None
+
+    # 属性の種類の判別はインスタンスからも同じ
+    cxt = instant_context()
+    inv = select_method("twice")
+    assert inv.resolve_bound_method(Dyn())(4) == 8
+    assert select_method("prop").resolve_bound_method(Dyn())() == 3
+    assert select_method("x").resolve_bound_method(Dyn())() == 1
+
+    clear_reflection_cache(Dyn)
+    assert get_class_reflection(Dyn).enumerated is None
+
+    # クラスが破棄されたら項目も消える
+    key = id(Dyn)
+    assert key in _reflections
+    del Dyn, m, inv
+    gc.collect()
+    assert key not in _reflections
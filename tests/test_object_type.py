@@ -339,3 +339,150 @@ def test_type_params():
 
     # stringify
     assert t.stringify_value(v) == str([101, "Int:machaon.core", 98, 23])
+
+
+#
+# 補完
+#
+def test_typemodule_complete():
+    types = TypeModule()
+    types.add_fundamentals()
+    types.define(SpecStrType)
+    
+    assert "SpecStrType" in types.complete("Spec")
+    assert "Str" in types.complete("St")
+    assert "zeros" in types.complete("ze", typename="SpecStrType")
+    assert "0-0-0" in types.complete("0-", typename="SpecStrType")
+    assert "get-path" in types.complete("get", typename="SpecStrType")
+    assert "zeros" not in types.complete("ze", typename="Str")
+    assert "==" in types.complete("=", typename="SpecStrType") # 共通型のメソッド
+
+    # 後から追加された型
+    types.define(SomeValue)
+    assert "SomeAlias" in types.complete("Some")
+    assert "perimeter" in types.complete("peri")
+    assert len(types.complete("", limit=3)) == 3
+
+#
+# 並行アクセス
+#
+def test_typemodule_concurrent_select():
+    from concurrent.futures import ThreadPoolExecutor
+    types = TypeModule()
+    types.add_fundamentals()
+    types.reserve_adding_types("default") # 最初の取得時に並行して初期化される
+
+    def select(i):
+        t = types.get("Sheet" if i % 2 else "Tuple")
+        t.load_method_prototypes()
+        m = t.select_method("filter" if i % 2 else "at")
+        m.load_from_type(t)
+        return t, m
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(select, range(64)))
+
+    # すべてのスレッドが同じ型・メソッドの定義を見る
+    assert len({id(t) for t, _ in results}) == 2
+    assert len({id(m) for _, m in results}) == 2
+    assert all(m.is_loaded() for _, m in results)
+
+    # 書き込みの途中でも、公開済みの表は変わらない
+    before = types._tables
+    with types._write_tables() as tables:
+        tables.defs["__dummy__"] = None
+        assert types._defs is tables.defs
+        assert "__dummy__" not in before.defs
+    assert "__dummy__" in types._defs
+
+#
+# 派生モジュール
+#
+def test_typemodule_overlay():
+    base = TypeModule()
+    base.add_fundamentals()
+    base.freeze()
+    with pytest.raises(Exception):
+        base.define(SomeValue)
+
+    types = base.overlay()
+    t = types.define(SomeValue)
+    assert types.get("SomeAlias") is t
+    assert types.get(SomeValue) is t
+    assert types.get("Int") is base.get("Int")
+    assert types.count() == base.count() + 1
+
+    # 土台には追加されない
+    assert base.get("SomeAlias") is None
+    assert base.overlay().get("SomeAlias") is None
+
+    # 同名の型は土台の定義が先に見つかる
+    types.define(SpecStrType, typename="Str")
+    assert types.get("Str") is base.get("Str")
+    assert types.select("Str", "tests.test_object_type.SpecStrType").get_describer_qualname() == "tests.test_object_type.SpecStrType"
+
+def test_pooled_objects():
+    cxt = instant_context()
+    mod = cxt.type_module
+
+    none = cxt.new_object(None)
+    assert none is cxt.new_object(None)
+    assert none.get_typename() == "None"
+    assert cxt.new_object(1) is cxt.new_object(1)
+    assert cxt.new_object(True) is not cxt.new_object(1)
+    assert cxt.new_object(True).get_typename() == "Bool"
+    assert cxt.new_object("") is cxt.new_object("")
+    assert cxt.new_object(1000) is not cxt.new_object(1000)
+    assert cxt.new_object("a") is not cxt.new_object("a")
+
+    from machaon.core.message import select_literal
+    assert select_literal(cxt, "3") is cxt.new_object(3)
+    assert select_literal(cxt, "3.5").value == 3.5
+
+    # 検索表が変わればキャッシュも作り直される
+    t = mod.get_fundamental("Int")
+    assert t is mod.get("Int")
+    mod.define(SomeValue)
+    assert mod.get_fundamental("Int") is t
+    
+    # 親が凍結されていなければ共有しない
+    parent = TypeModule()
+    parent.add_fundamentals()
+    child = parent.overlay()
+    assert child.get_pooled_object(1) is None
+    assert child.get_fundamental("Int") is parent.get("Int")
+
+
+def test_typemodule_select_during_init():
+    import threading
+    initialized = threading.Event()
+    results = []
+    lookup = threading.Thread(target=lambda: results.append(types.get("Path"))) # 標準モジュールの型
+
+    class SlowPublishTypeModule(TypeModule):
+        """ 初期化した検索表の公開の直前に、他のスレッドに取得させる """
+        @property
+        def _tables(self):
+            return self.__dict__["_tables"]
+
+        @_tables.setter
+        def _tables(self, value):
+            if initialized.is_set() and not lookup.is_alive() and not results:
+                lookup.start()
+                lookup.join(0.3) # 公開されるまで待機しているはず
+            self.__dict__["_tables"] = value
+
+    types = SlowPublishTypeModule()
+    types.add_fundamentals()
+    types.reserve_adding_types("default")
+
+    original = types.add_default_module_types
+    def add_default_module_types():
+        original()
+        initialized.set()
+    types.add_default_module_types = add_default_module_types
+
+    assert types.get("Tuple") is not None
+    lookup.join()
+    assert results and results[0] is not None
+    assert results[0] is types.get("Path")
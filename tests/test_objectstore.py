@@ -0,0 +1,86 @@
+import pickle
+import pytest
+
+from machaon.core.context import instant_context
+from machaon.core.objectstore import (
+    dump_object, load_object, read_object_header, StoredObject, ObjectStoreError
+)
+from machaon.types.sheet import Sheet
+
+
+class ZeroCopyBytes(bytearray):
+    """ バッファをpickleの外に書き出す値 """
+    def __reduce_ex__(self, protocol):
+        return (type(self)._reconstruct, (pickle.PickleBuffer(self),), None)
+
+    @classmethod
+    def _reconstruct(cls, obj):
+        with memoryview(obj) as m:
+            return cls(m)
+
+
+def test_store_sheet(tmp_path):
+    cxt = instant_context()
+    objs = [cxt.new_object(i) for i in range(300, 320)]
+    sheet = cxt.new_object(Sheet(objs, context=cxt, columns=["neg", "="]), type="Sheet")
+
+    path = str(tmp_path / "sheet.mobj")
+    assert dump_object(path, sheet) > 0
+    header = read_object_header(path)
+    assert header["conversion"] == sheet.type.get_conversion()
+    assert cxt.get_type("Int").get_conversion() in header["types"] # 型は変換名で参照される
+
+    o = load_object(path, cxt)
+    assert o.get_typename() == "Sheet"
+    assert [x.value for x in o.value.items] == list(range(300, 320))
+    assert o.value.items[0].type is cxt.get_type("Int")
+    assert o.value.rows[3][1][0].value == -303
+    assert [x.get_name() for x in o.value.get_current_columns()] == ["neg", "="]
+
+
+def test_store_buffers(tmp_path):
+    cxt = instant_context()
+    data = ZeroCopyBytes(bytearray(range(256)) * 4096)
+    path = str(tmp_path / "buffer.mobj")
+    dump_object(path, cxt.new_object(data))
+
+    header = read_object_header(path)
+    (offset, size), = header["buffers"] # pickleの外に書き出される
+    assert size == len(data) and offset % 64 == 0
+
+    o = load_object(path, cxt)
+    assert isinstance(o.value, ZeroCopyBytes)
+    assert o.value == data
+
+
+def test_stored_object(tmp_path):
+    cxt = instant_context()
+    path = str(tmp_path / "unpicklable.mobj")
+    with pytest.raises(ObjectStoreError):
+        dump_object(path, cxt.new_object(lambda x: x))
+    assert StoredObject.store(path, cxt.new_object(lambda x: x)) is None
+
+    path = str(tmp_path / "str.mobj")
+    loader = StoredObject.store(path, cxt.new_object("value"), typemodule=cxt.type_module, remove=True)
+    o = loader()
+    assert o.value == "value"
+    assert o.get_typename() == "Str"
+    assert not (tmp_path / "str.mobj").exists()
+
+
+def test_store_dir_separated(tmp_path):
+    from machaon.core.objectstore import get_object_store_path
+    from machaon.core.persistence import enum_persistent_names
+    class Root:
+        def get_store_dir(self):
+            return str(tmp_path)
+    root = Root()
+    cxt = instant_context()
+    (tmp_path / "greet.txt").write_text("'hello' print", encoding="utf-8")
+    path = get_object_store_path(root, "results/numbers")
+    dump_object(path, cxt.new_object([1, 2, 3]))
+    assert path.startswith(str(tmp_path / "objects"))
+
+    # 保存されたオブジェクトはメッセージとして列挙されない
+    assert enum_persistent_names(root) == ["greet"]
+    assert list(load_object(path, cxt).value) == [1, 2, 3]
@@ -106,3 +106,112 @@ def test_chamber_index():
     assert hive.get_next_index(delta=1) == chm4.get_index()
     assert hive.get_next_index(delta=2) == chm5.get_index()
 
+
+
+#
+# 返り値の保持
+#
+def finished_processes(hive, count, objcol, typemodule):
+    from machaon.core.context import InvocationContext
+    chm = hive.addnew()
+    procs = []
+    for i in range(count):
+        proc = hive.new_process()
+        chm.add(proc)
+        objcol.push(str(proc.get_index()), typemodule.get("Int").new_object(proc.get_index() * 100))
+        proc.last_context = InvocationContext(input_objects=objcol, type_module=typemodule)
+        proc.finish()
+        procs.append(proc)
+    return procs
+
+def test_retention_max_processes():
+    from machaon.process import ProcessRetention
+    from machaon.core.object import ObjectCollection
+    from machaon.core.type.typemodule import TypeModule
+    typemodule = TypeModule()
+    typemodule.add_fundamentals()
+    objcol = ObjectCollection()
+    hive = ProcessHive()
+    hive.set_retention(ProcessRetention(max_processes=2))
+    
+    procs = finished_processes(hive, 4, objcol, typemodule)
+    evicted = []
+    for proc in procs:
+        evicted.extend(hive.retain_process_result(proc, objcol, typemodule))
+    assert evicted == [1, 2]
+    assert objcol["3"] == 300 and objcol["4"] == 400
+    assert objcol.get("1").object.get_typename() == "Str"
+    assert "#1 100 [Int]" in objcol["1"]
+    assert procs[0].get_last_invocation_context() is None
+    assert procs[3].get_last_invocation_context() is not None
+
+    # 経過時間
+    hive.set_retention(ProcessRetention(max_age=10))
+    assert hive.enforce_retention(objcol, typemodule, now=procs[3].finish_time + 5) == []
+    assert hive.enforce_retention(objcol, typemodule, now=procs[3].finish_time + 20) == [3, 4]
+
+def test_retention_spill(tmp_path):
+    from machaon.process import ProcessRetention
+    from machaon.core.object import ObjectCollection
+    from machaon.core.type.typemodule import TypeModule
+    typemodule = TypeModule()
+    typemodule.add_fundamentals()
+    objcol = ObjectCollection()
+    hive = ProcessHive()
+    hive.set_retention(ProcessRetention(max_bytes=1, spill_dir=tmp_path))
+
+    procs = finished_processes(hive, 3, objcol, typemodule)
+    for proc in procs:
+        hive.retain_process_result(proc, objcol, typemodule)
+    assert objcol.is_spilled("1") and objcol.is_spilled("2")
+    assert not objcol.is_spilled("3")
+    assert hive.get_retained_bytes() > 0
+    assert (tmp_path / "1.mobj").exists()
+
+    # 参照されると読み込みなおす
+    assert objcol["1"] == 100
+    assert objcol.get("1").object.get_typename() == "Int"
+    assert not objcol.is_spilled("1")
+    assert not (tmp_path / "1.mobj").exists()
+
+def test_retention_spill_cleanup(tmp_path):
+    import threading
+    from machaon.process import ProcessRetention
+    from machaon.core.object import ObjectCollection
+    from machaon.core.type.typemodule import TypeModule
+    typemodule = TypeModule()
+    typemodule.add_fundamentals()
+    objcol = ObjectCollection()
+    hive = ProcessHive()
+    retention = ProcessRetention(max_bytes=1, spill_dir=tmp_path)
+    hive.set_retention(retention)
+
+    procs = finished_processes(hive, 3, objcol, typemodule)
+    for proc in procs:
+        hive.retain_process_result(proc, objcol, typemodule)
+    assert objcol.is_spilled("1") and objcol.is_spilled("2")
+
+    # 同時に参照しても一度だけ読み込む
+    errors = []
+    def reload():
+        try:
+            assert objcol["1"] == 100
+        except BaseException as e:
+            errors.append(e)
+    ths = [threading.Thread(target=reload) for _ in range(8)]
+    for th in ths:
+        th.start()
+    for th in ths:
+        th.join()
+    assert errors == []
+    assert not objcol.is_spilled("1")
+
+    # 上書きされた値の退避先は削除される
+    objcol.push("2", objcol.get("3").object)
+    assert not objcol.is_spilled("2")
+    assert not (tmp_path / "2.mobj").exists()
+
+    # 残ったファイルを削除する
+    (tmp_path / "9.mobj").write_bytes(b"")
+    retention.remove_spilled_files()
+    assert list(tmp_path.glob("*.mobj")) == []
@@ -1,8 +1,11 @@
+import pytest
+
 from machaon.core.type.describer import TypeDescriberClass
 from machaon.core.invocation import TypeMethodInvocation
 from machaon.core.context import instant_context
 from machaon.core.message import select_method
 from machaon.core.type.alltype import TypeModule, Type
+from machaon.core.type.typemodule import TypeModuleError
 
 
 class StrEx:
@@ -61,3 +64,39 @@ def test_mixin_run():
     assert parse_test(cxt, "breakfast sparse: 2", "b  r  e  a  k  f  a  s  t")
 
 
+
+def test_mixin_overlay():
+    base = TypeModule()
+    base.add_fundamentals()
+    base.freeze()
+    BaseStrType = base.get("Str")
+
+    types = base.overlay()
+    types.define(StrEx)
+
+    # 派生モジュールの型だけが変更される
+    StrType = types.get("Str")
+    assert StrType is not BaseStrType
+    assert StrType.select_method("sparse") is not None
+    assert BaseStrType.select_method("sparse") is None
+    assert base.overlay().get("Str") is BaseStrType
+
+
+def test_mixin_overlay_inject():
+    base = TypeModule()
+    base.add_fundamentals()
+    base.freeze()
+    BaseStrType = base.get("Str")
+
+    # 凍結されたモジュールの型は変更できない
+    with pytest.raises(TypeModuleError):
+        base.inject_type_mixin(StrEx, BaseStrType)
+    assert BaseStrType.select_method("sparse") is None
+
+    # 派生モジュールでは複製された型が返される
+    types = base.overlay()
+    StrType = types.mixin(BaseStrType, "tests.test_type_mixin.StrEx")
+    assert StrType is not BaseStrType
+    assert StrType is types.get("Str")
+    assert StrType.select_method("sparse") is not None
+    assert BaseStrType.select_method("sparse") is None
@@ -16,3 +16,29 @@ def test_conversion_construct():
     assert col.value.get("herring").value == "にしん"
 
 
+
+
+def test_ident_and_store():
+    cxt = instant_context()
+    col = ObjectCollection()
+    a = col.push("a", cxt.new_object(1))
+    b = col.push("b", cxt.new_object(2))
+    a2 = col.push("a", cxt.new_object(3))
+    assert col.get("a") is a2
+    assert [x.value for x in col.pick("a")] == [1, 3]
+    assert "a" in col and "c" not in col
+
+    # 削除された識別子は再利用されない
+    col.delete("b")
+    c = col.push("c", cxt.new_object(4))
+    assert c.ident not in (a.ident, b.ident, a2.ident)
+    assert len({x.ident for x in col.pick_all()}) == len(col) == 3
+
+    # 代入すると同名の値は1つになる
+    s = col.store("a", cxt.new_object(5))
+    assert s.ident == a.ident
+    assert col.get("a") is s
+    assert [x.value for x in col.pick("a")] == [5]
+    assert list(col.keys()) == ["a", "c"]
+    assert list(col.values()) == [5, 4]
+    assert col["a"] == 5 and col["b"] is None
@@ -7,7 +7,7 @@ from machaon.core.object import ObjectCollection, Object
 from machaon.core.context import InvocationContext, instant_context
 from machaon.core.sort import ValueWrapper
 from machaon.core.function import parse_function
-from machaon.types.sheet import Sheet, ItemItselfColumn
+from machaon.types.sheet import Sheet, ItemItselfColumn, make_data_columns
 
 from machaon.macatest import run
 
@@ -57,6 +57,36 @@ def objectdesk():
 def values(objects):
     return [x.value for x in objects]
 
+class FakeSpirit:
+    """ 進捗と投稿を記録し、報告された数がlimitに達したら中断する """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.progress = []
+        self.posts = []
+        self.total = None
+        self.started = False
+        self.finished = False
+
+    def start_progress_display(self, *, total=None, title=None):
+        self.total = total
+        self.started = True
+        return 1
+
+    def finish_progress_display(self, *, key=None):
+        self.finished = True
+
+    def interruption_point(self, *, progress=None, noexception=False, **kwargs):
+        from machaon.process import ProcessInterrupted
+        self.progress.append(progress)
+        if self.limit is not None and sum(self.progress) >= self.limit:
+            if noexception:
+                return False
+            raise ProcessInterrupted()
+        return True
+
+    def post(self, tag, value=None, **options):
+        self.posts.append((tag, value, options))
+
 #
 # 型
 #
@@ -391,6 +421,31 @@ def test_string_tables():
 
 
 
+def test_string_tables_cached():
+    from machaon.core.displaycache import enable_display_cache, disable_display_cache
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.view(cxt, "name", "type", "style")
+    expected = rooms.rows_to_string_table(cxt)
+    cache = enable_display_cache(100)
+    try:
+        assert rooms.rows_to_string_table(cxt) == expected
+        misses = cache.misses
+        assert rooms.rows_to_string_table(cxt) == expected
+        assert cache.misses == misses
+        assert cache.hits >= 18
+
+        # 値の変更はtouchで通知する
+        col = ObjectCollection()
+        col.push("a", cxt.new_object(1))
+        o = cxt.new_object(col)
+        assert cache.summarize(o) == "a"
+        col.push("b", cxt.new_object(2))
+        assert cache.summarize(o) == "a, b"
+        assert cache.stringify(o) == o.stringify()
+    finally:
+        disable_display_cache()
+
+
 def test_none_value():
     rooms, cxt = hotelrooms("Okehazama", [
         Room("1408", None, None),
@@ -408,3 +463,398 @@ def test_none_value():
         (3, ["1408", "-", "-"]),
     ]
 
+
+
+def test_columnar_rows():
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.view(cxt, "name", "type")
+    typecol = rooms.columnvalues[1]
+
+    # 絞り込みと並べ替えは行の並びのみを変える
+    rooms.filter(cxt, None, parse_function("@ type != Double"))
+    assert rooms.roworder == [0, 1, 2, 5]
+    rooms.select(3)
+    rooms.view_add(cxt, "style")
+    assert rooms.columnvalues[1] is typecol
+    assert values(rooms.row_values(3)) == ["203", "Twin", "Futon"]
+    assert rooms.columnvalues[2][3] is None # 絞り込まれた行は計算しない
+
+    # 挿入するとアイテムIDがずれる
+    rooms.insert(cxt, 1, Room("104", "Single", "Bed"))
+    assert rooms.roworder == [0, 1, 2, 3, 6]
+    assert [x.value.name() for x in rooms.current_items()] == ["101", "104", "102", "103", "203"]
+    assert values(rooms.row_values(1)) == ["104", "Single", "Bed"]
+    assert rooms.selection().value.name() == "203"
+    assert rooms.rows[4] == (6, rooms.row_values(4))
+
+    rooms.sort(cxt, None)
+    assert rooms.get(cxt, "name", 2).value == "102"
+    assert [x.value for x in rooms.column_values(cxt, "style")] == ["Bed", "Bed", "Bed", "Futon", "Futon"]
+
+
+def test_lazy_cells():
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.view(cxt, "name", "type")
+    assert rooms.columnvalues[0] == [None] * 6 # まだ計算しない
+
+    assert values(rooms.row_values(2)) == ["103", "Single"]
+    assert [x is not None for x in rooms.columnvalues[1]] == [False, False, True, False, False, False]
+
+    table = rooms.string_table_view(cxt)
+    assert len(table) == 6
+    assert table[3:5] == [(3, ["201", "Double"]), (4, ["202", "Double"])]
+    assert rooms.columnvalues[0][0] is None
+    assert list(table) == rooms.rows_to_string_table(cxt)
+    assert rooms.rows_to_string_table(cxt, start=4) == [(4, ["202", "Double"]), (5, ["203", "Twin"])]
+
+
+def test_lookup_index():
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.view(cxt, "name", "type")
+
+    e = rooms.find(cxt, None, "type*", "Dou")
+    assert e.object.value.name() == "201"
+    assert e.key.value == 3
+    assert rooms.find(cxt, None, "*name", "03").object.value.name() == "103"
+    assert rooms.find(cxt, None, "#type#", "Single").object.value.name() == "103"
+    assert rooms.find(cxt, None, "type", "ngl").object.value.name() == "103" # 部分一致
+    assert len(rooms._colindexes) == 3
+
+    # 並べ替え・絞り込み後も行番号を引ける
+    rooms.sort(cxt, None, parse_function("@ type == Twin"))
+    assert rooms.get_row_from_item(0) == 3
+    e = rooms.find(cxt, None, "type*", "Tw")
+    assert e.object.value.name() == "101" and e.key.value == 3
+    rooms.filter(cxt, None, parse_function("@ name endswith 01 not"))
+    assert rooms.find(cxt, None, "type*", "Tw").object.value.name() == "102"
+    with pytest.raises(ValueError):
+        rooms.get_row_from_item(0)
+
+    # 追加すると作り直す
+    rooms.append(cxt, Room("301", "Suite", "Bed"))
+    assert rooms.pick_in_first_column(cxt, None, "30").value.name() == "301"
+    assert rooms.find(cxt, None, "type*", "Su").key.value == 4
+
+
+def test_sortby():
+    from machaon.core.sort import sort_by_keys
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.append(cxt, Room("301", None, "Bed"))
+    rooms.view(cxt, "name", "type", "style")
+    rooms.select(1)
+
+    rooms.sortby(cxt, None, "style,!type")
+    assert [x.value.name() for x in rooms.current_items()] == ["101", "102", "201", "202", "301", "203", "103"]
+    assert rooms.selection_index() == 1
+
+    rooms.sortby(cxt, None, "type") # Noneは先頭
+    assert [x.value.name() for x in rooms.current_items()] == ["301", "201", "202", "103", "101", "102", "203"]
+    
+    rooms.sortby(cxt, None, "!name", 3)
+    assert [x.value.name() for x in rooms.current_items()] == ["301", "203", "202"]
+    assert rooms.count() == 3
+    with pytest.raises(Exception):
+        rooms.selection() # 選択された行は取り除かれた
+
+    # 型の混在とNone
+    values = [3, "b", None, 1.5, "a", None, True]
+    assert sort_by_keys(list(range(7)), [(values, True)]) == [2, 5, 6, 3, 0, 4, 1]
+    assert sort_by_keys(list(range(7)), [(values, False)]) == [1, 4, 0, 3, 6, 2, 5]
+    assert sort_by_keys(list(range(7)), [(values, False)], top=3) == [1, 4, 0]
+
+
+def test_row_view():
+    from machaon.types.sheet import SheetRowView, find_subject_members
+    from machaon.core.function import SelectorExpression
+    rooms, cxt = hotelrooms("Okehazama")
+    rooms.view(cxt, "name", '@ type == Twin', "style")
+    
+    # カラムとアイテムのメンバを参照できる
+    view = SheetRowView(rooms, cxt)
+    f = parse_function(".: @ name :. + .: @ style :.")
+    assert f.run(view.bind(2), cxt).value == "103Futon"
+    t = view.bind(3).type
+    assert f.run(view.bind(5), cxt).value == "203Futon"
+    assert view.bind(5).type is t # 型は使い回す
+    
+    rooms.filter(cxt, None, SelectorExpression('"@ type == Twin"', None)) # カラムの値をそのまま使う
+    assert [x.value.name() for x in rooms.current_items()] == ["101", "102", "203"]
+    assert [x is None for x in rooms.columnvalues[0]] == [True, True, False, True, True, False] # 参照されないカラムは計算しない
+    
+    assert find_subject_members("@ size > 10 && @.name startswith a") == ["size", "name"]
+    assert find_subject_members("name") == ["name"]
+    assert find_subject_members("@ name == 'a b'") is None
+
+
+def test_parallel_columns(objectdesk):
+    import threading
+    from machaon.process import ProcessInterrupted
+    args = [("e{:03}".format(i), "{:03}-0000".format(i)) for i in range(200)]
+    sheet = employees_sheet(objectdesk, args, ["name"])
+    
+    # 値はアイテムの順序通りに並ぶ
+    sheet.view(objectdesk, "name", "postcode", "tall", parallel=4)
+    assert sheet.evalworkers == 4
+    assert all(x is None for values in sheet.columnvalues for x in values) # 値を使うまで計算しない
+    sheet.string_table_view(objectdesk).prefetch(50)
+    assert [x is not None for x in sheet.columnvalues[0]] == [True] * 50 + [False] * 150
+    sheet.prepare_columns(objectdesk)
+    assert all(x is not None for values in sheet.columnvalues for x in values)
+    assert [row[1][0].value for row in sheet.rows] == [a[0] for a in args]
+    assert [row[1][1].value for row in sheet.rows] == [a[1] for a in args]
+    
+    sheet.view_add(objectdesk, ".: @ name :. + .: @ postcode :.", parallel=3)
+    assert [row[1][3].value for row in sheet.rows] == [a[0]+a[1] for a in args]
+
+    # 進捗を報告し、中断できる
+    sheet.view(objectdesk, "name", "postcode")
+    spirit = FakeSpirit()
+    assert sheet.eval_columns(objectdesk, workers=2, spirit=spirit) == 200
+    assert spirit.total == 200 and sum(spirit.progress) == 200 and spirit.finished
+    
+    sheet.view(objectdesk, "name")
+    spirit = FakeSpirit(40)
+    with pytest.raises(ProcessInterrupted):
+        sheet.eval_columns(objectdesk, workers=2, spirit=spirit)
+    assert spirit.finished
+    assert sum(x is None for x in sheet.columnvalues[0]) > 0 # 残りの行は計算しない
+    assert [row[1][0].value for row in sheet.rows] == [a[0] for a in args] # 後から計算できる
+
+
+def test_stream_items(objectdesk):
+    closed = []
+    def generate(count):
+        try:
+            for i in range(count):
+                yield Employee("e{:03}".format(i))
+        finally:
+            closed.append(True)
+    
+    t = objectdesk.get_type("Employee")
+    sheet = Sheet.constructor(Sheet, objectdesk, t, generate(250), "name")
+    assert sheet.count() == 250
+    assert [row[1][0].value for row in sheet.rows][-1] == "e249"
+
+    # 読み込むたびに進捗を報告する
+    sheet = Sheet([], context=objectdesk, columns=["name"])
+    spirit = FakeSpirit()
+    assert sheet.extend_from_stream(objectdesk, generate(250), t, spirit=spirit, chunksize=100)
+    assert spirit.progress == [100, 100] and spirit.finished
+    assert sheet.count() == 250
+    assert not sheet.is_truncated()
+
+    # 一度で読み終われば、進捗を表示しない
+    spirit = FakeSpirit()
+    assert sheet.extend_from_stream(objectdesk, generate(3), t, spirit=spirit, chunksize=100)
+    assert not spirit.started and spirit.posts == []
+
+    # 中断すると読み込んだ行を残して終わる
+    closed.clear()
+    sheet = Sheet([], context=objectdesk, columns=["name", "tall"])
+    spirit = FakeSpirit(200)
+    assert not sheet.extend_from_stream(objectdesk, generate(1000), t, spirit=spirit, chunksize=100)
+    assert closed
+    assert sheet.count() == 200
+    assert [row[1][1].value for row in sheet.rows][-1] == 4
+    sheet.select(150)
+    assert sheet.selection().value.name() == "e150"
+    assert sheet.is_truncated()
+    assert "中断" in sheet.summarize(t)
+    assert [tag for tag, _, _ in spirit.posts] == ["warn"]
+
+
+class Office:
+    """ @type
+    事務所
+    """
+    def staff(self, count):
+        """ @method
+        従業員を生成する
+        Params:
+            count(int):
+        Returns:
+            Sheet[Employee]:
+        Decorates:
+            @ view: name
+        """
+        for i in range(count):
+            yield Employee("e{:04}".format(i))
+
+
+def test_stream_display(objectdesk):
+    objectdesk.type_module.define(Office, typename="Office")
+    spirit = FakeSpirit()
+    objectdesk.spirit = spirit
+    office = objectdesk.new_object(Office(), type="Office")
+    
+    r = parse_function("@ staff 250").run(office, objectdesk)
+    sheet = r.value
+    assert sheet.count() == 250
+
+    # 最初のまとまりを読んだところで表を表示し、以降は追加した行を送る
+    tags = [tag for tag, _, _ in spirit.posts]
+    assert tags == ["object-sheetview", "object-sheetview-update", "object-sheetview-update"]
+    _, _, first = spirit.posts[0]
+    assert first["columns"] == ["name"] # デコレータの列を表示する
+    assert first["streaming"]
+    rows = first["rows"]
+    assert len(rows) == 250
+    assert [(o["start"], o["end"]) for _, _, o in spirit.posts[1:]] == [(100, False), (200, True)]
+    assert rows[249] == (249, ["e0249"])
+    assert sheet.columnvalues[0][249] is not None # 表示する範囲は送る前に計算する
+    assert spirit.started and spirit.finished
+
+    # 表示した表は、結果の表示で繰り返さない
+    class App:
+        def __init__(self):
+            self.posts = []
+        def post(self, tag, value=None, **options):
+            self.posts.append((tag, value))
+    app = App()
+    sheet.pprint(None, app)
+    assert [tag for tag, _ in app.posts] == ["message"]
+
+
+@pytest.mark.parametrize("parallel", [None, 3])
+def test_filter_pushdown(objectdesk, parallel):
+    from machaon.types.sheet import SheetRowView
+    args = [("e" + "x" * (i % 7), "{:03}-0000".format(i)) for i in range(120)]
+    sheet = employees_sheet(objectdesk, args, ["name"])
+    sheet.view(objectdesk, "name", "postcode", "tall", parallel=parallel)
+
+    view = SheetRowView(sheet, objectdesk)
+    assert sheet.referenced_columns(view, parse_function("@ tall > 5")) == ([2], True)
+    assert sheet.referenced_columns(view, parse_function("@ tall + @ name length")) == ([2, 0], True)
+    assert sheet.referenced_columns(view, parse_function("@ tall == 'a b'")) == ([], False)
+
+    # 述語が参照するカラムだけを全行で計算し、他のカラムは残った行についてのみ計算する
+    sheet.filter(objectdesk, None, parse_function("@ tall > 5"))
+    assert sheet.count() == 34
+    assert all(x is not None for x in sheet.columnvalues[2])
+    assert all(x is None for values in sheet.columnvalues[0:2] for x in values)
+
+    sheet.sortby(objectdesk, None, "!postcode")
+    assert sum(x is not None for x in sheet.columnvalues[1]) == 34
+    assert all(x is None for x in sheet.columnvalues[0])
+
+    sheet.string_table_view(objectdesk).prefetch(10)
+    computed = [i for i, x in enumerate(sheet.columnvalues[0]) if x is not None]
+    assert computed == sorted(sheet.roworder[0:10])
+    assert sheet.rows[0][1][1].value == "118-0000"
+
+
+def test_group(objectdesk):
+    from machaon.types.sheet import InvalidAggregateFunction
+    args = [("e" + "x" * (i % 3), "{:03}-0000".format(i)) for i in range(10)]
+    sheet = employees_sheet(objectdesk, args, ["name", "tall"])
+    sheet.filter(objectdesk, None, parse_function("@ postcode != 009-0000"))
+
+    g = sheet.group(objectdesk, None, "tall", "count", "sum:tall", "mean:tall", "first:postcode", "collect:postcode", "max:postcode")
+    assert g.get_current_column_names() == ["tall", "count", "sum:tall", "mean:tall", "first:postcode", "collect:postcode", "max:postcode"]
+    rows = [[x.value for x in row[:5]] for _, row in g.rows]
+    assert rows == [
+        [1, 3, 3, 1.0, "000-0000"],
+        [2, 3, 6, 2.0, "001-0000"],
+        [3, 3, 9, 3.0, "002-0000"],
+    ]
+    assert [x.value for x in g.rows[0][1][5].value.objects] == ["000-0000", "003-0000", "006-0000"]
+    assert g.rows[2][1][6].value == "008-0000"
+    assert sheet.columnvalues[0] == [None] * 10 # 集計しないカラムは計算しない
+
+    # 結果はシートとして操作できる
+    g.sortby(objectdesk, None, "!tall")
+    assert [x.value for x in g.current_items()] == [3, 2, 1]
+
+    a = sheet.aggregate(objectdesk, None, "count", "min:tall", "max:tall")
+    assert [x.value for x in a.rows[0][1]] == [9, 1, 3]
+
+    with pytest.raises(InvalidAggregateFunction):
+        sheet.group(objectdesk, None, "tall", "median:tall")
+
+
+def test_string_table_async(objectdesk):
+    import threading
+    args = [("e{:03}".format(i), "{:03}-0000".format(i)) for i in range(30)]
+    sheet = employees_sheet(objectdesk, args, ["name"])
+    sheet.view(objectdesk, "postcode", ".: @ name :. + .: @ postcode :.")
+    table = sheet.string_table_view(objectdesk)
+    assert table[0:2] == [(0, ["000-0000", "e000000-0000"]), (1, ["001-0000", "e001001-0000"])]
+
+    # 作成後にビューが変わっても、作成時点の列で変換する
+    sheet.view(objectdesk, "tall")
+    threads = []
+    column = table._columns[1]
+    original = column.clone_for_thread
+    def clone_for_thread():
+        threads.append(threading.current_thread())
+        return original()
+    column.clone_for_thread = clone_for_thread
+    page = table.window_async(10, 40).result()
+    assert len(page) == 20
+    assert page[0] == (10, ["010-0000", "e010010-0000"])
+    assert threads and threads[0] is not threading.current_thread() # 別のスレッドで複製した列を使う
+    assert table[29][1][1] == "e029029-0000"
+    assert [row[1][0].value for row in sheet.rows][0:2] == [4, 4]
+
+
+def test_string_table_iter_pools(objectdesk, monkeypatch):
+    import machaon.types.sheet as sheetmodule
+    created = []
+    class CountingExecutor(sheetmodule.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(1)
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(sheetmodule, "ThreadPoolExecutor", CountingExecutor)
+
+    args = [("e{:04}".format(i),) for i in range(1200)]
+    sheet = employees_sheet(objectdesk, args, ["name"])
+    sheet.view(objectdesk, "name", "tall", parallel=2)
+    table = sheet.string_table_view(objectdesk)
+    table.prefetch(500)
+    rows = list(table)
+    assert len(rows) == 1200 and rows[-1] == (1199, ["e1199", "5"])
+    assert len(created) == 3 # 表示範囲ごとに一つ
+
+    # 少ない行はスレッドを用意せずに計算する
+    sheet.view(objectdesk, "postcode", parallel=2)
+    sheet.eval_columns(objectdesk, rows=sheet.roworder[0:10], workers=2)
+    assert len(created) == 3
+
+
+#
+# メモリ使用量
+#
+def measure_sheet_bytes_per_cell(objectdesk, rowcount, columns=("name", "tall", "postcode")):
+    """ tracemallocで行の生成と値の計算に確保されたメモリを計り、1セルあたりのバイト数を返す """
+    import gc
+    import tracemalloc
+    datas = [objectdesk.new_object(Employee("e{}".format(i)), type="Employee") for i in range(rowcount)]
+    sheet = Sheet(datas, uninitialized=True)
+    newcolumns = make_data_columns(*columns)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        sheet.generate_rows(objectdesk, newcolumns)
+        sheet.eval_columns(objectdesk) # 列の値は遅延して計算されるので、ここで全て計算する
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / (rowcount * len(columns))
+
+def test_compact_objects(objectdesk):
+    from machaon.core.message import Message, ObjectRef
+    from machaon.core.invocation import InvocationEntry
+    from machaon.process import ProcessMessage
+    from machaon.types.tuple import ElemObject
+    o = objectdesk.new_object(1)
+    for value in (o, Message(o), ObjectRef(1), InvocationEntry(None, None, (), {}), ProcessMessage("a"), ElemObject(o, 0)):
+        assert not hasattr(value, "__dict__")
+
+@pytest.mark.benchmark
+def test_sheet_memory_1m(objectdesk, record_property):
+    # 約100万セル（333334行 x 3列）
+    bpc = measure_sheet_bytes_per_cell(objectdesk, 333334)
+    record_property("bytes_per_cell", bpc)
+    assert bpc < 900, "{:.1f} bytes/cell".format(bpc) # __slots__を使う前は約958
@@ -0,0 +1,91 @@
+import traceback
+
+from machaon.types.stacktrace import (
+    ErrorObject, TracebackObject, release_error_frames, release_expired_errors, traceback_of
+)
+
+
+def _fail(size):
+    big = "x" * size
+    items = list(range(size))
+    raise ValueError(len(big) + len(items))
+
+def _raise_error(size=10000):
+    try:
+        _fail(size)
+    except ValueError as e:
+        return e
+
+
+def test_release_frames():
+    e = _raise_error()
+    err = ErrorObject(e)
+    before = err.short_display()
+    err.release_frames()
+    assert e.__traceback__ is None
+    tb = traceback_of(e)
+    assert tb is not None
+
+    # ローカル変数は切り詰めた表示文字列になる
+    frames = [x for _, x, _ in TracebackObject(tb).walk()]
+    frame = frames[-1].frame()
+    assert frame.is_captured()
+    assert frame.funcname() == "_fail"
+    assert len(frame.get_variable("big")) < 300
+    assert "..." in frame.get_variable("big")
+    assert "items" in set(frame.get_variable_names(frames[-1].lasti()))
+
+    # 表示は変わらず行える
+    assert err.short_display() == before
+    assert "_fail" in err.display()
+    assert "ValueError" in "".join(traceback.format_exception(type(e), e, tb))
+
+
+class _PostApp:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, tag, value):
+        self.posts.append((tag, value))
+
+    def get_ui_wrap_width(self):
+        return 100
+
+
+def test_release_expired_errors():
+    e = _raise_error(10)
+    err = ErrorObject(e)
+    assert e.__traceback__ is not None
+
+    # 表示されるまでは手放さない
+    release_expired_errors(now=float("inf"))
+    assert e.__traceback__ is not None
+
+    app = _PostApp()
+    err.pprint(app)
+    assert any("_fail" in str(v) for _, v in app.posts)
+    assert e.__traceback__ is not None # 表示の直後には手放さない
+    assert release_expired_errors(now=float("inf")) >= 1
+    assert e.__traceback__ is None
+    assert traceback_of(e) is not None
+
+
+def _raise_chained():
+    try:
+        try:
+            _fail(10)
+        except ValueError as e:
+            raise KeyError("outer") from e
+    except KeyError as e:
+        return e
+
+def test_release_chained_errors():
+    e = _raise_chained()
+    err = ErrorObject(e)
+    before = err.display()
+    assert "_fail" in before and "direct cause" in before
+
+    err.release_frames()
+    assert e.__traceback__ is None and e.__cause__.__traceback__ is None
+    assert traceback_of(e.__cause__) is not None
+    assert err.display() == before # 原因となった例外のフレームも要約から表示する
@@ -0,0 +1,68 @@
+import pytest
+
+from machaon.core.context import instant_context
+from machaon.core.function import parse_function
+from machaon.types.fundamental import NotFound
+from machaon.types.stream import ObjectStream
+
+
+def counting(count, pulled):
+    for i in range(count):
+        pulled.append(i)
+        yield i
+
+
+def test_stream_pulls_only_needed():
+    cxt = instant_context()
+    pulled = []
+    o = cxt.new_object(counting(1000000, pulled), conversion="Stream[Int]")
+    assert o.get_typename() == "Stream"
+    assert pulled == [] # 変換しただけでは読まない
+
+    s = o.value
+    s.skip(10)
+    s.head(5)
+    sheet = s.sheet(cxt, None)
+    assert [x.value for x in sheet.current_items()] == [10, 11, 12, 13, 14]
+    assert sheet.items[0].get_typename() == "Int"
+    assert len(pulled) == 15
+
+    pulled.clear()
+    s = ObjectStream.constructor(ObjectStream, cxt, cxt.get_type("Int"), counting(1000000, pulled))
+    assert s.first_where(cxt, parse_function("@ > 99")).value == 100
+    assert len(pulled) == 101
+
+    s.filter(cxt, parse_function("@ % 3 == 0"))
+    s.head(3)
+    s.view("@", "neg")
+    sheet = s.sheet(cxt, None)
+    assert [row[1][1].value for row in sheet.rows] == [-102, -105, -108]
+    assert len(pulled) == 109
+
+    s = ObjectStream.constructor(ObjectStream, cxt, cxt.get_type("Int"), range(10))
+    with pytest.raises(NotFound):
+        s.first_where(cxt, parse_function("@ > 99"))
+
+
+def test_stream_message():
+    cxt = instant_context()
+    pulled = []
+    o = cxt.new_object(counting(1000000, pulled), conversion="Stream[Int]")
+    r = parse_function("@ skip 3 limit 4 count").run(o, cxt)
+    assert r.value == 4
+    assert len(pulled) == 7
+
+
+def test_stream_keeps_sheet():
+    cxt = instant_context()
+    s = ObjectStream.constructor(ObjectStream, cxt, cxt.get_type("Int"), range(100))
+    s.head(5)
+    sheet = s.sheet(cxt, None)
+    assert sheet.count() == 5
+    assert s.sheet(cxt, None) is sheet # 保持したシートを返す
+    assert s.count(cxt, None) == 5
+
+    # 変換済みの行から読み直す
+    s.skip(2)
+    assert [x.value for x in s.sheet(cxt, None).current_items()] == [2, 3, 4]
+    assert s.first_where(cxt, parse_function("@ > 2")).value == 3